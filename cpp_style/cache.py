@@ -0,0 +1,421 @@
+"""
+工具调用结果缓存
+
+以 (工具名, 参数, 代码, 规则数据版本) 的哈希为键，按总字节数限制容量，
+超出时按 LRU 淘汰。相同代码的重复调用（重试、复审、多个智能体查看同一
+头文件）直接返回缓存结果，不再重新运行检查器。
+
+可选的第二级 PersistentResultStore 把结果写入 SQLite（WAL 模式），
+机器停止后重新启动时缓存依然可用。
+"""
+
+import contextlib
+import contextvars
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple
+
+from cpp_style import __version__
+from cpp_style.data import get_store
+
+logger = logging.getLogger(__name__)
+
+_data_version: Optional[str] = None
+
+# 当前工具调用的结果是否应写入缓存（部分结果等不应缓存）
+_store_result: contextvars.ContextVar[bool] = contextvars.ContextVar("store_result", default=True)
+# 当前上下文中的工具调用是否绕过缓存（如启动预热：合成输入的结果不应占用缓存、计入命中率）
+_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar("cache_bypass", default=False)
+
+
+def data_version() -> str:
+    """
+    规则数据版本
+
+    由包版本号和 data/ 目录下所有 JSON 文件的内容共同决定，
+    任何一项变化都会使已有缓存键失效。
+    """
+    global _data_version
+    if _data_version is None:
+        digest = hashlib.sha256(__version__.encode('utf-8'))
+        digest.update(get_store().digest().encode('ascii'))
+        _data_version = digest.hexdigest()[:16]
+    return _data_version
+
+
+class PersistentResultStore:
+    """
+    基于 SQLite（WAL 模式）的持久化结果存储
+
+    - 容量上限：超出时按最近访问时间淘汰
+    - 过期淘汰：超过 max_age 秒未写入的条目视为失效
+    - 自动失效：规则数据版本（包版本号或 data/*.json）变化时清空全部条目
+
+    存储出错（磁盘满、文件损坏等）只记录日志并按未命中处理，不影响工具调用。
+
+    数据库在第一次使用时才打开，并且每个进程各自打开：服务器模块在 forkserver 中导入时
+    不会创建连接，SQLite 连接也不会跨 fork 被子进程继承。
+    """
+
+    def __init__(self, path: str, max_bytes: int, max_age: float):
+        """
+        Args:
+            path: SQLite 数据库文件路径（所在目录不存在时自动创建）
+            max_bytes: 存储结果的总字节数上限
+            max_age: 条目的最长保留时间（秒）
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+        self._bytes = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        # 打开连接的进程
+        self._pid: Optional[int] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """当前进程的连接，首次使用时打开（调用方持有 _lock）"""
+        if self._conn is not None and self._pid == os.getpid():
+            return self._conn
+        # 从其他进程继承的连接不能继续使用，也不能在这里关闭（会影响打开它的进程），直接丢弃
+        self._conn = None
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn, self._pid = conn, os.getpid()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+
+        self._invalidate_stale_version()
+        self._purge_expired()
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        return conn
+
+    def _invalidate_stale_version(self) -> None:
+        """规则数据版本变化时清空所有条目"""
+        version = data_version()
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+        if row is None or row[0] != version:
+            self._conn.execute("DELETE FROM results")
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('data_version', ?)", (version,))
+
+    def _purge_expired(self) -> None:
+        """删除过期条目"""
+        cursor = self._conn.execute("DELETE FROM results WHERE created < ?", (time.time() - self.max_age,))
+        self.evictions += max(cursor.rowcount, 0)
+
+    def get(self, key: str) -> Optional[Any]:
+        """查找结果；过期条目会被删除并按未命中处理"""
+        with self._lock:
+            try:
+                row = self._connection().execute(
+                    "SELECT value, size, created FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+
+                value, size, created = row
+                now = time.time()
+                if now - created > self.max_age:
+                    self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._bytes -= size
+                    self.evictions += 1
+                    self.misses += 1
+                    return None
+
+                self._conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                return json.loads(value)
+            except (sqlite3.Error, OSError) as e:
+                self.errors += 1
+                logger.warning("持久化缓存读取失败: %s", e)
+                return None
+
+    def put(self, key: str, value: Any) -> None:
+        """写入结果，超出容量时按最近访问时间淘汰"""
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            try:
+                row = self._connection().execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+                now = time.time()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, data, size, now, now),
+                )
+                self._bytes += size - (row[0] if row else 0)
+
+                if self._bytes > self.max_bytes:
+                    self._evict_to_fit()
+            except (sqlite3.Error, OSError) as e:
+                self.errors += 1
+                logger.warning("持久化缓存写入失败: %s", e)
+
+    def _evict_to_fit(self) -> None:
+        """淘汰最久未访问的条目，直到总大小回到上限的 90% 以内"""
+        self._purge_expired()
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute("SELECT key, size FROM results ORDER BY accessed").fetchall()
+        for key, size in rows:
+            if self._bytes <= target:
+                break
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """存储统计信息"""
+        with self._lock:
+            try:
+                self._connection()
+            except (sqlite3.Error, OSError) as e:
+                self.errors += 1
+                logger.warning("持久化缓存打开失败: %s", e)
+            return {
+                "path": self.path,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_age": self.max_age,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "errors": self.errors,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+class ResultCache:
+    """按字节数限制容量的 LRU 结果缓存"""
+
+    def __init__(self, max_bytes: int, store: Optional[PersistentResultStore] = None):
+        """
+        Args:
+            max_bytes: 缓存结果的总字节数上限，0 表示禁用缓存
+            store: 可选的持久化存储，作为内存缓存未命中时的第二级
+        """
+        self.max_bytes = max_bytes
+        self.store = store
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def make_key(self, tool: str, params: Mapping[str, Any]) -> str:
+        """
+        生成缓存键
+
+        字符串参数（如代码）直接以 UTF-8 字节参与 SHA-256 哈希，避免为大文件做
+        JSON 转义；每个字段都带类型和长度前缀，不同参数组合不会拼接出相同的输入。
+        """
+        digest = hashlib.sha256()
+        for part in (tool, data_version()):
+            self._update(digest, b's', part.encode('utf-8'))
+        for name in sorted(params):
+            value = params[name]
+            self._update(digest, b's', name.encode('utf-8'))
+            if isinstance(value, str):
+                self._update(digest, b's', value.encode('utf-8'))
+            else:
+                self._update(digest, b'j', json.dumps(value, sort_keys=True, default=str).encode('utf-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _update(digest, tag: bytes, data: bytes) -> None:
+        digest.update(tag)
+        digest.update(len(data).to_bytes(8, 'little'))
+        digest.update(data)
+
+    def get(self, key: str) -> Optional[Any]:
+        """查找缓存结果，命中时移动到 LRU 队尾；内存未命中时查询持久化存储"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        if self.store is not None:
+            value = self.store.get(key)
+            if value is not None:
+                self._remember(key, value)
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: Any) -> None:
+        """写入缓存结果（同时写入持久化存储），超出容量时淘汰最久未使用的条目"""
+        if not self.enabled:
+            return
+        self._remember(key, value)
+        if self.store is not None:
+            self.store.put(key, value)
+
+    def _remember(self, key: str, value: Any) -> None:
+        """写入内存 LRU"""
+        size = sys.getsizeof(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._sizes[key]
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_key)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """清空缓存（计数器保留）"""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "persistent": self.store.stats() if self.store is not None else None,
+            }
+
+    def skip_store(self) -> None:
+        """不缓存当前工具调用的结果（如超时产生的部分结果）"""
+        _store_result.set(False)
+
+    @contextlib.contextmanager
+    def bypass(self) -> Iterator[None]:
+        """with 块内（包括其中创建的任务）调用的工具函数既不读取也不写入缓存"""
+        token = _bypass.set(True)
+        try:
+            yield
+        finally:
+            _bypass.reset(token)
+
+    def cached(
+        self,
+        func: Optional[Callable] = None,
+        *,
+        ignore: Tuple[str, ...] = (),
+        codec: Optional[Tuple[Callable[[Any], str], Callable[[str], Any]]] = None
+    ) -> Callable:
+        """
+        装饰器：在工具函数前加一层缓存
+
+        functools.wraps 保留原函数签名和文档，FastMCP 据此生成的工具 schema 不变。
+        ignore 中的参数不参与缓存键（如只影响执行时限、不影响完整结果的参数）。
+        codec 为 (编码, 解码) 函数对：返回值不是字符串（如 CallToolResult）时编码为
+        字符串后缓存，命中时解码，内存占用的统计和持久化存储因此保持准确。
+        同步和异步（async def）工具函数都可以使用。
+        可以直接使用 @cache.cached，也可以带参数使用 @cache.cached(ignore=(...))。
+        """
+        if func is None:
+            return functools.partial(self.cached, ignore=ignore, codec=codec)
+
+        encode, decode = codec or (None, None)
+
+        signature = inspect.signature(func)
+        tool_name = func.__name__
+
+        def key_of(args, kwargs) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = {name: value for name, value in bound.arguments.items() if name not in ignore}
+            return self.make_key(tool_name, params)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not self.enabled or _bypass.get():
+                    return await func(*args, **kwargs)
+
+                key = key_of(args, kwargs)
+                result = self.get(key)
+                if result is not None:
+                    return decode(result) if decode else result
+
+                token = _store_result.set(True)
+                try:
+                    result = await func(*args, **kwargs)
+                    if _store_result.get():
+                        self.put(key, encode(result) if encode else result)
+                finally:
+                    _store_result.reset(token)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled or _bypass.get():
+                return func(*args, **kwargs)
+
+            key = key_of(args, kwargs)
+            result = self.get(key)
+            if result is not None:
+                return decode(result) if decode else result
+
+            token = _store_result.set(True)
+            try:
+                result = func(*args, **kwargs)
+                if _store_result.get():
+                    self.put(key, encode(result) if encode else result)
+            finally:
+                _store_result.reset(token)
+            return result
+
+        return wrapper
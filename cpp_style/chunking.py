@@ -0,0 +1,437 @@
+"""
+大文件分块并行分析
+
+多 MB 的输入（合并后的源文件、生成代码）在顶层函数/类的边界处切分，各分块交给
+不同的工作进程并行分析，再在服务器进程中合并：
+
+- 切分点只取顶层声明结束后的行首（命名空间和 extern "C" 的花括号视为透明），
+  不会落在函数体、注释或字符串中间；分块从行首开始，列号不需要调整
+- 逐个匹配的规则在各分块中独立执行，行号加上分块的起始行后按规则顺序合并，
+  顺序与整文件分析相同。谓词会查看匹配前后的一段代码（如"之后 500 个字符内是否再次
+  赋值"），因此交给工作进程的文本在分块两侧各带一段只读的重叠上下文（至少为最大的
+  谓词窗口，并延伸到下一个切分点），只保留起点落在分块内的匹配
+- 整体规则（new/delete 数量比较、fopen/fclose 配对、现代特性是否出现等）在各分块
+  只做统计，合并时由 reduce_tallies 做一次全局归约
+- 包含保护需要整个文件，analyze_all 中由负责切分的工作进程顺带完成
+"""
+
+import re
+import time
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from cpp_style import compact, sarif
+from cpp_style.deadline import Deadline
+from cpp_style.lexer import COMMENT
+from cpp_style.output import FindingSet, checker_status, combined_findings, rule_findings, structured
+from cpp_style.profiling import RuleProfile
+from cpp_style.rules import (
+    ALL_RULES, Rule, RuleSelection, context_window, get_registry, profile_rules, reduce_tallies, run_rules,
+)
+from cpp_style.source_buffer import SourceBuffer
+from cpp_style.lazy import lazy
+
+get_combined_analyzer = lazy("cpp_style.tools.combined_analyzer:get_analyzer")
+get_const_checker = lazy("cpp_style.tools.const_checker:get_checker")
+get_memory_analyzer = lazy("cpp_style.tools.memory_safety:get_analyzer")
+get_modern_cpp_suggester = lazy("cpp_style.tools.modern_cpp:get_suggester")
+
+# 支持分块分析的工具及其使用的检查器
+CHUNKED_TOOLS = {
+    "analyze_memory_safety": ("memory_safety",),
+    "check_const_correctness": ("const_correctness",),
+    "suggest_modern_cpp": ("modern_cpp",),
+    "analyze_all": ("memory_safety", "const_correctness", "modern_cpp"),
+}
+
+_CHECKERS = {
+    "memory_safety": get_memory_analyzer,
+    "const_correctness": get_const_checker,
+    "modern_cpp": get_modern_cpp_suggester,
+}
+
+# 花括号前是命名空间或 extern "C" 头部时，花括号内仍视为顶层
+_TRANSPARENT_HEAD_RE = re.compile(r'(?:\bnamespace\b[\w\s:]*|\bextern\s*"[^"\n]*")\s*$')
+# 向前查找头部的最大字符数
+_HEAD_WINDOW = 256
+_BRACE_RE = re.compile(r'[{};]')
+# 重叠上下文在最大谓词窗口之外额外保留的字符数（覆盖跨越分块边界的匹配本身）
+_OVERLAP_MARGIN = 1024
+
+
+class ChunkRequest(NamedTuple):
+    """一次分块分析请求的参数"""
+    tool: str
+    code: str
+    selection: RuleSelection
+    target_standard: str
+    file_path: Optional[str]
+    output_format: str = "markdown"
+    compact: int = 0
+
+
+# ==================== 切分 ====================
+
+def boundaries(source: SourceBuffer) -> List[int]:
+    """
+    顶层声明之间可以安全切分的位置
+
+    Returns:
+        升序的偏移量列表，每个位置都是行首
+    """
+    code = source.code
+    points = []
+    transparent: List[bool] = []
+    depth = 0
+
+    for match in _BRACE_RE.finditer(code):
+        char = match.group()
+        if char == '{':
+            pos = match.start()
+            is_transparent = depth == 0 and _TRANSPARENT_HEAD_RE.search(
+                code, max(0, pos - _HEAD_WINDOW), pos) is not None
+            transparent.append(is_transparent)
+            if not is_transparent:
+                depth += 1
+            continue
+
+        if char == '}':
+            if not transparent:
+                continue
+            if not transparent.pop():
+                depth -= 1
+                if depth:
+                    continue
+        elif depth:
+            continue
+
+        point = _line_start_after(source, match.end())
+        if point is not None and (not points or point > points[-1]):
+            points.append(point)
+    return points
+
+
+def _line_start_after(source: SourceBuffer, end: int) -> Optional[int]:
+    """声明结束位置之后的下一行行首；同一行后面还有代码或跨行注释时返回 None"""
+    text = source.text
+    newline = text.find('\n', end)
+    if newline == -1 or newline + 1 >= len(text):
+        return None
+    point = newline + 1
+
+    tokens = source.tokens
+    k = bisect_left(tokens.starts, end)
+    while k < len(tokens) and tokens.starts[k] < point:
+        if tokens.kinds[k] != COMMENT or tokens.ends[k] > point:
+            return None
+        k += 1
+    return point
+
+
+def split_points(source: SourceBuffer, parts: int, points: Optional[List[int]] = None) -> List[int]:
+    """
+    把代码切分为大致等长的 parts 块
+
+    Args:
+        source: 要切分的代码
+        parts: 分块数
+        points: 已计算的 boundaries(source)
+
+    Returns:
+        各分块的起始偏移（第一个总是 0）；找不到合适的切分点时只有一块
+    """
+    starts = [0]
+    if parts <= 1:
+        return starts
+    if points is None:
+        points = boundaries(source)
+    for i in range(1, parts):
+        k = bisect_left(points, len(source) * i // parts)
+        if k < len(points) and points[k] > starts[-1]:
+            starts.append(points[k])
+    return starts
+
+
+def chunk_views(points: List[int], starts: List[int], length: int, overlap: int) -> List[Tuple[int, int]]:
+    """
+    各分块交给工作进程的文本范围：分块两侧各加至少 overlap 个字符，并延伸到切分点，
+    保证重叠部分同样从安全的位置开始和结束
+
+    Args:
+        points: boundaries() 的切分点
+        starts: 各分块的起始偏移
+        length: 代码总长度
+        overlap: 两侧至少保留的字符数
+
+    Returns:
+        各分块的 (起始偏移, 结束偏移)
+    """
+    views = []
+    for start, end in zip(starts, starts[1:] + [length]):
+        k = bisect_right(points, start - overlap) - 1
+        view_start = points[k] if start - overlap > 0 and k >= 0 else 0
+        k = bisect_left(points, end + overlap)
+        view_end = points[k] if k < len(points) else length
+        views.append((min(view_start, start), max(view_end, end)))
+    return views
+
+
+def prepare(
+    code: str, parts: int, include_guard: bool, file_path: Optional[str]
+) -> Tuple[List[int], List[Tuple[int, int]], Optional[Dict]]:
+    """
+    切分代码；需要时顺带在整个文件上运行包含保护检查（在工作进程中执行）
+
+    Returns:
+        (各分块的起始偏移, 各分块带重叠上下文的文本范围, 包含保护检查结果或 None)
+    """
+    source = SourceBuffer(code)
+    points = boundaries(source)
+    starts = split_points(source, parts, points)
+    overlap = context_window(get_registry()) + _OVERLAP_MARGIN
+    views = chunk_views(points, starts, len(code), overlap)
+
+    guard = None
+    if include_guard:
+        start = time.perf_counter()
+        issues, report = get_combined_analyzer().check_include_guard(source, file_path)
+        guard = {"issues": issues, "report": report, "elapsed_ms": (time.perf_counter() - start) * 1000}
+    return starts, views, guard
+
+
+# ==================== 分块任务 ====================
+
+def _select(checker: str, selection: RuleSelection, target_standard: str) -> Tuple[Rule, ...]:
+    if checker == "modern_cpp":
+        return get_modern_cpp_suggester().select_rules(target_standard, selection)
+    return _CHECKERS[checker]().select_rules(selection)
+
+
+def rule_count(request: ChunkRequest) -> int:
+    """请求将执行的规则总数（用于进度通知）"""
+    return sum(
+        len(_select(name, request.selection, request.target_standard)) for name in CHUNKED_TOOLS[request.tool]
+    )
+
+
+def analyze_chunk(
+    checkers: Tuple[str, ...],
+    text: str,
+    selection: RuleSelection,
+    target_standard: str,
+    limits: Tuple[Optional[float], Optional[float]],
+    profile: bool = False,
+    core: Optional[Tuple[int, int]] = None,
+    expires: Optional[float] = None
+) -> Dict:
+    """
+    在一个分块上执行各检查器的规则（在工作进程中执行）
+
+    逐个匹配的规则在整段文本（包括重叠上下文）上执行，只保留起点落在分块内的结果，
+    行号改为相对分块的起始行；整体规则只统计分块本身
+
+    Args:
+        checkers: 要执行的检查器
+        text: 分块文本，两侧可以带重叠上下文
+        selection: 规则选择
+        target_standard: 现代化建议的目标标准
+        limits: 执行时限
+        profile: 是否记录各规则的耗时（包括在重叠上下文上的耗时）
+        core: 分块本身在 text 中的范围（必须是切分点），默认为整段文本
+        expires: 请求的截止时刻（见 Deadline），默认从分块开始执行时计算
+
+    Returns:
+        {"parse_ms", "checkers": {名称: {"issues", "tallies", "elapsed_ms"}}, "timeouts", "skipped"}；
+        profile 为 True 时另有 "profile"（各规则耗时，见 cpp_style.profiling）
+    """
+    start = time.perf_counter()
+    source = SourceBuffer(text)
+    source.code
+    lo, hi = core or (0, len(text))
+    core_source = source.section(lo, hi) if (lo, hi) != (0, len(text)) else source
+    parse_ms = (time.perf_counter() - start) * 1000
+    # 分块内的行: [first_line, end_line)
+    first_line = source.line_of(lo)
+    end_line = source.line_of(hi) if hi < len(text) else source.line_count + 1
+
+    deadline = Deadline(*limits, expires=expires)
+    rule_profile = RuleProfile() if profile else None
+    results = {}
+    with profile_rules(rule_profile):
+        for name in checkers:
+            start = time.perf_counter()
+            tallies: Dict = {}
+            rules = _select(name, selection, target_standard)
+            checks = _CHECKERS[name]().checks
+            issues = []
+            for issue in run_rules([rule for rule in rules if not rule.aggregate], source, checks, deadline):
+                if first_line <= issue["line"] < end_line:
+                    if first_line > 1:
+                        issue["line"] -= first_line - 1
+                        issue["end_line"] -= first_line - 1
+                    issues.append(issue)
+            run_rules([rule for rule in rules if rule.aggregate], core_source, checks, deadline, tallies)
+            results[name] = {
+                "issues": issues,
+                "tallies": tallies,
+                "elapsed_ms": (time.perf_counter() - start) * 1000,
+            }
+    output = {
+        "parse_ms": parse_ms,
+        "checkers": results,
+        "timeouts": deadline.timeouts,
+        "skipped": deadline.skipped,
+    }
+    if rule_profile is not None:
+        output["profile"] = rule_profile.rows()
+    return output
+
+
+# ==================== 合并 ====================
+
+def merge_issues(rules: Tuple[Rule, ...], chunks: List[Tuple[int, Dict]]) -> List[Dict]:
+    """
+    按规则顺序合并各分块的结果
+
+    Args:
+        rules: 执行的规则（按注册表顺序）
+        chunks: (分块起始行偏移, 该检查器在分块上的结果)
+
+    Returns:
+        与整文件分析顺序一致的问题列表
+    """
+    grouped = []
+    for line_offset, result in chunks:
+        by_rule: Dict[str, List[Dict]] = {}
+        for issue in result["issues"]:
+            by_rule.setdefault(issue["rule"], []).append(issue)
+        grouped.append((line_offset, by_rule))
+
+    issues: List[Dict] = []
+    for rule in rules:
+        if rule.aggregate:
+            summary = reduce_tallies(rule, (
+                result["tallies"][rule.id] for _, result in chunks if rule.id in result["tallies"]
+            ))
+            if summary is not None:
+                issues.append(summary)
+            continue
+        for line_offset, by_rule in grouped:
+            for issue in by_rule.get(rule.id, ()):
+                if line_offset:
+                    issue["line"] += line_offset
+                    issue["end_line"] += line_offset
+                issues.append(issue)
+    return issues
+
+
+def merge(
+    request: ChunkRequest,
+    starts: List[int],
+    outputs: List[Dict],
+    include_guard: Optional[Dict],
+    limits: Tuple[Optional[float], Optional[float]],
+    elapsed_ms: float
+) -> Tuple[Union[str, Dict], bool]:
+    """
+    合并各分块的结果并生成报告或结构化结果（在服务器进程中执行）
+
+    Args:
+        request: 分块分析请求
+        starts: 各分块的起始偏移
+        outputs: 各分块 analyze_chunk 的结果
+        include_guard: 包含保护检查结果（只用于 analyze_all，跳过时为 None）
+        limits: 执行时限，用于在报告中说明部分结果
+        elapsed_ms: 到目前为止的总耗时
+
+    Returns:
+        (报告、SARIF 日志或结构化结果, 结果是否不完整)
+    """
+    code = request.code
+    line_offsets = []
+    line = 0
+    for previous, start in zip([0] + starts, starts):
+        line += code.count('\n', previous, start)
+        line_offsets.append(line)
+
+    deadline = Deadline(*limits)
+    for output in outputs:
+        for rule_id, reason in output["timeouts"]:
+            if all(rule_id != seen for seen, _ in deadline.timeouts):
+                deadline.timeouts.append((rule_id, reason))
+        deadline.skip(rule_id for rule_id in output["skipped"] if rule_id not in deadline.skipped)
+
+    def checker_issues(name: str) -> List[Dict]:
+        rules = _select(name, request.selection, request.target_standard)
+        return merge_issues(rules, [
+            (line_offset, output["checkers"][name]) for line_offset, output in zip(line_offsets, outputs)
+        ])
+
+    render = request.output_format == "markdown" and not request.compact
+
+    if request.tool != "analyze_all":
+        name = CHUNKED_TOOLS[request.tool][0]
+        issues = checker_issues(name)
+        if not render:
+            return _findings_result(request, starts, rule_findings(name, issues), deadline), deadline.partial
+        if name == "modern_cpp":
+            report = get_modern_cpp_suggester().render(issues, request.target_standard, deadline)
+        else:
+            report = _CHECKERS[name]().render(issues, deadline)
+        return report + _chunk_note(starts), deadline.partial
+
+    analyzer = get_combined_analyzer()
+    registry = get_registry()
+    selection = request.selection or ALL_RULES
+    results: Dict[str, Dict] = {}
+    for name in CHUNKED_TOOLS["analyze_all"]:
+        rules = selection.apply(registry.for_checker(name))
+        if not rules:
+            results[name] = analyzer.skipped("跳过：未选择该检查器的任何规则\n")
+            continue
+        issues = checker_issues(name)
+        if not render:
+            report = ""
+        elif name == "modern_cpp":
+            report = get_modern_cpp_suggester().render(issues, request.target_standard, deadline)
+        else:
+            report = _CHECKERS[name]().render(issues, deadline)
+        results[name] = {
+            "issues": issues,
+            "report": report,
+            "elapsed_ms": max(output["checkers"][name]["elapsed_ms"] for output in outputs),
+        }
+        if deadline.notice(rule.id for rule in rules):
+            results[name]["partial"] = True
+
+    reason = analyzer.include_guard_skip_reason(request.file_path, selection)
+    results["include_guard"] = analyzer.skipped(reason) if reason else include_guard
+
+    if not render:
+        return _findings_result(
+            request, starts, combined_findings(results), deadline,
+            {name: checker_status(result) for name, result in results.items()},
+        ), deadline.partial
+
+    parse_ms = max(output["parse_ms"] for output in outputs)
+    report = analyzer.render(results, code.count('\n') + 1, parse_ms, elapsed_ms)
+    return report + _chunk_note(starts), deadline.partial
+
+
+def _findings_result(
+    request: ChunkRequest,
+    starts: List[int],
+    findings: FindingSet,
+    deadline: Deadline,
+    checkers: Optional[Dict[str, Dict]] = None
+) -> Union[str, Dict]:
+    """紧凑报告、SARIF 日志（指纹按整个文件的行计算）或 json 结构化结果"""
+    if request.output_format == "sarif":
+        return sarif.render(findings, SourceBuffer(request.code), request.file_path, deadline)
+    if request.output_format == "markdown":
+        return compact.render(request.tool, findings, request.compact, deadline, checkers) + _chunk_note(starts)
+    return structured(request.tool, findings, deadline, checkers, request.compact)
+
+
+def _chunk_note(starts: List[int]) -> str:
+    return f"\n> 大文件分块分析：{len(starts)} 个分块并行执行，结果已合并\n"
@@ -0,0 +1,149 @@
+"""
+紧凑报告
+
+真实项目的源文件上，指针/引用参数、大对象传值等规则可能报告上千个几乎相同的 info
+问题，完整报告逐条列出后远超客户端的消息上限和模型的上下文预算。
+verbosity="compact" 时报告改由 FindingSet 生成：
+
+- 同一规则的问题合并为一项：数量、建议和前 max_issues 个位置
+- 不附带各检查器报告末尾的固定指南
+- 报告长度有硬上限 COMPACT_LIMIT_BYTES，超出时按规则整项省略并说明省略的数量
+"""
+
+from typing import Dict, List, Optional
+
+from cpp_style.deadline import Deadline
+from cpp_style.output import FindingSet
+
+# 紧凑报告的长度上限（UTF-8 字节）
+COMPACT_LIMIT_BYTES = 16 * 1024
+# 每条规则默认列出的位置数
+DEFAULT_MAX_ISSUES = 5
+
+# 位置中代码片段的最大长度
+_CODE_WIDTH = 80
+# 为结尾说明预留的字节数
+_FOOTER_BYTES = 512
+
+# 各工具的报告标题
+_TITLES = {
+    "analyze_memory_safety": "内存安全分析报告",
+    "check_const_correctness": "const 正确性检查报告",
+    "suggest_modern_cpp": "现代 C++ 升级建议",
+    "analyze_all": "C++ 综合分析报告",
+}
+
+_SEVERITY_ORDER = {"error": 0, "warning": 1, "info": 2}
+_ICONS = {"error": "🔴", "warning": "🟡", "info": "🔵"}
+
+
+def render(
+    tool: str,
+    findings: FindingSet,
+    max_issues: int = DEFAULT_MAX_ISSUES,
+    deadline: Optional[Deadline] = None,
+    checkers: Optional[Dict[str, Dict]] = None
+) -> str:
+    """
+    生成紧凑报告
+
+    Args:
+        tool: 工具名（决定报告标题）
+        findings: 问题列表
+        max_issues: 每条规则列出的位置数
+        deadline: 执行时使用的截止时间，用于说明部分结果
+        checkers: analyze_all 的各检查器执行情况（output.checker_status）
+
+    Returns:
+        Markdown 报告，长度不超过 COMPACT_LIMIT_BYTES
+    """
+    by_rule: Dict[str, List[Dict]] = {}
+    by_severity = {"error": 0, "warning": 0, "info": 0}
+    for finding in findings.items:
+        by_rule.setdefault(finding["rule"], []).append(finding)
+        by_severity[finding["severity"]] += 1
+
+    head = f"# 📋 {_TITLES[tool]}（紧凑模式）\n\n"
+    if findings.items:
+        head += (
+            f"**结果**: {len(findings.items)} 个问题，涉及 {len(by_rule)} 条规则"
+            f"（🔴 {by_severity['error']} / 🟡 {by_severity['warning']} / 🔵 {by_severity['info']}）\n"
+        )
+    else:
+        head += "**结果**: ✅ 未发现问题\n"
+    if checkers:
+        # 只有 analyze_all 传入 checkers，其他工具的紧凑报告不需要导入综合分析器
+        from cpp_style.tools.combined_analyzer import CombinedAnalyzer
+        head += "**检查器**: " + " · ".join(
+            f"{CombinedAnalyzer.SECTION_TITLES[name]} {_checker_summary(status)}" for name, status in checkers.items()
+        ) + "\n"
+    head += "\n"
+
+    notice = deadline.notice() if deadline is not None else ""
+    budget = COMPACT_LIMIT_BYTES - _FOOTER_BYTES - len(head.encode()) - len(notice.encode())
+
+    # 严重程度高的规则在前，同级别按首次出现的顺序
+    ordered = sorted(by_rule, key=lambda rule_id: _SEVERITY_ORDER[by_rule[rule_id][0]["severity"]])
+    sections = []
+    omitted_rules = omitted_findings = 0
+    for rule_id in ordered:
+        section = _rule_section(rule_id, findings.rules[rule_id], by_rule[rule_id], max_issues)
+        size = len(section.encode())
+        if omitted_rules or size > budget:
+            omitted_rules += 1
+            omitted_findings += len(by_rule[rule_id])
+            continue
+        budget -= size
+        sections.append(section)
+
+    report = head + "".join(sections) + notice
+    if omitted_rules:
+        report += (
+            f"\n> 报告已达到长度上限（{COMPACT_LIMIT_BYTES // 1024} KB），其余 {omitted_rules} 条规则的 "
+            f"{omitted_findings} 个问题已省略；使用 output_format=\"json\" 获取完整结果\n"
+        )
+    return report
+
+
+def _checker_summary(status: Dict) -> str:
+    """检查器执行情况的简短说明"""
+    if status["status"] == "skipped":
+        return "跳过"
+    summary = f"{status['findings']} 项"
+    if status["status"] == "partial":
+        summary += "（部分结果）"
+    return summary
+
+
+def _rule_section(rule_id: str, info: Dict, items: List[Dict], max_issues: int) -> str:
+    """一条规则的汇总：数量、建议和前 max_issues 个位置"""
+    section = f"### {_ICONS[info['severity']]} `{rule_id}` {info['name']} — {len(items)} 处\n\n"
+    suggestion = info.get("suggestion") or items[0].get("suggestion")
+    if suggestion:
+        section += f"**建议**: {suggestion}\n\n"
+
+    for finding in items[:max_issues]:
+        section += f"- {_location(finding, info['name'])}\n"
+    if len(items) > max_issues:
+        section += f"- …另有 {len(items) - max_issues} 处\n"
+    return section + "\n"
+
+
+def _location(finding: Dict, rule_name: str) -> str:
+    """单个问题的一行描述：行号、代码片段，消息与规则名称不同时附上消息"""
+    data = finding.get("data") or {}
+    if "old_pattern" in data:
+        return f"{data['old_pattern']} → {data['new_pattern']}"
+
+    parts = []
+    if finding.get("range"):
+        parts.append(f"第 {finding['range'][0]} 行")
+    code = finding.get("code")
+    if code:
+        code = " ".join(code.split())
+        if len(code) > _CODE_WIDTH:
+            code = code[:_CODE_WIDTH - 1] + "…"
+        parts.append(f"`{code}`")
+    if finding["message"] != rule_name or not parts:
+        parts.append(finding["message"])
+    return " ".join(parts)
@@ -0,0 +1,117 @@
+"""
+数据集存储
+
+cpp_style/data/*.json 统一由 DataStore 加载：每个文件在每个进程中最多读取、解析一次，
+检查器、资源和规则注册表共享同一份解析结果（例如 naming_conventions.json 同时用于
+命名检查和命名规范资源）。
+
+返回的内容是只读视图：dict 转换为 MappingProxyType，list 转换为 tuple，共享对象
+不会被某个使用方意外修改。每个数据集记录原始内容的哈希、大小和加载耗时。
+
+有构建时生成的数据快照（见 cpp_style.data.snapshot）时，数据集直接取自快照，不再读取 JSON。
+"""
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from cpp_style.data.snapshot import Snapshot, get_snapshot
+
+DATA_DIR = Path(__file__).parent
+
+
+class Dataset(NamedTuple):
+    """一个已加载的数据集"""
+    name: str
+    content: Any
+    sha256: str
+    size: int
+    load_ms: float
+
+
+def freeze(value: Any) -> Any:
+    """把解析后的 JSON 转换为只读视图（dict -> MappingProxyType，list -> tuple）"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class DataStore:
+    """数据集存储：按名称（文件名去掉 .json）加载，每个数据集只加载一次"""
+
+    def __init__(self, data_dir: Path = DATA_DIR, snapshot: Optional[Snapshot] = None):
+        """
+        Args:
+            data_dir: JSON 数据集所在目录
+            snapshot: 数据快照，其中的数据集不再读取 JSON
+        """
+        self.data_dir = data_dir
+        self.snapshot = snapshot
+        self._datasets: Dict[str, Dataset] = {}
+        self._lock = threading.Lock()
+
+    def names(self, prefix: str = "") -> List[str]:
+        """可用的数据集名称（按名称排序），可以按前缀过滤"""
+        return sorted(path.stem for path in self.data_dir.glob(f"{prefix}*.json"))
+
+    def load(self, name: str) -> Any:
+        """数据集的只读内容"""
+        return self.dataset(name).content
+
+    def dataset(self, name: str) -> Dataset:
+        """
+        获取数据集，首次访问时读取并解析
+
+        Raises:
+            FileNotFoundError: 数据集不存在
+        """
+        dataset = self._datasets.get(name)
+        if dataset is not None:
+            return dataset
+        with self._lock:
+            dataset = self._datasets.get(name)
+            if dataset is None:
+                start = time.perf_counter()
+                if self.snapshot is not None and name in self.snapshot.datasets:
+                    content, sha256, size = self.snapshot.datasets[name]
+                else:
+                    raw = (self.data_dir / f"{name}.json").read_bytes()
+                    content, sha256, size = json.loads(raw), hashlib.sha256(raw).hexdigest(), len(raw)
+                dataset = Dataset(
+                    name=name,
+                    content=freeze(content),
+                    sha256=sha256,
+                    size=size,
+                    load_ms=(time.perf_counter() - start) * 1000,
+                )
+                self._datasets[name] = dataset
+        return dataset
+
+    def loaded(self) -> Dict[str, Dataset]:
+        """已加载的数据集（名称 -> Dataset，按加载顺序），用于查看加载耗时"""
+        return dict(self._datasets)
+
+    def digest(self) -> str:
+        """所有数据集内容的汇总哈希（会加载尚未加载的数据集）"""
+        digest = hashlib.sha256()
+        for name in self.names():
+            digest.update(name.encode('utf-8'))
+            digest.update(self.dataset(name).sha256.encode('ascii'))
+        return digest.hexdigest()
+
+
+# 全局实例
+_store: Optional[DataStore] = None
+
+def get_store() -> DataStore:
+    """获取全局数据集存储（有可用的数据快照时使用快照）"""
+    global _store
+    if _store is None:
+        _store = DataStore(snapshot=get_snapshot())
+    return _store
@@ -0,0 +1,10 @@
+"""生成数据快照: python -m cpp_style.data（见 cpp_style.data.snapshot）"""
+
+from cpp_style.data.snapshot import SNAPSHOT_PATH, build
+
+snapshot = build()
+print(
+    f"数据快照已写入 {SNAPSHOT_PATH}（{SNAPSHOT_PATH.stat().st_size} 字节，"
+    f"{len(snapshot.datasets)} 个数据集，{sum(map(len, snapshot.documents.values()))} 个文档，"
+    f"{sum(map(len, snapshot.rule_ids.values()))} 条规则，{snapshot.load_ms:.1f} ms）"
+)
@@ -0,0 +1,151 @@
+"""
+数据快照
+
+构建镜像时运行 python -m cpp_style.data，把所有静态内容预先计算好，写入一个
+快照文件：
+
+- 各数据集解析后的内容、哈希和大小
+- 各资源渲染好的全部文档
+- 规则表（各检查器的规则 ID，校验 rules/exclude_rules 参数时不必编译规则）
+
+运行时只需一次读取即可加载整个快照，不再逐个解析 JSON、渲染文档。快照记录格式版本、
+包版本号和各输入文件（数据集、渲染文档和规则表的代码）的大小与修改时间，与 .pyc 的
+校验方式相同；任何一项不一致、文件缺失或损坏时忽略快照，回退为读取 JSON。
+
+正则表达式的编译结果无法序列化（pickle 在加载时重新编译），规则模式仍在第一次使用时
+由快照中的数据集编译。
+"""
+
+import hashlib
+import importlib
+import io
+import json
+import logging
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from cpp_style import __version__
+
+logger = logging.getLogger(__name__)
+
+# 快照格式版本，快照内容的结构变化时递增
+SNAPSHOT_FORMAT = 1
+# 快照文件路径
+SNAPSHOT_PATH = Path(os.environ.get("CPP_STYLE_SNAPSHOT", str(Path(__file__).parent / "snapshot.pickle")))
+
+_PACKAGE_DIR = Path(__file__).parent.parent
+# 快照内容依赖的文件（相对 cpp_style/）
+_INPUTS = ("data/*.json", "data/__init__.py", "data/snapshot.py", "rules.py", "resources/*.py")
+# 预先渲染文档的资源模块（cpp_style.resources 下的模块名，也是快照中文档的键）
+RESOURCES = ("naming_rules", "best_practices", "cpp_standards", "design_patterns", "rule_catalog")
+
+# 输入文件的指纹: ((相对路径, 大小, 修改时间 ns), ...)
+Fingerprint = Tuple[Tuple[str, int, int], ...]
+
+
+class Snapshot(NamedTuple):
+    """已加载的数据快照"""
+    # 数据集名称 -> (解析后的内容, sha256, 大小)；内容未冻结，由 DataStore 转换为只读视图
+    datasets: Dict[str, Tuple[Any, str, int]]
+    # 资源模块名 -> 文档键 -> 文档文本
+    documents: Dict[str, Dict[str, str]]
+    # 检查器 -> 规则 ID（按定义顺序）
+    rule_ids: Dict[str, Tuple[str, ...]]
+    # 加载耗时（毫秒）
+    load_ms: float
+
+
+def fingerprint() -> Fingerprint:
+    """快照各输入文件的当前指纹"""
+    paths = sorted({path for pattern in _INPUTS for path in _PACKAGE_DIR.glob(pattern)})
+    entries = []
+    for path in paths:
+        stat = path.stat()
+        entries.append((path.relative_to(_PACKAGE_DIR).as_posix(), stat.st_size, stat.st_mtime_ns))
+    return tuple(entries)
+
+
+def _header() -> Dict[str, Any]:
+    """快照头：与当前代码和数据不一致的快照视为过期"""
+    return {"format": SNAPSHOT_FORMAT, "version": __version__, "inputs": fingerprint()}
+
+
+def load(path: Path = SNAPSHOT_PATH) -> Optional[Snapshot]:
+    """
+    加载快照文件（一次读取）
+
+    Returns:
+        快照；文件不存在、已过期或无法解析时返回 None
+    """
+    start = time.perf_counter()
+    try:
+        stream = io.BytesIO(path.read_bytes())
+    except FileNotFoundError:
+        logger.debug("数据快照不存在: %s", path)
+        return None
+    except OSError as e:
+        logger.warning("无法读取数据快照 %s: %s，改为读取 JSON", path, e)
+        return None
+
+    try:
+        # 先只解析文件头，过期时不必解析内容
+        if pickle.load(stream) != _header():
+            logger.warning("数据快照已过期: %s，改为读取 JSON（重新运行 python -m cpp_style.data）", path)
+            return None
+        datasets, documents, rule_ids = pickle.load(stream)
+    except Exception as e:
+        logger.warning("无法解析数据快照 %s: %s，改为读取 JSON", path, e)
+        return None
+    return Snapshot(datasets, documents, rule_ids, (time.perf_counter() - start) * 1000)
+
+
+def build(path: Path = SNAPSHOT_PATH) -> Snapshot:
+    """
+    由 JSON 数据集生成快照并写入文件（先写临时文件再替换，不会留下不完整的快照）
+
+    应在一个新进程中调用（python -m cpp_style.data），保证各单例都由 JSON 构建
+    """
+    global _snapshot, _snapshot_loaded
+    # 构建期间不使用已有的快照
+    _snapshot, _snapshot_loaded = None, True
+
+    from cpp_style.data import DATA_DIR, get_store
+    from cpp_style.rules import get_registry
+
+    start = time.perf_counter()
+    datasets = {}
+    for name in get_store().names():
+        raw = (DATA_DIR / f"{name}.json").read_bytes()
+        datasets[name] = (json.loads(raw), hashlib.sha256(raw).hexdigest(), len(raw))
+
+    documents = {}
+    for name in RESOURCES:
+        resource = importlib.import_module(f"cpp_style.resources.{name}").get_resource()
+        documents[name] = {key: document.text for key, document in resource.documents.items()}
+
+    registry = get_registry()
+    rule_ids = {checker: tuple(rule.id for rule in registry.for_checker(checker)) for checker in registry.checkers()}
+
+    temp = path.with_name(path.name + ".tmp")
+    with open(temp, "wb") as f:
+        pickle.dump(_header(), f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump((datasets, documents, rule_ids), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp, path)
+    return Snapshot(datasets, documents, rule_ids, (time.perf_counter() - start) * 1000)
+
+
+# 全局实例（None 表示没有可用的快照）
+_snapshot: Optional[Snapshot] = None
+_snapshot_loaded = False
+
+def get_snapshot() -> Optional[Snapshot]:
+    """获取全局数据快照，首次调用时加载；没有可用的快照时返回 None"""
+    global _snapshot, _snapshot_loaded
+    if not _snapshot_loaded:
+        _snapshot = load()
+        _snapshot_loaded = True
+    return _snapshot
+
@@ -0,0 +1,171 @@
+"""
+请求截止时间与单条规则预算
+
+某些正则在对抗性或自动生成的输入上可能严重回溯，一个请求就能占满单核 VM。
+Deadline 为整个请求设定截止时间，并为每条规则设定执行预算：
+
+- 主线程中由 SIGALRM 看门狗中断正在执行的规则。CPython 的正则引擎在匹配过程中
+  会定期检查信号，因此即使卡在单次回溯中也能被中止
+- 其他线程或不支持 setitimer 的平台上，退化为在匹配之间进行协作式检查
+
+超时的规则被中止，已经找到的结果保留；请求截止时间到达后剩余规则不再执行。
+"""
+
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+_HAS_ITIMER = hasattr(signal, "setitimer") and hasattr(signal, "SIGALRM")
+
+
+class RuleTimeout(Exception):
+    """规则执行超出预算或请求截止时间"""
+
+    def __init__(self, rule_id: str, reason: str):
+        super().__init__(f"{rule_id}: {reason}")
+        self.rule_id = rule_id
+        self.reason = reason
+
+
+class Deadline:
+    """单个请求的截止时间和规则预算"""
+
+    BUDGET = "budget"
+    DEADLINE = "deadline"
+
+    def __init__(
+        self,
+        total: Optional[float] = None,
+        rule_budget: Optional[float] = None,
+        expires: Optional[float] = None
+    ):
+        """
+        Args:
+            total: 整个请求的时间上限（秒），None 表示不限
+            rule_budget: 单条规则的时间上限（秒），None 表示不限
+            expires: 请求的截止时刻（time.monotonic()），默认为现在起 total 秒之后。
+                请求到达时算出、传给工作进程，排队等待的时间也计入（time.monotonic()
+                基于系统范围的单调时钟，同一台机器上的进程之间可以直接比较）
+        """
+        self.total = total
+        self.rule_budget = rule_budget
+        self.started = time.monotonic()
+        if expires is None and total:
+            expires = self.started + total
+        self.expires = expires
+        # 被中止的规则: (规则 ID, 原因)
+        self.timeouts: List[Tuple[str, str]] = []
+        # 因请求截止时间到达而未执行的规则
+        self.skipped: List[str] = []
+        self._rule_id: Optional[str] = None
+        self._rule_expires: Optional[float] = None
+
+    @property
+    def expired(self) -> bool:
+        """请求截止时间是否已到"""
+        return self.expires is not None and time.monotonic() >= self.expires
+
+    @property
+    def partial(self) -> bool:
+        """结果是否不完整"""
+        return bool(self.timeouts or self.skipped)
+
+    def _limit(self) -> Tuple[Optional[float], str]:
+        """当前规则的截止时刻及到期原因"""
+        now = time.monotonic()
+        rule_expires = now + self.rule_budget if self.rule_budget else None
+        if self.expires is not None and (rule_expires is None or self.expires <= rule_expires):
+            return self.expires, self.DEADLINE
+        return rule_expires, self.BUDGET
+
+    @contextmanager
+    def guard(self, rule_id: str) -> Iterator[None]:
+        """
+        在预算内执行一条规则
+
+        Raises:
+            RuleTimeout: 规则超时（已记录在 timeouts 中）
+        """
+        expires, reason = self._limit()
+        if expires is not None and expires <= time.monotonic():
+            self.skipped.append(rule_id)
+            raise RuleTimeout(rule_id, self.DEADLINE)
+
+        self._rule_id = rule_id
+        self._rule_expires = expires
+        watchdog = _Watchdog.arm(self, expires) if expires is not None else None
+        try:
+            yield
+        except RuleTimeout as e:
+            self.timeouts.append((rule_id, reason))
+            raise RuleTimeout(rule_id, reason) from e
+        finally:
+            if watchdog is not None:
+                watchdog.disarm()
+            self._rule_id = None
+            self._rule_expires = None
+
+    def check(self) -> None:
+        """协作式检查：当前规则超时时抛出 RuleTimeout"""
+        if self._rule_expires is not None and time.monotonic() >= self._rule_expires:
+            raise RuleTimeout(self._rule_id or "", "timeout")
+
+    def skip(self, rule_ids: Iterable[str]) -> None:
+        """记录因截止时间到达而未执行的规则"""
+        self.skipped.extend(rule_ids)
+
+    def notice(self, rule_ids: Optional[Iterable[str]] = None) -> str:
+        """
+        生成部分结果说明
+
+        Args:
+            rule_ids: 只说明这些规则（默认全部）
+
+        Returns:
+            Markdown 说明；结果完整时返回空字符串
+        """
+        wanted = set(rule_ids) if rule_ids is not None else None
+        timeouts = [(rid, reason) for rid, reason in self.timeouts if wanted is None or rid in wanted]
+        skipped = [rid for rid in self.skipped if wanted is None or rid in wanted]
+        if not timeouts and not skipped:
+            return ""
+
+        text = "\n## ⚠️ 部分结果\n\n"
+        for rule_id, reason in timeouts:
+            if reason == self.BUDGET:
+                text += f"- 规则 `{rule_id}` 超出单条规则预算（{self.rule_budget * 1000:.0f} ms），已中止，只保留中止前的结果\n"
+            else:
+                text += f"- 规则 `{rule_id}` 执行时到达请求截止时间（{self.total * 1000:.0f} ms），已中止，只保留中止前的结果\n"
+        if skipped:
+            text += f"- 请求截止时间已到，未执行的规则: {', '.join(f'`{rid}`' for rid in skipped)}\n"
+        return text
+
+
+class _Watchdog:
+    """基于 SIGALRM 的看门狗（只能在主线程中使用）"""
+
+    def __init__(self, deadline: Deadline):
+        self.deadline = deadline
+        self.active = True
+        self.previous = None
+
+    @classmethod
+    def arm(cls, deadline: Deadline, expires: float) -> Optional['_Watchdog']:
+        """在主线程中启动计时器；其他线程返回 None（只做协作式检查）"""
+        if not _HAS_ITIMER or threading.current_thread() is not threading.main_thread():
+            return None
+        watchdog = cls(deadline)
+        watchdog.previous = signal.signal(signal.SIGALRM, watchdog._fire)
+        signal.setitimer(signal.ITIMER_REAL, max(expires - time.monotonic(), 0.001))
+        return watchdog
+
+    def _fire(self, signum, frame) -> None:
+        if self.active:
+            raise RuleTimeout(self.deadline._rule_id or "", "timeout")
+
+    def disarm(self) -> None:
+        self.active = False
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, self.previous or signal.SIG_DFL)
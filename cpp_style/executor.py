@@ -0,0 +1,743 @@
+"""
+分析任务执行器
+
+streamable-http 模式下，同步工具直接在 uvicorn 的事件循环中执行，一次耗时数秒的
+分析会阻塞其他所有请求（包括 /health）。AnalysisExecutor 把 CPU 密集的分析任务
+交给进程池，异步工具处理函数只等待结果：事件循环保持响应，吞吐量随 CPU 核数扩展。
+
+- 工作进程由 forkserver 派生，forkserver 预先导入 cpp_style.tools（规则正则在导入时
+  编译），各工作进程共享这部分内存页
+- 工作进程启动时构建各检查器单例，第一个请求不再承担初始化开销
+- 任务在工作进程的主线程中执行，截止时间的 SIGALRM 看门狗照常生效
+- workers=0 时不创建进程池，任务在调用方直接执行（stdio 模式的默认行为）
+- AdmissionControl 限制同时执行的分析数，排队长度有上限，队列满时立即拒绝新请求
+- 超过 chunk_bytes 的输入在顶层声明边界处切分，由多个工作进程并行分析（见 cpp_style.chunking）
+- 调用方提供 progress 回调时，每条规则（分块分析时每个分块）完成后发送一条结果摘要：
+  工作进程把摘要写入共享队列，服务器进程的读取线程转交给事件循环，再由回调发出
+  MCP 进度通知，客户端不必等完整报告生成就能看到最先发现的问题
+"""
+
+import asyncio
+import inspect
+import itertools
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from contextlib import asynccontextmanager
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from cpp_style import chunking, output, sarif
+from cpp_style import compact as compact_report
+from cpp_style.deadline import Deadline
+from cpp_style.output import NamingOutputFormat, OutputFormat
+from cpp_style.profiling import RuleProfile
+from cpp_style.rules import Rule, RuleSelection, observe_rules, profile_rules
+from cpp_style.source_buffer import SourceBuffer
+from cpp_style.lazy import lazy
+
+# 检查器在第一次执行任务时才导入（进程池模式下主进程通常不需要导入）
+get_combined_analyzer = lazy("cpp_style.tools.combined_analyzer:get_analyzer")
+get_const_checker = lazy("cpp_style.tools.const_checker:get_checker")
+get_identifier_extractor = lazy("cpp_style.tools.identifier_extractor:get_extractor")
+get_memory_analyzer = lazy("cpp_style.tools.memory_safety:get_analyzer")
+get_modern_cpp_suggester = lazy("cpp_style.tools.modern_cpp:get_suggester")
+get_naming_checker = lazy("cpp_style.tools.naming_checker:get_checker")
+_CHECKERS = (
+    get_memory_analyzer, get_modern_cpp_suggester, get_const_checker,
+    get_combined_analyzer, get_identifier_extractor, get_naming_checker,
+)
+
+logger = logging.getLogger(__name__)
+
+# forkserver 预先导入的模块（工作进程从 forkserver 派生，直接继承已导入的模块）。
+# 包含 __main__ 是因为 multiprocessing 会在每个新进程中导入主模块（服务器入口），
+# 在 forkserver 中导入一次后，工作进程不再各自重复导入（每个约 0.6 秒、20 多 MB）。
+# 因此服务器入口在导入时只能创建纯内存对象：持久化结果存储在首次使用时按进程打开
+# SQLite 连接，进程池只在 start() 中创建，工作进程不会继承连接、线程或文件描述符。
+# 服务器入口不再导入检查器模块，这里显式列出，工作进程启动时不必各自导入
+_PRELOAD = ["__main__", "cpp_style.executor", *(getter.module for getter in _CHECKERS)]
+
+# 执行时限: (请求截止时间, 单条规则预算)，单位秒，None 表示不限
+Limits = Tuple[Optional[float], Optional[float]]
+
+# 进度回调: (已完成数, 总数, 消息)，与 FastMCP Context.report_progress 的参数一致
+Progress = Callable[[float, Optional[float], Optional[str]], Awaitable[None]]
+
+# 进度事件: (任务编号, 消息)；消息为 None 表示该任务的事件已全部发出
+ProgressEvent = Tuple[int, Optional[str]]
+
+# 每条进度消息最多列出的问题数
+_PROGRESS_FINDINGS = 5
+# 任务完成后等待剩余进度事件到达的最长时间（秒）
+_PROGRESS_FLUSH_TIMEOUT = 1.0
+# 停止进度读取线程时等待它退出的最长时间（秒）
+_READER_STOP_TIMEOUT = 1.0
+
+# 工作进程中的进度队列（由 _init_worker 设置）
+_progress_queue = None
+
+
+# ==================== 任务 ====================
+# 任务函数在工作进程中执行，参数和返回值都必须可以 pickle。
+# 返回 markdown 报告；output_format="json" 时返回结构化结果（见 cpp_style.output），
+# "sarif" 时返回 SARIF 日志文本（见 cpp_style.sarif）。
+# compact 为每条规则列出的问题数，非 0 时 markdown 报告改为紧凑报告（见 cpp_style.compact），
+# json 结果每条规则只返回前 compact 个问题
+
+# 任务结果：markdown 报告、SARIF 日志或结构化结果 dict
+TaskResult = Union[str, Dict]
+
+# 任务执行结果: (任务结果, 结果是否不完整, 规则 ID -> 发现的问题数, 各规则耗时（未请求时为 None）)
+TaskOutcome = Tuple[TaskResult, bool, Dict[str, int], Optional[List[Dict]]]
+
+
+def _findings_result(
+    tool: str,
+    output_format: OutputFormat,
+    findings: output.FindingSet,
+    source: SourceBuffer,
+    file_path: Optional[str],
+    deadline: Deadline,
+    compact: int,
+    checkers: Optional[Dict[str, Dict]] = None
+) -> TaskResult:
+    """由问题列表生成的任务结果：紧凑报告、SARIF 日志或 json 结构化结果"""
+    if output_format == "sarif":
+        return sarif.render(findings, source, file_path, deadline)
+    if output_format == "markdown":
+        return compact_report.render(tool, findings, compact, deadline, checkers)
+    return output.structured(tool, findings, deadline, checkers, compact)
+
+
+def _analyze_memory_safety(
+    deadline: Deadline, code: str, selection: RuleSelection, file_path: Optional[str] = None,
+    compact: int = 0, output_format: OutputFormat = "markdown"
+) -> TaskResult:
+    render = output_format == "markdown" and not compact
+    source = SourceBuffer(code)
+    issues, report = get_memory_analyzer().analyze_memory_safety(source, selection, deadline, render)
+    if render:
+        return report
+    return _findings_result(
+        "analyze_memory_safety", output_format, output.rule_findings("memory_safety", issues),
+        source, file_path, deadline, compact,
+    )
+
+
+def _suggest_modern_cpp(
+    deadline: Deadline, code: str, target_standard: str, selection: RuleSelection,
+    file_path: Optional[str] = None, compact: int = 0, output_format: OutputFormat = "markdown"
+) -> TaskResult:
+    render = output_format == "markdown" and not compact
+    source = SourceBuffer(code)
+    suggestions, report = get_modern_cpp_suggester().suggest_modern_cpp(
+        source, target_standard, selection, deadline, render)
+    if render:
+        return report
+    return _findings_result(
+        "suggest_modern_cpp", output_format, output.rule_findings("modern_cpp", suggestions),
+        source, file_path, deadline, compact,
+    )
+
+
+def _check_const_correctness(
+    deadline: Deadline, code: str, selection: RuleSelection, file_path: Optional[str] = None,
+    compact: int = 0, output_format: OutputFormat = "markdown"
+) -> TaskResult:
+    render = output_format == "markdown" and not compact
+    source = SourceBuffer(code)
+    issues, report = get_const_checker().check_const_correctness(source, selection, deadline, render)
+    if render:
+        return report
+    return _findings_result(
+        "check_const_correctness", output_format, output.rule_findings("const_correctness", issues),
+        source, file_path, deadline, compact,
+    )
+
+
+def _analyze_all(
+    deadline: Deadline, code: str, file_path: Optional[str], target_standard: str, selection: RuleSelection,
+    compact: int = 0, output_format: OutputFormat = "markdown"
+) -> TaskResult:
+    render = output_format == "markdown" and not compact
+    source = SourceBuffer(code)
+    results, report = get_combined_analyzer().analyze_all(
+        source, file_path, target_standard, selection, deadline, render)
+    if render:
+        return report
+    return _findings_result(
+        "analyze_all", output_format, output.combined_findings(results), source, file_path, deadline, compact,
+        {name: output.checker_status(result) for name, result in results.items()},
+    )
+
+
+def _check_naming_in_code(
+    deadline: Deadline, code: str, output_format: NamingOutputFormat = "markdown"
+) -> TaskResult:
+    json_output = output_format == "json"
+    issues, report = get_identifier_extractor().check_code_naming(code, not json_output)
+    if json_output:
+        findings = output.FindingSet()
+        findings.add_naming(issues)
+        return output.structured("check_naming_in_code", findings)
+    return report
+
+
+def _check_naming_batch(
+    deadline: Deadline, items: Tuple[Tuple[str, str], ...], output_format: NamingOutputFormat = "markdown"
+) -> TaskResult:
+    json_output = output_format == "json"
+    failures, report = get_naming_checker().check_naming_batch(items, not json_output)
+    if json_output:
+        findings = output.FindingSet()
+        findings.add_naming(failures)
+        return output.structured("check_naming_batch", findings)
+    return report
+
+
+_TASKS: Dict[str, Callable[..., TaskResult]] = {
+    "analyze_memory_safety": _analyze_memory_safety,
+    "suggest_modern_cpp": _suggest_modern_cpp,
+    "check_const_correctness": _check_const_correctness,
+    "analyze_all": _analyze_all,
+    "check_naming_in_code": _check_naming_in_code,
+    "check_naming_batch": _check_naming_batch,
+}
+
+
+def run_task(
+    name: str,
+    args: Tuple[Any, ...],
+    limits: Limits,
+    task_id: Optional[int] = None,
+    publish: Optional[Callable[[ProgressEvent], None]] = None,
+    profile: bool = False,
+    expires: Optional[float] = None
+) -> TaskOutcome:
+    """
+    执行一个分析任务
+
+    Args:
+        name: 任务名（与工具名相同）
+        args: 任务参数
+        limits: 执行时限
+        task_id: 进度事件的任务编号，None 表示不发送进度
+        publish: 进度事件的发送函数（默认写入工作进程的进度队列）
+        profile: 是否记录各规则的耗时（见 cpp_style.profiling）
+        expires: 请求的截止时刻（见 Deadline），默认从任务开始执行时计算
+
+    Returns:
+        (报告或结构化结果, 结果是否不完整, 各规则发现的问题数, 各规则耗时)
+    """
+    deadline = Deadline(*limits, expires=expires)
+    counts: Dict[str, int] = {}
+    if task_id is not None:
+        publish = publish or _progress_queue.put
+
+    def observer(rule: Rule, found: List[Dict]) -> None:
+        if found:
+            counts[rule.id] = counts.get(rule.id, 0) + len(found)
+        if task_id is not None:
+            publish((task_id, describe_findings(rule.id, found)))
+
+    rule_profile = RuleProfile() if profile else None
+    try:
+        with observe_rules(observer), profile_rules(rule_profile):
+            report = _TASKS[name](deadline, *args)
+    finally:
+        if task_id is not None:
+            publish((task_id, None))
+    return report, deadline.partial, counts, rule_profile.rows() if rule_profile is not None else None
+
+
+def describe_findings(label: str, findings: List[Dict], line_offset: int = 0) -> str:
+    """
+    进度消息：发现的问题数和前几个问题
+
+    Args:
+        label: 消息标题（规则 ID 或分块说明）
+        findings: 发现的问题
+        line_offset: 行号偏移（分块结果需要加上分块的起始行）
+    """
+    if not findings:
+        return f"{label}: 未发现问题"
+    lines = [f"{label}: {len(findings)} 项"]
+    for issue in findings[:_PROGRESS_FINDINGS]:
+        where = f"第 {issue['line'] + line_offset} 行" if issue.get('line', 0) > 0 else "整体"
+        text = issue.get('message') or issue.get('feature', '')
+        lines.append(f"- {where} [{issue.get('severity', 'info')}] {issue['rule']}: {text}")
+    if len(findings) > _PROGRESS_FINDINGS:
+        lines.append(f"- …… 另有 {len(findings) - _PROGRESS_FINDINGS} 项")
+    return "\n".join(lines)
+
+
+def _init_worker(progress_queue=None) -> None:
+    """工作进程初始化：忽略 Ctrl+C（由主进程统一关闭），构建各检查器单例"""
+    global _progress_queue
+    _progress_queue = progress_queue
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for getter in _CHECKERS:
+        getter()
+
+
+def _ready() -> int:
+    """空任务，用于在启动（和重建）时拉起全部工作进程"""
+    return os.getpid()
+
+
+# ==================== 准入控制 ====================
+
+class ServerBusy(RuntimeError):
+    """等待执行的请求已达排队上限"""
+
+
+class AdmissionControl:
+    """
+    分析请求的准入控制
+
+    同时执行的分析不超过 max_in_flight 个，其余请求按到达顺序排队；排队请求数达到
+    max_queue 时新请求立即以 ServerBusy 失败，突发流量不会在内存有限的机器上无限堆积。
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int):
+        """
+        Args:
+            max_in_flight: 同时执行的分析数上限
+            max_queue: 排队等待的请求数上限，0 表示不排队（满载时直接拒绝）
+        """
+        self.max_in_flight = max(max_in_flight, 1)
+        self.max_queue = max(max_queue, 0)
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self.in_flight = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        占用一个执行名额，名额已满时排队等待
+
+        Raises:
+            ServerBusy: 排队请求数已达上限
+        """
+        if self._semaphore.locked() and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise ServerBusy(
+                f"服务器繁忙：{self.in_flight} 个分析正在执行，{self.queued} 个请求正在排队，请稍后重试"
+            )
+
+        started = time.monotonic()
+        self.queued += 1
+        self.peak_queued = max(self.peak_queued, self.queued)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        waited = time.monotonic() - started
+        self.admitted += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """准入控制统计（用于 /health）"""
+        return {
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait_avg_ms": round(self.wait_total / self.admitted * 1000, 2) if self.admitted else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 2),
+        }
+
+
+# ==================== 进度通知 ====================
+
+class ProgressStream:
+    """
+    一次请求的进度通知
+
+    每条规则（或每个分块）算一步，最后的完成通知再算一步；进度值严格递增。
+    发送失败（如客户端已断开）只记录日志，不影响分析本身。
+    """
+
+    def __init__(self, progress: Progress):
+        self.progress = progress
+        self.done = 0
+        self.total: Optional[int] = None
+
+    def expect(self, steps: int) -> None:
+        """设置步数（不含最后的完成通知）"""
+        self.total = self.done + steps + 1
+
+    async def send(self, message: str) -> None:
+        """发送一步进度"""
+        self.done += 1
+        try:
+            await self.progress(self.done, self.total, message)
+        except Exception as e:
+            logger.debug("进度通知发送失败: %s", e)
+
+    async def forward(self, events: asyncio.Queue) -> None:
+        """依次发送一个任务的进度事件，直到收到结束标记"""
+        while True:
+            message = await events.get()
+            if message is None:
+                return
+            await self.send(message)
+
+    async def finish(self, message: str) -> None:
+        """最后一条通知（超时跳过的规则不会发送进度，这里把进度补齐到总数）"""
+        if self.total is not None and self.total > self.done + 1:
+            self.done = self.total - 1
+        await self.send(message)
+
+
+# ==================== 执行器 ====================
+
+class AnalysisExecutor:
+    """在进程池（或调用方）中执行分析任务，执行前先通过准入控制"""
+
+    def __init__(self, workers: int = 0, max_in_flight: int = 0, max_queue: int = 16, chunk_bytes: int = 0):
+        """
+        Args:
+            workers: 工作进程数，0 表示不使用进程池
+            max_in_flight: 同时执行的分析数上限，0 表示与工作进程数相同（至少为 1）
+            max_queue: 排队等待的请求数上限
+            chunk_bytes: 输入超过该长度且有多个工作进程时分块并行分析，0 表示不分块
+        """
+        self.workers = workers
+        self.chunk_bytes = chunk_bytes
+        self.chunked = 0
+        self.restarts = 0
+        self.admission = AdmissionControl(max_in_flight or workers, max_queue)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # 进度事件：工作进程写入 _progress_queue，读取线程按任务编号分发给 _listeners
+        self._progress_queue = None
+        self._reader: Optional[threading.Thread] = None
+        self._listeners: Dict[int, asyncio.Queue] = {}
+        self._task_ids = itertools.count(1)
+
+    def start(self) -> None:
+        """创建进程池并预先拉起全部工作进程（workers=0 时不做任何事）"""
+        if self.workers <= 0 or self._pool is not None:
+            return
+        self._pool = self._create_pool()
+        for future in self._warm_up(self._pool):
+            future.result()
+        logger.info("分析进程池已启动: %d 个工作进程", self.workers)
+
+    def _warm_up(self, pool: ProcessPoolExecutor) -> List[Future]:
+        """提交与工作进程数相同的空任务，让工作进程在接收请求前完成导入和初始化"""
+        return [pool.submit(_ready) for _ in range(self.workers)]
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        if context.get_start_method() == "forkserver":
+            context.set_forkserver_preload(_PRELOAD)
+        # 每个进程池使用新的进度队列：意外退出的工作进程可能正持有旧队列的写锁
+        self._progress_queue = context.SimpleQueue()
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context,
+            initializer=_init_worker, initargs=(self._progress_queue,),
+        )
+
+    async def run(
+        self,
+        name: str,
+        args: Tuple[Any, ...],
+        limits: Limits,
+        progress: Optional[Progress] = None,
+        profile: bool = False
+    ) -> TaskOutcome:
+        """
+        执行分析任务并等待结果
+
+        进程池未启动时在当前线程直接执行；需要发送进度时改在线程中执行，事件循环
+        才能在分析过程中发出通知。工作进程意外退出（如被 OOM 终止）时重建进程池，
+        本次请求返回错误。截止时间从请求到达时开始计算，排队等待准入和进程池的时间也计入。
+
+        Args:
+            name: 任务名（与工具名相同）
+            args: 任务参数
+            limits: 执行时限
+            progress: 可选的进度回调，每条规则（或每个分块）完成后以结果摘要调用一次
+            profile: 是否记录各规则的耗时
+
+        Returns:
+            (任务结果, 结果是否不完整, 各规则发现的问题数, 各规则耗时（profile 为 False 时为 None）)
+
+        Raises:
+            ServerBusy: 排队请求数已达上限
+            RuntimeError: 工作进程意外退出
+        """
+        total = limits[0]
+        expires = time.monotonic() + total if total else None
+        async with self.admission.slot():
+            pool = self._pool
+            if pool is None and progress is None:
+                return run_task(name, args, limits, profile=profile, expires=expires)
+
+            request = self._request(name, args)
+            stream = ProgressStream(progress) if progress is not None else None
+            try:
+                if pool is not None and self._should_chunk(request):
+                    result = await self._run_chunked(pool, request, args, limits, expires, stream, profile)
+                else:
+                    result = await self._run_one(pool, name, args, limits, expires, stream, request, profile)
+            except BrokenProcessPool:
+                # 重建进程池要停止旧的读取线程（最多等待 _READER_STOP_TIMEOUT），不在事件循环中执行
+                await asyncio.get_running_loop().run_in_executor(None, self._restart, pool)
+                raise RuntimeError("分析进程意外退出（可能是内存不足），请稍后重试或缩小输入") from None
+
+            if stream is not None:
+                await stream.finish("分析完成，完整报告见工具结果")
+            return result
+
+    def _request(self, name: str, args: Tuple[Any, ...]) -> Optional[chunking.ChunkRequest]:
+        """基于规则的工具的请求参数（其他工具返回 None）"""
+        if name not in chunking.CHUNKED_TOOLS:
+            return None
+        bound = inspect.signature(_TASKS[name]).bind(None, *args)
+        bound.apply_defaults()
+        params = bound.arguments
+        return chunking.ChunkRequest(
+            name, params["code"], params["selection"],
+            params.get("target_standard", "cpp17"), params.get("file_path"), params["output_format"],
+            params["compact"],
+        )
+
+    def _should_chunk(self, request: Optional[chunking.ChunkRequest]) -> bool:
+        """输入足够大、工具支持且有多个工作进程时分块分析"""
+        return (
+            request is not None and self.workers >= 2 and bool(self.chunk_bytes)
+            and len(request.code) >= self.chunk_bytes
+        )
+
+    async def _run_one(
+        self,
+        pool: Optional[ProcessPoolExecutor],
+        name: str,
+        args: Tuple[Any, ...],
+        limits: Limits,
+        expires: Optional[float],
+        stream: Optional[ProgressStream],
+        request: Optional[chunking.ChunkRequest],
+        profile: bool = False
+    ) -> TaskOutcome:
+        """在一个工作进程（或线程）中执行任务，同时转发逐条规则的进度"""
+        loop = asyncio.get_running_loop()
+        if stream is None:
+            return await loop.run_in_executor(pool, run_task, name, args, limits, None, None, profile, expires)
+
+        task_id = next(self._task_ids)
+        events: asyncio.Queue = asyncio.Queue()
+        self._listeners[task_id] = events
+        if request is not None:
+            stream.expect(chunking.rule_count(request))
+        forwarder = asyncio.create_task(stream.forward(events))
+        try:
+            if pool is None:
+                # 线程中执行：看门狗只能在主线程使用，截止时间退化为规则之间的检查
+                def publish(event: ProgressEvent) -> None:
+                    loop.call_soon_threadsafe(self._dispatch, event)
+
+                result = await loop.run_in_executor(
+                    None, run_task, name, args, limits, task_id, publish, profile, expires)
+            else:
+                self._ensure_reader(loop)
+                result = await loop.run_in_executor(
+                    pool, run_task, name, args, limits, task_id, None, profile, expires)
+            # 结果和进度事件经由不同的管道到达，等最后几条进度发出后再返回
+            try:
+                await asyncio.wait_for(forwarder, _PROGRESS_FLUSH_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+            return result
+        finally:
+            forwarder.cancel()
+            self._listeners.pop(task_id, None)
+
+    def _ensure_reader(self, loop: asyncio.AbstractEventLoop) -> None:
+        """按需启动读取进度队列的线程"""
+        with self._lock:
+            if self._reader is not None:
+                return
+            self._reader = threading.Thread(
+                target=self._read_progress, args=(self._progress_queue, loop),
+                name="progress-reader", daemon=True,
+            )
+            self._reader.start()
+
+    def _read_progress(self, queue, loop: asyncio.AbstractEventLoop) -> None:
+        """读取线程：把工作进程发来的进度事件转交给事件循环"""
+        while True:
+            event = queue.get()
+            if event is None:
+                return
+            try:
+                loop.call_soon_threadsafe(self._dispatch, event)
+            except RuntimeError:
+                # 事件循环已关闭
+                return
+
+    def _dispatch(self, event: ProgressEvent) -> None:
+        """把进度事件交给对应的请求（请求已结束时丢弃）"""
+        task_id, message = event
+        listener = self._listeners.get(task_id)
+        if listener is not None:
+            listener.put_nowait(message)
+
+    async def _run_chunked(
+        self,
+        pool: ProcessPoolExecutor,
+        request: chunking.ChunkRequest,
+        args: Tuple[Any, ...],
+        limits: Limits,
+        expires: Optional[float],
+        stream: Optional[ProgressStream] = None,
+        profile: bool = False
+    ) -> TaskOutcome:
+        """
+        切分、并行分析各分块，在当前进程中合并结果；每个分块完成时发送进度
+
+        各分块使用请求的截止时刻 expires，切分和排队等待的时间也计入
+
+        合并后的问题与整文件分析相同（各分块带重叠上下文，见 chunking.analyze_chunk），
+        tests/test_chunking.py 对每个工具和输出格式做了对比
+        """
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+
+        include_guard = request.tool == "analyze_all" and not get_combined_analyzer().include_guard_skip_reason(
+            request.file_path, request.selection)
+        starts, views, guard = await loop.run_in_executor(
+            pool, chunking.prepare, request.code, self.workers, include_guard, request.file_path)
+        if len(starts) == 1:
+            return await self._run_one(pool, request.tool, args, limits, expires, stream, request, profile)
+
+        code = request.code
+        checkers = chunking.CHUNKED_TOOLS[request.tool]
+        if stream is not None:
+            stream.expect(len(starts))
+
+        async def analyze(index: int, start: int, end: int) -> Dict:
+            # 分块两侧带上重叠上下文，工作进程只保留起点落在 [start, end) 内的匹配
+            view_start, view_end = views[index]
+            output = await loop.run_in_executor(
+                pool, chunking.analyze_chunk, checkers, code[view_start:view_end],
+                request.selection, request.target_standard, limits, profile,
+                (start - view_start, end - view_start), expires)
+            if stream is not None:
+                # 整体规则要在合并时才能得出结论，这里只列出逐个匹配的结果
+                line_offset = code.count('\n', 0, start)
+                findings = [issue for name in checkers for issue in output["checkers"][name]["issues"]]
+                label = f"分块 {index + 1}/{len(starts)}（第 {line_offset + 1} 行起）"
+                await stream.send(describe_findings(label, findings, line_offset))
+            return output
+
+        outputs = await asyncio.gather(*(
+            analyze(index, start, end)
+            for index, (start, end) in enumerate(zip(starts, starts[1:] + [len(code)]))
+        ))
+        self.chunked += 1
+        result, partial = chunking.merge(request, starts, outputs, guard, limits, (time.perf_counter() - started) * 1000)
+        # 分块只统计逐个匹配的问题（整体规则在合并时才得出结论）
+        counts: Dict[str, int] = {}
+        for chunk_output in outputs:
+            for name in checkers:
+                for issue in chunk_output["checkers"][name]["issues"]:
+                    counts[issue["rule"]] = counts.get(issue["rule"], 0) + 1
+        if not profile:
+            return result, partial, counts, None
+        rule_profile = RuleProfile()
+        for chunk_output in outputs:
+            rule_profile.merge(chunk_output["profile"])
+        return result, partial, counts, rule_profile.rows()
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        """
+        重建已损坏的进程池（并发的多个失败请求只重建一次）
+
+        在线程中执行（见 run）：锁内只替换进程池和进度队列，事件循环中的 _ensure_reader
+        不会长时间等锁；拉起工作进程和停止旧的读取线程都在锁外进行。
+        """
+        with self._lock:
+            if self._pool is not broken:
+                return
+            logger.warning("分析进程池已损坏，正在重建")
+            broken.shutdown(wait=False, cancel_futures=True)
+            reader, queue = self._reader, self._progress_queue
+            self._reader = None
+            pool = self._pool = self._create_pool()
+            self.restarts += 1
+        # 不等待空任务完成：新的请求在工作进程就绪后排队执行
+        self._warm_up(pool)
+        self._stop_reader(reader, queue)
+
+    def shutdown(self) -> None:
+        """关闭进程池：取消排队中的任务，等待工作进程退出，停止进度读取线程"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        reader, self._reader = self._reader, None
+        self._stop_reader(reader, self._progress_queue)
+
+    @staticmethod
+    def _stop_reader(reader: Optional[threading.Thread], queue) -> None:
+        """向进度队列发送结束标记，等待读取该队列的线程退出"""
+        if reader is None:
+            return
+        # 意外退出的工作进程可能正持有队列的写锁，结束标记在单独的线程中发送，不会卡住调用方
+        threading.Thread(target=queue.put, args=(None,), name="progress-stop", daemon=True).start()
+        reader.join(timeout=_READER_STOP_TIMEOUT)
+        if reader.is_alive():
+            logger.warning("进度读取线程未能在 %.1f 秒内退出", _READER_STOP_TIMEOUT)
+
+    def worker_pids(self) -> List[int]:
+        """当前工作进程的 PID（用于统计内存占用）"""
+        pool = self._pool
+        if pool is None:
+            return []
+        # ProcessPoolExecutor 没有公开工作进程列表；进程池的管理线程可能同时在修改它
+        try:
+            return list(pool._processes or ())
+        except RuntimeError:
+            return []
+
+    def stats(self) -> Dict[str, Any]:
+        """执行器状态（用于 /health）"""
+        return {
+            "mode": "process" if self._pool is not None else "inline",
+            "workers": self.workers if self._pool is not None else 0,
+            "restarts": self.restarts,
+            "chunked": self.chunked,
+            "admission": self.admission.stats(),
+        }
+
+
+def default_workers() -> int:
+    """默认工作进程数：当前进程可用的 CPU 核数"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
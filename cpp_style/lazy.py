@@ -0,0 +1,60 @@
+"""
+按需加载
+
+服务器启动时只需要各工具的参数签名（用于注册工具 schema），检查器、资源和提示模板的实现
+在第一次调用时才导入。lazy() 以 "模块:属性" 形式记录目标，首次调用时导入模块、取出属性
+并调用，之后直接调用已取出的属性；loaded() 列出已加载的目标及导入耗时。
+"""
+
+import importlib
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# 已加载的目标 -> 导入耗时（毫秒），按加载顺序
+_loaded: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+class LazyLoader:
+    """首次调用时导入的可调用对象（通常是模块中的 get_* 单例函数）"""
+
+    __slots__ = ('target', '_func')
+
+    def __init__(self, target: str):
+        """
+        Args:
+            target: "模块:属性"，例如 "cpp_style.tools.naming_checker:get_checker"
+        """
+        self.target = target
+        self._func: Optional[Callable[..., Any]] = None
+
+    @property
+    def module(self) -> str:
+        """目标所在的模块名"""
+        return self.target.partition(":")[0]
+
+    def __call__(self, *args, **kwargs) -> Any:
+        func = self._func
+        if func is None:
+            func = self._load()
+        return func(*args, **kwargs)
+
+    def _load(self) -> Callable[..., Any]:
+        with _lock:
+            if self._func is None:
+                module_name, _, attr = self.target.partition(":")
+                start = time.perf_counter()
+                self._func = getattr(importlib.import_module(module_name), attr)
+                _loaded.setdefault(self.target, (time.perf_counter() - start) * 1000)
+        return self._func
+
+
+def lazy(target: str) -> LazyLoader:
+    """按需加载 "模块:属性"，返回的对象按原函数的方式调用"""
+    return LazyLoader(target)
+
+
+def loaded() -> Dict[str, float]:
+    """已加载的目标（"模块:属性" -> 导入耗时毫秒），用于查看启动后实际用到的模块"""
+    return dict(_loaded)
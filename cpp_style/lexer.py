@@ -0,0 +1,193 @@
+"""
+C++ 词法分析器
+
+一次扫描将源码切分为紧凑的数组化 token 流，识别块注释、行注释、
+原始字符串字面量、字符字面量和预处理指令。各检查工具共享同一个
+token 流，并基于它生成"纯代码视图"，从而不再把注释和字符串中的
+内容误报为问题。
+"""
+
+import re
+from array import array
+from typing import Iterator, List, NamedTuple, Tuple
+
+# token 类别
+IDENTIFIER = 0
+NUMBER = 1
+STRING = 2
+CHAR = 3
+PUNCT = 4
+COMMENT = 5
+PREPROCESSOR = 6
+
+KIND_NAMES = ("identifier", "number", "string", "char", "punct", "comment", "preprocessor")
+
+# 空白在换行处结束，不吞掉下一行的缩进：缩进后的 # 由 preprocessor 分支从行首匹配
+_TOKEN_RE = re.compile(r'''
+    (?P<comment>/\*.*?(?:\*/|\Z)|//(?:\\\r?\n|[^\n])*)
+  | (?P<preprocessor>^[ \t]*\#(?:\\\r?\n|/\*.*?\*/|//[^\n]*|"(?:\\.|[^"\\\n])*"|[^\n])*)
+  | (?P<raw_string>(?:u8|[uUL])?R"(?P<delim>[^()\\\s"]{0,16})\(.*?\)(?P=delim)")
+  | (?P<string>(?:u8|[uUL])?"(?:\\.|[^"\\\n])*")
+  | (?P<char>(?:u8|[uUL])?'(?:\\.|[^'\\\n])+')
+  | (?P<number>\.?\d(?:[eEpP][+-]|[\w.]|'(?=\w))*)
+  | (?P<identifier>[^\W\d]\w*)
+  | (?P<space>[^\S\n]+\n?|\n)
+  | (?P<punct>::|->|\.\.\.|.)
+''', re.VERBOSE | re.DOTALL | re.MULTILINE)
+
+_GROUP_KINDS = {
+    "comment": COMMENT,
+    "preprocessor": PREPROCESSOR,
+    "raw_string": STRING,
+    "string": STRING,
+    "char": CHAR,
+    "number": NUMBER,
+    "identifier": IDENTIFIER,
+    "punct": PUNCT,
+}
+
+_DIRECTIVE_RE = re.compile(r'\s*#\s*(\w*)\s*(.*)', re.DOTALL)
+_DIRECTIVE_COMMENT_RE = re.compile(r'/\*.*?\*/|//[^\n]*', re.DOTALL)
+_NON_NEWLINE_RE = re.compile(r'[^\n]')
+
+
+class Token(NamedTuple):
+    """单个 token 的只读视图"""
+    kind: int
+    start: int
+    end: int
+    text: str
+
+
+class TokenStream:
+    """
+    数组化的 token 流
+
+    类别、起止偏移分别存放在 array 中，避免为每个 token 创建对象；
+    需要时通过下标或迭代按需生成 Token 视图。
+    """
+
+    __slots__ = ('text', 'kinds', 'starts', 'ends')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.kinds = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __getitem__(self, index: int) -> Token:
+        start = self.starts[index]
+        end = self.ends[index]
+        return Token(self.kinds[index], start, end, self.text[start:end])
+
+    def __iter__(self) -> Iterator[Token]:
+        text = self.text
+        for kind, start, end in zip(self.kinds, self.starts, self.ends):
+            yield Token(kind, start, end, text[start:end])
+
+    def text_of(self, index: int) -> str:
+        """获取第 index 个 token 的原文"""
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def indices(self, *kinds: int) -> List[int]:
+        """获取指定类别 token 的下标列表"""
+        return [i for i, kind in enumerate(self.kinds) if kind in kinds]
+
+    def significant(self) -> List[int]:
+        """获取所有非注释 token 的下标列表"""
+        return [i for i, kind in enumerate(self.kinds) if kind != COMMENT]
+
+
+def tokenize(text: str) -> TokenStream:
+    """
+    将 C++ 源码切分为 token 流
+
+    Args:
+        text: C++ 源码
+
+    Returns:
+        TokenStream（不包含空白）
+    """
+    stream = TokenStream(text)
+    kinds = stream.kinds.append
+    starts = stream.starts.append
+    ends = stream.ends.append
+    group_kinds = _GROUP_KINDS
+
+    for match in _TOKEN_RE.finditer(text):
+        kind = group_kinds.get(match.lastgroup)
+        if kind is None:
+            continue
+        kinds(kind)
+        starts(match.start())
+        ends(match.end())
+
+    return stream
+
+
+def mask_code(stream: TokenStream) -> str:
+    """
+    生成纯代码视图
+
+    注释和预处理指令整体替换为空格，字符串和字符字面量只保留引号和前缀、
+    内容替换为空格。换行符和所有偏移量保持不变，因此行列号与原文一致。
+
+    Args:
+        stream: tokenize() 生成的 token 流
+
+    Returns:
+        与原文等长的纯代码文本
+    """
+    text = stream.text
+    pieces = []
+    last = 0
+
+    for kind, start, end in zip(stream.kinds, stream.starts, stream.ends):
+        if kind == IDENTIFIER or kind == NUMBER or kind == PUNCT:
+            continue
+
+        if kind == COMMENT or kind == PREPROCESSOR:
+            body_start, body_end = start, end
+        else:
+            quote = '"' if kind == STRING else "'"
+            body_start = text.index(quote, start) + 1
+            body_end = end - 1
+
+        if body_end <= body_start:
+            continue
+
+        pieces.append(text[last:body_start])
+        body = text[body_start:body_end]
+        if '\n' in body:
+            pieces.append(_NON_NEWLINE_RE.sub(' ', body))
+        else:
+            pieces.append(' ' * len(body))
+        last = body_end
+
+    if not pieces:
+        return text
+
+    pieces.append(text[last:])
+    return ''.join(pieces)
+
+
+def parse_directive(directive: str) -> Tuple[str, str]:
+    """
+    解析预处理指令
+
+    Args:
+        directive: 预处理指令原文（如 "#ifndef FOO_H  // guard"）
+
+    Returns:
+        (指令名, 去除注释和续行后的参数)，如 ("ifndef", "FOO_H")
+    """
+    match = _DIRECTIVE_RE.match(directive)
+    if not match:
+        return "", ""
+    args = _DIRECTIVE_COMMENT_RE.sub(' ', match.group(2))
+    args = re.sub(r'\\\r?\n', ' ', args)
+    return match.group(1), args.strip()
+
@@ -0,0 +1,226 @@
+"""
+Prometheus 指标
+
+/metrics 以 Prometheus 文本格式（0.0.4）输出服务器指标。指标全部保存在主进程的内存中，
+记录一次请求只是几次字典更新，抓取时才格式化文本，可以在 1 个 CPU 的机器上常开：
+
+- 每个工具、资源和提示模板处理函数的请求数（按结果）和耗时直方图
+- 带 code 参数的处理函数的输入大小直方图（字符数）
+- 每条规则发现的问题数（由执行器汇总工作进程返回的计数）
+- 缓存、执行器和进程内存等状态在抓取时由回调读取（见 Metrics.add_collector）
+
+预热等内部调用在 Metrics.suppress() 中执行，不计入请求指标。
+"""
+
+import contextlib
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 耗时直方图的桶（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 输入大小直方图的桶（字符数）
+INPUT_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 一个样本: (标签, 值)
+Sample = Tuple[Dict[str, str], float]
+# 一组指标: (名称, 类型, 说明, 样本)
+Family = Tuple[str, str, str, List[Sample]]
+
+# 当前上下文中的调用是否不计入请求指标
+_suppressed: contextvars.ContextVar[bool] = contextvars.ContextVar("metrics_suppressed", default=False)
+
+
+class Histogram:
+    """按标签值分组的累积直方图"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # 标签值 -> (各桶计数（不累积，最后一个为 +Inf）, 总和)
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = series
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def samples(self, label_names: Tuple[str, ...]) -> Iterator[Tuple[str, Dict[str, str], float]]:
+        """(后缀, 标签, 值)：各桶的累积计数、_sum 和 _count"""
+        for labels, (counts, total) in sorted(self._series.items()):
+            base = dict(zip(label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield "_bucket", {**base, "le": _format_value(bound)}, cumulative
+            yield "_sum", base, total[0]
+            yield "_count", base, cumulative
+
+
+class Metrics:
+    """服务器指标：请求计数、耗时和输入大小直方图、规则问题数，以及抓取时读取的状态"""
+
+    def __init__(self, prefix: str = "cpp_style"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        # (处理函数, 类型, 结果) -> 请求数
+        self._requests: Dict[Tuple[str, str, str], int] = {}
+        self._latency = Histogram(LATENCY_BUCKETS)
+        self._input = Histogram(INPUT_BUCKETS)
+        # 规则 ID -> 问题数
+        self._rule_findings: Dict[str, int] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    # ---------- 记录 ----------
+
+    @contextlib.contextmanager
+    def suppress(self) -> Iterator[None]:
+        """with 块内（包括其中创建的任务）的调用不计入请求指标"""
+        token = _suppressed.set(True)
+        try:
+            yield
+        finally:
+            _suppressed.reset(token)
+
+    def observe_request(self, handler: str, kind: str, status: str, seconds: float, input_size: Optional[int]) -> None:
+        """记录一次请求"""
+        if _suppressed.get():
+            return
+        with self._lock:
+            key = (handler, kind, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._latency.observe((handler, kind), seconds)
+            if input_size is not None:
+                self._input.observe((handler,), input_size)
+
+    def add_rule_findings(self, counts: Dict[str, int]) -> None:
+        """累加各规则发现的问题数"""
+        if not counts or _suppressed.get():
+            return
+        with self._lock:
+            for rule_id, count in counts.items():
+                self._rule_findings[rule_id] = self._rule_findings.get(rule_id, 0) + count
+
+    def instrument(self, kind: str) -> Callable[[Callable], Callable]:
+        """
+        装饰器：记录处理函数的请求数、耗时和输入大小（code 参数的字符数）
+
+        functools.wraps 保留原函数签名，FastMCP 据此生成的 schema 和 URI 参数不变；
+        同步和异步函数都可以使用。
+        """
+        def decorate(func: Callable) -> Callable:
+            handler = func.__name__
+            signature = inspect.signature(func)
+            has_code = "code" in signature.parameters
+
+            def input_size(args, kwargs) -> Optional[int]:
+                if not has_code:
+                    return None
+                code = kwargs.get("code")
+                if code is None and args:
+                    code = signature.bind_partial(*args, **kwargs).arguments.get("code")
+                return len(code) if isinstance(code, str) else None
+
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    start = time.perf_counter()
+                    status = "error"
+                    try:
+                        result = await func(*args, **kwargs)
+                        status = "ok"
+                        return result
+                    finally:
+                        self.observe_request(handler, kind, status, time.perf_counter() - start, input_size(args, kwargs))
+
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                status = "error"
+                try:
+                    result = func(*args, **kwargs)
+                    status = "ok"
+                    return result
+                finally:
+                    self.observe_request(handler, kind, status, time.perf_counter() - start, input_size(args, kwargs))
+
+            return wrapper
+
+        return decorate
+
+    def add_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        """注册抓取时调用的回调，返回要输出的指标"""
+        self._collectors.append(collector)
+
+    # ---------- 输出 ----------
+
+    def render(self) -> str:
+        """Prometheus 文本格式"""
+        p = self.prefix
+        with self._lock:
+            families: List[Family] = [
+                (f"{p}_requests_total", "counter", "Handled requests by handler, kind and status", [
+                    ({"handler": handler, "kind": kind, "status": status}, count)
+                    for (handler, kind, status), count in sorted(self._requests.items())
+                ]),
+                (f"{p}_rule_findings_total", "counter", "Findings reported by each rule", [
+                    ({"rule": rule_id}, count) for rule_id, count in sorted(self._rule_findings.items())
+                ]),
+            ]
+            histograms = [
+                (f"{p}_request_duration_seconds", "Request latency by handler", self._latency, ("handler", "kind")),
+                (f"{p}_input_chars", "Size of the code argument in characters", self._input, ("handler",)),
+            ]
+            lines: List[str] = []
+            for name, help_text, histogram, label_names in histograms:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for suffix, labels, value in histogram.samples(label_names):
+                    lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+
+        for collector in self._collectors:
+            families.extend(collector())
+        for name, metric_type, help_text, samples in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def resident_memory_bytes(pid: Optional[int] = None) -> Optional[int]:
+    """进程的常驻内存（/proc/<pid>/statm，非 Linux 或进程不存在时返回 None）"""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
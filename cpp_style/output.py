@@ -0,0 +1,290 @@
+"""
+结构化输出
+
+output_format="json" 时工具不生成 markdown 报告，直接返回各检查器的原始问题：
+每个问题带规则 ID、严重程度和源码范围，以 MCP structuredContent 返回。
+AnalysisOutput 描述返回的结构，作为工具的 outputSchema 发布；markdown 和 sarif 模式下
+structuredContent 只包含 format / tool / partial，报告或 SARIF 日志在文本内容中
+（SARIF 由 cpp_style.sarif 从同一个 FindingSet 生成）。
+
+结构化结果在工作进程中直接构建为 dict（不经过 pydantic），返回服务器进程后
+只在发送前校验一次。
+"""
+
+from typing import Any, Dict, Iterable, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from cpp_style.deadline import Deadline
+from cpp_style.rules import get_registry
+
+OutputFormat = Literal["markdown", "json", "sarif"]
+# 命名检查工具只支持 markdown 和 json
+NamingOutputFormat = Literal["markdown", "json"]
+
+# 不在规则注册表中的检查的规则 ID
+INCLUDE_GUARD_MISSING = "include-guard-missing"
+INCLUDE_GUARD_NAME = "include-guard-name"
+NAMING_RULE_PREFIX = "naming-"
+
+# 规则结论中作为附加数据返回的字段（现代化建议）
+_DETAIL_FIELDS = ("standard", "feature", "old_pattern", "new_pattern", "example_old", "example_new", "benefit")
+
+
+# ==================== 输出结构 ====================
+
+class Finding(BaseModel):
+    """一个检查结果"""
+    rule: str = Field(description="Rule ID; details in the top-level rules table")
+    severity: Literal["error", "warning", "info"]
+    message: str
+    range: Optional[List[int]] = Field(
+        default=None,
+        description="[start_line, start_column, end_line, end_column], 1-based, end column exclusive; absent for whole-file findings",
+    )
+    code: Optional[str] = Field(default=None, description="The matched source text")
+    suggestion: Optional[str] = Field(default=None, description="Finding-specific suggestion; otherwise see the rule's suggestion")
+    data: Optional[Dict[str, Any]] = Field(default=None, description="Checker-specific details (modernization examples, naming suggestions, ...)")
+
+
+class RuleInfo(BaseModel):
+    """结果中出现的规则"""
+    checker: str = Field(description="memory_safety, const_correctness, modern_cpp, include_guard or naming")
+    name: str
+    severity: Literal["error", "warning", "info"]
+    suggestion: Optional[str] = Field(default=None, description="Suggestion shared by every finding of this rule")
+
+
+class Summary(BaseModel):
+    """结果统计"""
+    total: int
+    by_severity: Dict[str, int]
+    by_rule: Dict[str, int]
+
+
+class CheckerStatus(BaseModel):
+    """analyze_all 中单个检查器的执行情况"""
+    status: Literal["ok", "partial", "skipped"]
+    findings: int = 0
+    elapsed_ms: float = 0.0
+    reason: Optional[str] = None
+
+
+class RuleTimeoutInfo(BaseModel):
+    """超时中止的规则"""
+    rule: str
+    reason: str
+
+
+class RuleProfileEntry(BaseModel):
+    """一条规则的耗时（debug_profile）"""
+    rule: str
+    checker: str
+    calls: int = Field(description="Times the rule ran (once per chunk for chunked inputs)")
+    ms: float = Field(description="Wall time spent in the rule, including its predicate")
+    findings: int = Field(description="Findings produced by the rule")
+    timeouts: int = 0
+
+
+class AnalysisOutput(BaseModel):
+    """工具的结构化输出"""
+    format: OutputFormat
+    tool: str
+    partial: bool = Field(default=False, description="True when a rule timed out or the request deadline was reached")
+    findings: Optional[List[Finding]] = Field(default=None, description="All findings (json format only)")
+    rules: Optional[Dict[str, RuleInfo]] = Field(default=None, description="Rules that produced findings, by rule ID")
+    summary: Optional[Summary] = None
+    checkers: Optional[Dict[str, CheckerStatus]] = Field(default=None, description="Per-checker status (analyze_all only)")
+    timeouts: Optional[List[RuleTimeoutInfo]] = None
+    skipped_rules: Optional[List[str]] = None
+    omitted: Optional[Dict[str, int]] = Field(
+        default=None,
+        description="Findings left out per rule ID with verbosity=\"compact\" (counted in summary)",
+    )
+    profile: Optional[List[RuleProfileEntry]] = Field(
+        default=None,
+        description="Per-rule wall time and findings, slowest first (debug_profile=true only)",
+    )
+
+
+# ==================== 构建 ====================
+
+class FindingSet:
+    """
+    结构化结果的问题列表，以及其中出现的规则
+
+    规则的检查器、名称和固定不变的建议只在 rules 表中出现一次，问题条目只保留
+    随匹配变化的字段；数千个问题的结果因此比 markdown 报告更小。
+    """
+
+    def __init__(self):
+        self.items: List[Dict] = []
+        self.rules: Dict[str, Dict] = {}
+
+    def add_rule_issues(self, checker: str, issues: Iterable[Dict]) -> None:
+        """
+        加入规则引擎产生的问题
+
+        Args:
+            checker: 检查器名称
+            issues: run_rules 的结果（包含保护检查的问题同样带 rule 字段）
+        """
+        registry = get_registry()
+        items = self.items
+        for issue in issues:
+            rule_id = issue["rule"]
+            rule = registry.get(rule_id)
+            if rule_id not in self.rules:
+                if rule is None:
+                    self._add_rule(rule_id, checker, issue["message"], issue["severity"])
+                else:
+                    static = "{" not in rule.suggestion and not rule.details
+                    self._add_rule(rule_id, checker, rule.name, rule.severity, rule.suggestion if static else None)
+            shared = self.rules[rule_id].get("suggestion")
+
+            if "feature" in issue:
+                # 现代化建议（整体结论）：示例代码作为附加数据
+                items.append({
+                    "rule": rule_id,
+                    "severity": rule.severity,
+                    "message": issue["feature"],
+                    "suggestion": issue["new_pattern"],
+                    "data": {key: issue[key] for key in _DETAIL_FIELDS if key in issue},
+                })
+                continue
+
+            finding: Dict[str, Any] = {"rule": rule_id, "severity": issue["severity"], "message": issue["message"]}
+            if issue.get("line", 0) > 0:
+                finding["range"] = [issue["line"], issue["column"], issue["end_line"], issue["end_column"]]
+            if issue.get("location"):
+                finding["code"] = issue["location"]
+            if issue.get("suggestion") and issue["suggestion"] != shared:
+                finding["suggestion"] = issue["suggestion"]
+            items.append(finding)
+
+    def add_naming(self, failures: Iterable[Dict]) -> None:
+        """加入命名检查的失败项（规则 ID 为 naming-<类别>）"""
+        for failure in failures:
+            identifier = failure["identifier"]
+            category = failure["category"]
+            rule_id = NAMING_RULE_PREFIX + category.replace("_", "-")
+            if rule_id not in self.rules:
+                self._add_rule(rule_id, "naming", f"{category} 命名规范", "warning")
+
+            finding: Dict[str, Any] = {
+                "rule": rule_id,
+                "severity": "warning",
+                "message": f"{identifier}: {failure['message']}",
+                "code": identifier,
+            }
+            if failure.get("line"):
+                column = failure["column"]
+                finding["range"] = [failure["line"], column, failure["line"], column + len(identifier)]
+            if failure["suggestions"]:
+                finding["suggestion"] = failure["suggestions"][0]
+                finding["data"] = {"suggestions": failure["suggestions"]}
+            self.items.append(finding)
+
+    def add_include_guard(self, is_valid: bool, suggestions: List[str]) -> None:
+        """加入包含保护检查的结论"""
+        if not is_valid:
+            rule_id, name, severity = INCLUDE_GUARD_MISSING, "缺少包含保护", "warning"
+            suggestion = suggestions[0] if suggestions else "#pragma once"
+        elif suggestions:
+            # 有保护但宏名不规范（只有提供 file_path 时才会给出建议的宏名）
+            rule_id, name, severity = INCLUDE_GUARD_NAME, "包含保护宏名可以改进", "info"
+            suggestion = suggestions[0]
+        else:
+            return
+
+        self._add_rule(rule_id, "include_guard", name, severity)
+        finding: Dict[str, Any] = {"rule": rule_id, "severity": severity, "message": name, "suggestion": suggestion}
+        if suggestions:
+            finding["data"] = {"suggestions": suggestions}
+        self.items.append(finding)
+
+    def _add_rule(
+        self, rule_id: str, checker: str, name: str, severity: str, suggestion: Optional[str] = None
+    ) -> None:
+        info = {"checker": checker, "name": name, "severity": severity}
+        if suggestion:
+            info["suggestion"] = suggestion
+        self.rules[rule_id] = info
+
+
+def structured(
+    tool: str,
+    findings: FindingSet,
+    deadline: Optional[Deadline] = None,
+    checkers: Optional[Dict[str, Dict]] = None,
+    max_per_rule: int = 0
+) -> Dict:
+    """
+    构建 json 格式的结构化结果
+
+    Args:
+        tool: 工具名
+        findings: 问题列表
+        deadline: 执行时使用的截止时间，用于标注部分结果
+        checkers: analyze_all 的各检查器执行情况
+        max_per_rule: 每条规则最多返回的问题数（verbosity="compact"），0 表示不限；
+            summary 仍按全部问题统计
+
+    Returns:
+        符合 AnalysisOutput 的 dict
+    """
+    by_severity = {"error": 0, "warning": 0, "info": 0}
+    by_rule: Dict[str, int] = {}
+    items = findings.items
+    kept: List[Dict] = []
+    for finding in items:
+        by_severity[finding["severity"]] += 1
+        count = by_rule[finding["rule"]] = by_rule.get(finding["rule"], 0) + 1
+        if max_per_rule and count <= max_per_rule:
+            kept.append(finding)
+
+    result: Dict[str, Any] = {
+        "format": "json",
+        "tool": tool,
+        "partial": deadline is not None and deadline.partial,
+        "findings": kept if max_per_rule else items,
+        "rules": findings.rules,
+        "summary": {"total": len(findings.items), "by_severity": by_severity, "by_rule": by_rule},
+    }
+    if checkers is not None:
+        result["checkers"] = checkers
+    if deadline is not None and deadline.timeouts:
+        result["timeouts"] = [{"rule": rule_id, "reason": reason} for rule_id, reason in deadline.timeouts]
+    if deadline is not None and deadline.skipped:
+        result["skipped_rules"] = list(deadline.skipped)
+    if max_per_rule and len(kept) < len(items):
+        result["omitted"] = {
+            rule_id: count - max_per_rule for rule_id, count in by_rule.items() if count > max_per_rule
+        }
+    return result
+
+
+def rule_findings(checker: str, issues: Iterable[Dict]) -> FindingSet:
+    """单个检查器的问题列表"""
+    findings = FindingSet()
+    findings.add_rule_issues(checker, issues)
+    return findings
+
+
+def combined_findings(results: Dict[str, Dict]) -> FindingSet:
+    """analyze_all 各检查器的问题合并为一个列表（按检查器顺序）"""
+    findings = FindingSet()
+    for name, result in results.items():
+        findings.add_rule_issues(name, result["issues"])
+    return findings
+
+
+def checker_status(result: Dict) -> Dict:
+    """analyze_all 中单个检查器结果（{"issues", "report", "elapsed_ms", ...}）的执行情况"""
+    if result.get("skipped"):
+        return {"status": "skipped", "reason": result["report"].strip()}
+    return {
+        "status": "partial" if result.get("partial") else "ok",
+        "findings": len(result["issues"]),
+        "elapsed_ms": round(result["elapsed_ms"], 2),
+    }
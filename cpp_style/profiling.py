@@ -0,0 +1,81 @@
+"""
+规则耗时分析
+
+请求变慢时，需要知道是哪条规则（正则模式和谓词）占用了时间。在 profile_rules()
+（见 cpp_style.rules）中执行的每条规则都记录执行次数、耗时和产生的结果数；
+不在其中时 run_rules 不做任何计时，正常请求没有额外开销。
+
+工具的 debug_profile 参数开启后，耗时明细随报告一起返回：结构化内容的 profile 字段，
+以及 markdown 和 SARIF 输出附加的一段耗时表。分块分析时各分块的记录相加，耗时为
+各工作进程耗时之和，整体规则在合并时才得出结论，结果数不计入。
+"""
+
+from typing import Dict, Iterable, List
+
+# 耗时表最多列出的规则数
+PROFILE_TABLE_ROWS = 20
+
+
+class RuleProfile:
+    """各规则的执行次数、耗时和结果数"""
+
+    def __init__(self):
+        # 规则 ID -> [检查器, 执行次数, 耗时（秒）, 结果数, 超时次数]
+        self._rules: Dict[str, List] = {}
+
+    def record(self, rule_id: str, checker: str, seconds: float, findings: int, timed_out: bool = False) -> None:
+        """记录规则的一次执行"""
+        entry = self._rules.get(rule_id)
+        if entry is None:
+            entry = self._rules[rule_id] = [checker, 0, 0.0, 0, 0]
+        entry[1] += 1
+        entry[2] += seconds
+        entry[3] += findings
+        entry[4] += timed_out
+
+    def merge(self, rows: Iterable[Dict]) -> None:
+        """累加另一份记录（rows() 的结果，如各分块的记录）"""
+        for row in rows:
+            entry = self._rules.get(row["rule"])
+            if entry is None:
+                entry = self._rules[row["rule"]] = [row["checker"], 0, 0.0, 0, 0]
+            entry[1] += row["calls"]
+            entry[2] += row["ms"] / 1000
+            entry[3] += row["findings"]
+            entry[4] += row["timeouts"]
+
+    def rows(self) -> List[Dict]:
+        """可以 pickle 和序列化为 JSON 的记录，按耗时从高到低排列"""
+        rows = [
+            {
+                "rule": rule_id,
+                "checker": checker,
+                "calls": calls,
+                "ms": round(seconds * 1000, 3),
+                "findings": findings,
+                "timeouts": timeouts,
+            }
+            for rule_id, (checker, calls, seconds, findings, timeouts) in self._rules.items()
+        ]
+        rows.sort(key=lambda row: row["ms"], reverse=True)
+        return rows
+
+
+def render(rows: List[Dict], limit: int = PROFILE_TABLE_ROWS) -> str:
+    """耗时表（markdown），只列出最慢的 limit 条规则"""
+    total = sum(row["ms"] for row in rows)
+    report = "## ⏱️ 规则耗时\n\n"
+    report += f"**{len(rows)} 条规则，共 {total:.1f} ms**\n\n"
+    if not rows:
+        return report
+    report += "| 规则 | 检查器 | 次数 | 耗时 (ms) | 占比 | 结果数 | 超时 |\n"
+    report += "|------|--------|------|-----------|------|--------|------|\n"
+    for row in rows[:limit]:
+        share = row["ms"] / total * 100 if total else 0.0
+        report += (
+            f"| `{row['rule']}` | {row['checker']} | {row['calls']} | {row['ms']:.2f} | {share:.1f}% "
+            f"| {row['findings']} | {row['timeouts']} |\n"
+        )
+    if len(rows) > limit:
+        report += f"\n其余 {len(rows) - limit} 条规则共 {sum(row['ms'] for row in rows[limit:]):.1f} ms\n"
+    return report
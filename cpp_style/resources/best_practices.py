@@ -1,18 +1,27 @@
 """C++ 最佳实践资源"""
 
-import json
-from pathlib import Path
 from typing import Optional
 
+from cpp_style.data import get_store
+from cpp_style.resources.documents import OVERVIEW, DocumentSet, load_documents, render_documents
+
 
 class BestPracticesResource:
     """最佳实践资源提供器"""
 
     def __init__(self):
         """加载最佳实践数据"""
-        data_path = Path(__file__).parent.parent / "data" / "best_practices.json"
-        with open(data_path, 'r', encoding='utf-8') as f:
-            self.practices = json.load(f)
+        self.practices = get_store().load("best_practices")
+        self._documents: Optional[DocumentSet] = None
+
+    @property
+    def documents(self) -> DocumentSet:
+        """全部文档（各主题和 all 概览），首次访问时取自数据快照或渲染一次"""
+        if self._documents is None:
+            self._documents = load_documents("best_practices", lambda: render_documents(
+                self.practices, self._render_best_practice, self._render_all_topics
+            ))
+        return self._documents
 
     def get_best_practice(self, topic: str) -> str:
         """
@@ -24,10 +33,18 @@ class BestPracticesResource:
         Returns:
             格式化的最佳实践文档
         """
-        if topic not in self.practices:
+        document = self.documents.get(topic)
+        if document is None:
             available = ', '.join(self.practices.keys())
             return f"未知的主题: {topic}\n\n可用主题: {available}"
+        return document.text
+
+    def get_all_topics(self) -> str:
+        """获取所有可用主题的概览"""
+        return self.documents[OVERVIEW].text
 
+    def _render_best_practice(self, topic: str) -> str:
+        """渲染指定主题的最佳实践文档"""
         practice = self.practices[topic]
 
         # 构建格式化的文档
@@ -72,8 +89,8 @@ class BestPracticesResource:
 
         return doc
 
-    def get_all_topics(self) -> str:
-        """获取所有可用主题的概览"""
+    def _render_all_topics(self) -> str:
+        """渲染所有主题的概览"""
         doc = "# C++ 最佳实践主题\n\n"
         doc += "以下是所有可用的最佳实践主题：\n\n"
 
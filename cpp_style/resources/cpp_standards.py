@@ -1,7 +1,9 @@
 """C++ 标准特性资源"""
 
-import json
-from pathlib import Path
+from typing import Optional
+
+from cpp_style.data import get_store
+from cpp_style.resources.documents import OVERVIEW, DocumentSet, load_documents, render_documents
 
 
 class CppStandardsResource:
@@ -9,9 +11,17 @@ class CppStandardsResource:
 
     def __init__(self):
         """加载 C++ 标准特性数据"""
-        data_path = Path(__file__).parent.parent / "data" / "cpp_standards.json"
-        with open(data_path, 'r', encoding='utf-8') as f:
-            self.standards = json.load(f)
+        self.standards = get_store().load("cpp_standards")
+        self._documents: Optional[DocumentSet] = None
+
+    @property
+    def documents(self) -> DocumentSet:
+        """全部文档（各标准版本和 all 概览），首次访问时取自数据快照或渲染一次"""
+        if self._documents is None:
+            self._documents = load_documents("cpp_standards", lambda: render_documents(
+                self.standards, self._render_standard_features, self._render_all_standards
+            ))
+        return self._documents
 
     def get_standard_features(self, version: str) -> str:
         """
@@ -23,10 +33,18 @@ class CppStandardsResource:
         Returns:
             格式化的标准特性文档
         """
-        if version not in self.standards:
+        document = self.documents.get(version)
+        if document is None:
             available = ', '.join(self.standards.keys())
             return f"未知的 C++ 标准版本: {version}\n\n可用版本: {available}"
+        return document.text
+
+    def get_all_standards(self) -> str:
+        """获取所有 C++ 标准的概览"""
+        return self.documents[OVERVIEW].text
 
+    def _render_standard_features(self, version: str) -> str:
+        """渲染指定 C++ 标准的特性文档"""
         standard = self.standards[version]
 
         # 构建格式化的文档
@@ -49,8 +67,8 @@ class CppStandardsResource:
 
         return doc
 
-    def get_all_standards(self) -> str:
-        """获取所有 C++ 标准的概览"""
+    def _render_all_standards(self) -> str:
+        """渲染所有 C++ 标准的概览"""
         doc = "# C++ 标准特性演进\n\n"
         doc += "从 C++11 到 C++23 的主要特性概览\n\n"
         doc += "---\n\n"
@@ -1,7 +1,9 @@
 """C++ 设计模式示例资源"""
 
-import json
-from pathlib import Path
+from typing import Optional
+
+from cpp_style.data import get_store
+from cpp_style.resources.documents import OVERVIEW, DocumentSet, load_documents, render_documents
 
 
 class DesignPatternsResource:
@@ -9,9 +11,17 @@ class DesignPatternsResource:
 
     def __init__(self):
         """加载设计模式数据"""
-        data_path = Path(__file__).parent.parent / "data" / "design_patterns.json"
-        with open(data_path, 'r', encoding='utf-8') as f:
-            self.patterns = json.load(f)
+        self.patterns = get_store().load("design_patterns")
+        self._documents: Optional[DocumentSet] = None
+
+    @property
+    def documents(self) -> DocumentSet:
+        """全部文档（各模式和 all 概览），首次访问时取自数据快照或渲染一次"""
+        if self._documents is None:
+            self._documents = load_documents("design_patterns", lambda: render_documents(
+                self.patterns, self._render_pattern_example, self._render_all_patterns
+            ))
+        return self._documents
 
     def get_pattern_example(self, pattern: str) -> str:
         """
@@ -23,10 +33,18 @@ class DesignPatternsResource:
         Returns:
             格式化的设计模式文档
         """
-        if pattern not in self.patterns:
+        document = self.documents.get(pattern)
+        if document is None:
             available = ', '.join(self.patterns.keys())
             return f"未知的设计模式: {pattern}\n\n可用模式: {available}"
+        return document.text
+
+    def get_all_patterns(self) -> str:
+        """获取所有设计模式的概览"""
+        return self.documents[OVERVIEW].text
 
+    def _render_pattern_example(self, pattern: str) -> str:
+        """渲染指定设计模式的示例文档"""
         pat = self.patterns[pattern]
 
         # 构建格式化的文档
@@ -73,8 +91,8 @@ class DesignPatternsResource:
 
         return doc
 
-    def get_all_patterns(self) -> str:
-        """获取所有设计模式的概览"""
+    def _render_all_patterns(self) -> str:
+        """渲染所有设计模式的概览"""
         doc = "# C++ 设计模式与惯用法\n\n"
         doc += "现代 C++ 中常用的设计模式和最佳实践\n\n"
         doc += "---\n\n"
@@ -0,0 +1,77 @@
+"""
+预渲染的资源文档
+
+资源的数据都是静态的：每个资源在首次读取时把全部文档（各条目和 all 概览）渲染一次，
+保存在不可变的 DocumentSet 中，之后的读取只是一次字典查找。有构建时生成的数据快照
+（见 cpp_style.data.snapshot）时，文档直接取自快照，不再渲染。
+"""
+
+from types import MappingProxyType
+from typing import Callable, Iterable, Iterator, Mapping, NamedTuple
+
+from cpp_style.data.snapshot import get_snapshot
+
+# 概览文档的键（资源 URI 中的 all）
+OVERVIEW = "all"
+
+
+class Document(NamedTuple):
+    """一个渲染好的文档"""
+    text: str
+
+
+class DocumentSet(Mapping[str, Document]):
+    """一个资源的全部文档（键 -> Document），构建后不可修改"""
+
+    __slots__ = ('_documents',)
+
+    def __init__(self, texts: Mapping[str, str]):
+        """
+        Args:
+            texts: 键 -> 文档文本
+        """
+        self._documents = MappingProxyType({key: Document(text) for key, text in texts.items()})
+
+    def __getitem__(self, key: str) -> Document:
+        return self._documents[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._documents)
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+
+def render_documents(
+    keys: Iterable[str],
+    render: Callable[[str], str],
+    render_overview: Callable[[], str]
+) -> DocumentSet:
+    """
+    渲染一个资源的全部文档
+
+    Args:
+        keys: 各条目的键
+        render: 渲染单个条目
+        render_overview: 渲染 all 概览
+
+    Returns:
+        包含各条目和 OVERVIEW 的文档集
+    """
+    texts = {key: render(key) for key in keys}
+    texts[OVERVIEW] = render_overview()
+    return DocumentSet(texts)
+
+
+def load_documents(name: str, render: Callable[[], DocumentSet]) -> DocumentSet:
+    """
+    获取一个资源的全部文档：数据快照中有该资源的文档时直接使用，否则调用 render 渲染
+
+    Args:
+        name: 资源模块名（cpp_style.resources 下的模块，也是快照中文档的键）
+        render: 渲染全部文档，通常是对 render_documents 的调用
+    """
+    snapshot = get_snapshot()
+    if snapshot is not None and name in snapshot.documents:
+        return DocumentSet(snapshot.documents[name])
+    return render()
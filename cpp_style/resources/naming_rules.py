@@ -1,18 +1,27 @@
 """C++ 命名规范资源"""
 
-import json
-from pathlib import Path
 from typing import Optional
 
+from cpp_style.data import get_store
+from cpp_style.resources.documents import OVERVIEW, DocumentSet, load_documents, render_documents
+
 
 class NamingRulesResource:
     """命名规范资源提供器"""
 
     def __init__(self):
         """加载命名规范数据"""
-        data_path = Path(__file__).parent.parent / "data" / "naming_conventions.json"
-        with open(data_path, 'r', encoding='utf-8') as f:
-            self.conventions = json.load(f)
+        self.conventions = get_store().load("naming_conventions")
+        self._documents: Optional[DocumentSet] = None
+
+    @property
+    def documents(self) -> DocumentSet:
+        """全部文档（各类别和 all 概览），首次访问时取自数据快照或渲染一次"""
+        if self._documents is None:
+            self._documents = load_documents("naming_rules", lambda: render_documents(
+                self.conventions, self._render_naming_rule, self._render_all_categories
+            ))
+        return self._documents
 
     def get_naming_rule(self, category: str) -> str:
         """
@@ -24,10 +33,18 @@ class NamingRulesResource:
         Returns:
             格式化的命名规范文档
         """
-        if category not in self.conventions:
+        document = self.documents.get(category)
+        if document is None:
             available = ', '.join(self.conventions.keys())
             return f"未知的类别: {category}\n\n可用类别: {available}"
+        return document.text
+
+    def get_all_categories(self) -> str:
+        """获取所有可用类别的概览"""
+        return self.documents[OVERVIEW].text
 
+    def _render_naming_rule(self, category: str) -> str:
+        """渲染指定类别的命名规范文档"""
         conv = self.conventions[category]
 
         # 构建格式化的文档
@@ -63,8 +80,8 @@ class NamingRulesResource:
 
         return doc
 
-    def get_all_categories(self) -> str:
-        """获取所有可用类别的概览"""
+    def _render_all_categories(self) -> str:
+        """渲染所有类别的概览"""
         doc = "# C++ 命名规范类别\n\n"
         doc += "以下是所有可用的命名规范类别：\n\n"
 
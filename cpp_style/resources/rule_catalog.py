@@ -0,0 +1,87 @@
+"""检查规则目录资源"""
+
+from typing import Optional
+
+from cpp_style.resources.documents import OVERVIEW, DocumentSet, load_documents, render_documents
+from cpp_style.rules import RuleRegistry, get_registry
+
+
+class RuleCatalogResource:
+    """规则目录资源提供器：列出注册表中各检查器的规则 ID，供 rules/exclude_rules 参数使用"""
+
+    CHECKER_TITLES = {
+        "memory_safety": "内存安全",
+        "const_correctness": "const 正确性",
+        "modern_cpp": "现代 C++",
+    }
+
+    def __init__(self):
+        self._documents: Optional[DocumentSet] = None
+
+    @property
+    def registry(self) -> RuleRegistry:
+        """规则注册表（只在渲染文档时需要；文档取自数据快照时不必编译规则）"""
+        return get_registry()
+
+    @property
+    def documents(self) -> DocumentSet:
+        """全部文档（各检查器的规则表和 all 概览），首次访问时取自数据快照或渲染一次"""
+        if self._documents is None:
+            self._documents = load_documents("rule_catalog", lambda: render_documents(
+                self.registry.checkers(), self._render_checker_rules, self._render_all_rules
+            ))
+        return self._documents
+
+    def get_checker_rules(self, checker: str) -> str:
+        """
+        获取指定检查器的规则列表
+
+        Args:
+            checker: 检查器名称 (memory_safety, const_correctness, modern_cpp)
+
+        Returns:
+            格式化的规则表
+        """
+        document = self.documents.get(checker)
+        if document is None:
+            available = ', '.join(key for key in self.documents if key != OVERVIEW)
+            return f"未知的检查器: {checker}\n\n可用检查器: {available}"
+        return document.text
+
+    def get_all_rules(self) -> str:
+        """获取所有检查器的规则列表"""
+        return self.documents[OVERVIEW].text
+
+    def _render_checker_rules(self, checker: str) -> str:
+        """渲染指定检查器的规则表"""
+        rules = self.registry.for_checker(checker)
+        doc = f"# {self.CHECKER_TITLES.get(checker, checker)} 规则\n\n"
+        doc += "| 规则 ID | 名称 | 严重程度 | 最低标准 |\n"
+        doc += "|---------|------|----------|----------|\n"
+        for rule in rules:
+            doc += f"| `{rule.id}` | {rule.name} | {rule.severity} | {rule.standard_label} |\n"
+        return doc
+
+    def _render_all_rules(self) -> str:
+        """渲染所有检查器的规则列表"""
+        doc = "# 检查规则目录\n\n"
+        doc += f"共 {len(self.registry)} 条规则。"
+        doc += "工具的 `rules` / `exclude_rules` 参数接受规则 ID 或通配符（如 `mem-*`），"
+        doc += "`min_severity` 只执行严重程度不低于该级别的规则。\n\n"
+        doc += "---\n\n"
+
+        for checker in self.registry.checkers():
+            doc += self._render_checker_rules(checker).replace("# ", "## ", 1)
+            doc += "\n"
+        return doc
+
+
+# 全局实例
+_resource = None
+
+def get_resource() -> RuleCatalogResource:
+    """获取全局规则目录资源实例"""
+    global _resource
+    if _resource is None:
+        _resource = RuleCatalogResource()
+    return _resource
@@ -0,0 +1,535 @@
+"""
+声明式规则注册表
+
+内存安全、const 正确性和现代 C++ 检查器的规则定义在 data/rules_*.json 中，
+每条规则有稳定的 ID、严重程度、最低适用标准和正则模式。所有模式在第一次使用
+时编译一次，检查器遍历注册表执行规则，新增规则不会增加每次调用的编译开销。
+规则文件通过 cpp_style.data 的共享存储加载。
+
+规则执行方式（mode）:
+- match: 每个匹配产生一个带位置的问题
+- count: 统计匹配次数，次数大于 0 时产生一个汇总问题
+- presence: 模式出现（且 unless 模式未出现）时产生一条整体结论
+- compare: 模式的匹配次数多于 compare 模式时产生一条整体结论
+
+只靠正则无法表达的上下文判断（如"delete 之后是否置空"）由规则的 check 字段
+引用检查器模块中注册的具名谓词完成。
+
+count/presence/compare 是对整个文件得出一个结论的整体规则：先在源码上统计出
+Tally，再由 reduce_tallies 得出结论。分块分析大文件时，各分块的 Tally 汇总后
+统一归约，结论与整文件分析一致。
+"""
+
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from fnmatch import fnmatchcase
+from types import MappingProxyType
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Pattern, Tuple
+
+from cpp_style.data import DataStore, get_store
+from cpp_style.data.snapshot import get_snapshot
+from cpp_style.deadline import Deadline, RuleTimeout
+from cpp_style.profiling import RuleProfile
+from cpp_style.source_buffer import SourceBuffer
+
+# 按时间排序的标准，用于比较规则的最低适用标准
+STANDARDS = ("cpp98", "cpp11", "cpp14", "cpp17", "cpp20", "cpp23")
+
+SEVERITIES = ("error", "warning", "info")
+
+MODES = ("match", "count", "presence", "compare")
+
+# 规则在哪个视图上匹配：code 为屏蔽注释和字面量后的纯代码视图，text 为原文
+VIEWS = ("code", "text")
+
+_FLAGS = {
+    "DOTALL": re.DOTALL,
+    "MULTILINE": re.MULTILINE,
+    "IGNORECASE": re.IGNORECASE,
+}
+
+# 谓词: (规则, 匹配, 视图文本, 本次调用共享的上下文) -> 是否报告
+Check = Callable[["Rule", "re.Match", str, Dict], bool]
+
+# 规则观察者: (规则, 该规则产生的结果)，每条规则执行完（或超时中止）后调用一次
+RuleObserver = Callable[["Rule", List[Dict]], None]
+
+_observer: ContextVar[Optional[RuleObserver]] = ContextVar("rule_observer", default=None)
+_profile: ContextVar[Optional[RuleProfile]] = ContextVar("rule_profile", default=None)
+
+
+class Rule(NamedTuple):
+    """一条预编译的检查规则"""
+    id: str
+    checker: str
+    type: str
+    severity: str
+    min_standard: str
+    mode: str
+    name: str
+    pattern: Pattern
+    view: str
+    any_of: Tuple[Tuple[Pattern, str], ...]
+    unless: Optional[Pattern]
+    compare: Optional[Pattern]
+    exclude: Mapping[int, FrozenSet[str]]
+    check: Optional[str]
+    params: Mapping[str, object]
+    message: str
+    suggestion: str
+    location: Optional[str]
+    lookup: Mapping[str, str]
+    details: Mapping[str, str]
+
+    @property
+    def standard_label(self) -> str:
+        """标准的显示名称，如 cpp17 -> C++17"""
+        return "C++" + self.min_standard[3:]
+
+    @property
+    def aggregate(self) -> bool:
+        """是否为整体规则（对整个文件得出一个结论，而不是逐个匹配报告）"""
+        return self.mode != "match"
+
+
+class Tally(NamedTuple):
+    """整体规则在一段源码上的统计，多段源码的统计可以相加后再归约"""
+    count: int = 0
+    other_count: int = 0
+    found: bool = False
+    blocked: bool = False
+
+
+class RuleSelection(NamedTuple):
+    """
+    单次调用的规则选择
+
+    未被选中的规则在执行前就被剔除，完全不会运行，
+    因此只关心少数规则的调用开销也相应更小。
+    """
+    rules: Tuple[str, ...] = ()
+    exclude_rules: Tuple[str, ...] = ()
+    min_severity: str = "info"
+
+    @classmethod
+    def of(
+        cls,
+        rules: Optional[Iterable[str]] = None,
+        exclude_rules: Optional[Iterable[str]] = None,
+        min_severity: Optional[str] = None
+    ) -> 'RuleSelection':
+        """
+        构建并校验规则选择
+
+        Args:
+            rules: 只执行这些规则（为空表示全部），支持通配符，如 "mem-*"
+            exclude_rules: 不执行这些规则，支持通配符
+            min_severity: 只执行严重程度不低于该级别的规则 (error, warning, info)
+
+        Raises:
+            ValueError: 严重程度未知，或某个规则模式不匹配任何已注册规则
+        """
+        selection = cls(tuple(rules or ()), tuple(exclude_rules or ()), min_severity or "info")
+        if selection.min_severity not in SEVERITIES:
+            raise ValueError(f"未知的严重程度: {selection.min_severity}（可用: {', '.join(SEVERITIES)}）")
+        ids = rule_ids()
+        for pattern in selection.rules + selection.exclude_rules:
+            if not any(fnmatchcase(rule_id, pattern) for rule_id in ids):
+                raise ValueError(f"未知的规则: {pattern}（规则列表见 cpp-style://rules/all）")
+        return selection
+
+    @property
+    def is_default(self) -> bool:
+        """是否选择了全部规则"""
+        return not self.rules and not self.exclude_rules and self.min_severity == "info"
+
+    def allows(self, rule: Rule) -> bool:
+        """规则是否被选中"""
+        if SEVERITIES.index(rule.severity) > SEVERITIES.index(self.min_severity):
+            return False
+        if self.rules and not any(fnmatchcase(rule.id, pattern) for pattern in self.rules):
+            return False
+        return not any(fnmatchcase(rule.id, pattern) for pattern in self.exclude_rules)
+
+    def apply(self, rules: Tuple[Rule, ...]) -> Tuple[Rule, ...]:
+        """筛选出被选中的规则（保持定义顺序）"""
+        if self.is_default:
+            return rules
+        return tuple(rule for rule in rules if self.allows(rule))
+
+
+ALL_RULES = RuleSelection()
+
+
+def standard_rank(standard: str) -> int:
+    """标准的先后顺序；未知标准返回 -1"""
+    try:
+        return STANDARDS.index(standard)
+    except ValueError:
+        return -1
+
+
+class RuleRegistry:
+    """规则注册表：按检查器分组、按定义顺序保存的只读规则集合"""
+
+    def __init__(self, rules: List[Rule]):
+        self._rules: Dict[str, Rule] = {}
+        self._by_checker: Dict[str, Tuple[Rule, ...]] = {}
+        grouped: Dict[str, List[Rule]] = {}
+        for rule in rules:
+            if rule.id in self._rules:
+                raise ValueError(f"规则 ID 重复: {rule.id}")
+            self._rules[rule.id] = rule
+            grouped.setdefault(rule.checker, []).append(rule)
+        for checker, items in grouped.items():
+            self._by_checker[checker] = tuple(items)
+
+    @classmethod
+    def load(cls, store: Optional[DataStore] = None) -> 'RuleRegistry':
+        """从数据集存储中的 rules_* 数据集加载并编译所有规则"""
+        store = store or get_store()
+        rules: List[Rule] = []
+        for name in store.names("rules_"):
+            data = store.load(name)
+            checker = data["checker"]
+            for entry in data["rules"]:
+                try:
+                    rules.append(_compile_rule(checker, entry))
+                except (KeyError, ValueError, re.error) as e:
+                    raise ValueError(f"{name}.json: 规则 {entry.get('id', '?')} 无效: {e}") from e
+        return cls(rules)
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def __iter__(self) -> Iterator[Rule]:
+        return iter(self._rules.values())
+
+    def __contains__(self, rule_id: str) -> bool:
+        return rule_id in self._rules
+
+    def get(self, rule_id: str) -> Optional[Rule]:
+        return self._rules.get(rule_id)
+
+    def for_checker(self, checker: str) -> Tuple[Rule, ...]:
+        """指定检查器的规则（按定义顺序）"""
+        return self._by_checker.get(checker, ())
+
+    def checkers(self) -> Tuple[str, ...]:
+        return tuple(self._by_checker)
+
+
+def _compile_rule(checker: str, entry: Mapping) -> Rule:
+    """校验并编译单条规则定义"""
+    flags = 0
+    for flag in entry.get("flags", []):
+        flags |= _FLAGS[flag]
+
+    severity = entry.get("severity", "info")
+    min_standard = entry.get("min_standard", "cpp98")
+    mode = entry.get("mode", "match")
+    view = entry.get("view", "code")
+    if severity not in SEVERITIES:
+        raise ValueError(f"未知的严重程度: {severity}")
+    if min_standard not in STANDARDS:
+        raise ValueError(f"未知的标准: {min_standard}")
+    if mode not in MODES:
+        raise ValueError(f"未知的执行方式: {mode}")
+    if view not in VIEWS:
+        raise ValueError(f"未知的视图: {view}")
+    if mode == "compare" and "compare" not in entry:
+        raise ValueError("compare 规则缺少 compare 模式")
+
+    any_of = tuple(
+        (re.compile(alt["pattern"], flags), alt.get("view", "code"))
+        for alt in entry.get("any_of", [])
+    )
+
+    return Rule(
+        id=entry["id"],
+        checker=checker,
+        type=entry.get("type", entry["id"]),
+        severity=severity,
+        min_standard=min_standard,
+        mode=mode,
+        name=entry.get("name", ""),
+        pattern=re.compile(entry["pattern"], flags),
+        view=view,
+        any_of=any_of,
+        unless=re.compile(entry["unless"], flags) if "unless" in entry else None,
+        compare=re.compile(entry["compare"], flags) if "compare" in entry else None,
+        exclude=MappingProxyType({
+            int(group): frozenset(values) for group, values in entry.get("exclude", {}).items()
+        }),
+        check=entry.get("check"),
+        params=MappingProxyType(dict(entry.get("params", {}))),
+        message=entry.get("message", ""),
+        suggestion=entry.get("suggestion", ""),
+        location=entry.get("location"),
+        lookup=MappingProxyType(dict(entry.get("lookup", {}))),
+        details=MappingProxyType(dict(entry.get("details", {}))),
+    )
+
+
+def validate_checks(rules: Tuple[Rule, ...], checks: Mapping[str, Check]) -> None:
+    """确认规则引用的谓词都已注册，避免在分析时才发现拼写错误"""
+    for rule in rules:
+        if rule.check and rule.check not in checks:
+            raise ValueError(f"规则 {rule.id} 引用了未注册的检查: {rule.check}")
+
+
+# 谓词参数中表示在匹配前后查看多少个字符的键
+_WINDOW_PARAMS = ("window", "before")
+
+
+def context_window(rules: Iterable[Rule]) -> int:
+    """规则的谓词在匹配前后查看的最大字符数（params 中的 window 和 before）"""
+    return max(
+        (int(rule.params[key]) for rule in rules for key in _WINDOW_PARAMS if key in rule.params),
+        default=0,
+    )
+
+
+def _view(source: SourceBuffer, view: str) -> str:
+    return source.code if view == "code" else source.text
+
+
+@contextmanager
+def observe_rules(observer: RuleObserver) -> Iterator[None]:
+    """在上下文中执行的每条规则完成后通知 observer（用于流式进度通知）"""
+    token = _observer.set(observer)
+    try:
+        yield
+    finally:
+        _observer.reset(token)
+
+
+@contextmanager
+def profile_rules(profile: Optional[RuleProfile]) -> Iterator[None]:
+    """在上下文中执行的每条规则都把耗时和结果数记入 profile（debug_profile 使用，None 时不记录）"""
+    token = _profile.set(profile)
+    try:
+        yield
+    finally:
+        _profile.reset(token)
+
+
+def run_rules(
+    rules: Iterable[Rule],
+    source: SourceBuffer,
+    checks: Mapping[str, Check],
+    deadline: Optional[Deadline] = None,
+    tallies: Optional[Dict[str, Tally]] = None
+) -> List[Dict]:
+    """
+    依次执行多条规则
+
+    Args:
+        rules: 要执行的规则（已按选择筛选）
+        source: 共享的 SourceBuffer
+        checks: 检查器注册的谓词
+        deadline: 可选的截止时间；超时的规则被中止并保留已找到的结果，
+            请求截止时间到达后剩余规则不再执行（均记录在 deadline 中）
+        tallies: 分块分析时传入：整体规则只统计不下结论，统计结果按规则 ID 存入其中
+
+    Returns:
+        问题列表
+    """
+    issues: List[Dict] = []
+    context: Dict = {}
+    observer = _observer.get()
+    profile = _profile.get()
+    if deadline is None:
+        for rule in rules:
+            found = len(issues)
+            started = time.perf_counter() if profile is not None else 0.0
+            run_rule(rule, source, checks, context, issues, tallies=tallies)
+            if profile is not None:
+                profile.record(rule.id, rule.checker, time.perf_counter() - started, len(issues) - found)
+            if observer is not None:
+                observer(rule, issues[found:])
+        return issues
+
+    rules = list(rules)
+    for index, rule in enumerate(rules):
+        if deadline.expired:
+            deadline.skip(r.id for r in rules[index:])
+            break
+        found = len(issues)
+        started = time.perf_counter() if profile is not None else 0.0
+        timed_out = False
+        try:
+            with deadline.guard(rule.id):
+                run_rule(rule, source, checks, context, issues, deadline, tallies)
+        except RuleTimeout:
+            timed_out = True
+        if profile is not None:
+            profile.record(rule.id, rule.checker, time.perf_counter() - started, len(issues) - found, timed_out)
+        if observer is not None:
+            observer(rule, issues[found:])
+    return issues
+
+
+def run_rule(
+    rule: Rule,
+    source: SourceBuffer,
+    checks: Mapping[str, Check],
+    context: Dict,
+    issues: List[Dict],
+    deadline: Optional[Deadline] = None,
+    tallies: Optional[Dict[str, Tally]] = None
+) -> None:
+    """
+    在源码上执行一条规则，结果追加到 issues
+
+    逐个追加而不是最后一次性返回，规则中途超时时已找到的结果得以保留。
+
+    Args:
+        rule: 要执行的规则
+        source: 共享的 SourceBuffer
+        checks: 检查器注册的谓词
+        context: 本次分析中各规则共享的缓存（谓词可在其中保存索引）
+        issues: 结果列表；整体规则最多追加一项
+        deadline: 可选的截止时间，用于在匹配之间做协作式检查
+        tallies: 传入时整体规则的统计存入其中，不追加结论
+    """
+    if rule.mode == "match":
+        _run_match(rule, source, _view(source, rule.view), checks, context, issues, deadline)
+        return
+
+    tally = tally_rule(rule, source, deadline)
+    if tallies is not None:
+        tallies[rule.id] = tally
+        return
+    summary = reduce_tallies(rule, (tally,))
+    if summary is not None:
+        issues.append(summary)
+
+
+def tally_rule(rule: Rule, source: SourceBuffer, deadline: Optional[Deadline] = None) -> Tally:
+    """统计整体规则在源码上的匹配情况"""
+    code = _view(source, rule.view)
+
+    if rule.mode == "presence":
+        found = rule.pattern.search(code) is not None or any(
+            alt.search(_view(source, alt_view)) is not None for alt, alt_view in rule.any_of
+        )
+        blocked = rule.unless is not None and rule.unless.search(code) is not None
+        return Tally(found=found, blocked=blocked)
+
+    count = _count(rule.pattern, code, deadline)
+    other_count = _count(rule.compare, code, deadline) if rule.mode == "compare" else 0
+    return Tally(count, other_count)
+
+
+def reduce_tallies(rule: Rule, tallies: Iterable[Tally]) -> Optional[Dict]:
+    """
+    汇总整体规则在各段源码上的统计并得出结论
+
+    Returns:
+        结论条目；规则不成立时返回 None
+    """
+    count = other_count = 0
+    found = blocked = False
+    for tally in tallies:
+        count += tally.count
+        other_count += tally.other_count
+        found = found or tally.found
+        blocked = blocked or tally.blocked
+
+    if rule.mode == "presence":
+        return _summary(rule) if found and not blocked else None
+    if rule.mode == "count":
+        return _summary(rule, count=count) if count else None
+    # compare
+    return _summary(rule, count=count, other_count=other_count) if count > other_count else None
+
+
+# 每隔多少个匹配做一次协作式超时检查
+_CHECK_INTERVAL = 256
+
+
+def _count(pattern: Pattern, code: str, deadline: Optional[Deadline]) -> int:
+    """统计匹配次数"""
+    if deadline is None:
+        return sum(1 for _ in pattern.finditer(code))
+    count = 0
+    for _ in pattern.finditer(code):
+        count += 1
+        if count % _CHECK_INTERVAL == 0:
+            deadline.check()
+    return count
+
+
+def _run_match(
+    rule: Rule,
+    source: SourceBuffer,
+    code: str,
+    checks: Mapping[str, Check],
+    context: Dict,
+    issues: List[Dict],
+    deadline: Optional[Deadline]
+) -> None:
+    """逐个匹配生成带位置的问题"""
+    exclude = rule.exclude.items()
+    check = checks[rule.check] if rule.check else None
+    seen = 0
+
+    for match in rule.pattern.finditer(code):
+        if deadline is not None:
+            seen += 1
+            if seen % _CHECK_INTERVAL == 0:
+                deadline.check()
+        if exclude and any(match.group(group) in values for group, values in exclude):
+            continue
+        if check is not None and not check(rule, match, code, context):
+            continue
+
+        groups = (match.group(0),) + match.groups('')
+        extra = {"lookup": rule.lookup.get(match.group(1), "")} if rule.lookup else {}
+        start, end = match.start(), match.end()
+        issues.append({
+            "type": rule.type,
+            "severity": rule.severity,
+            "message": rule.message.format(*groups, **extra),
+            "suggestion": rule.suggestion.format(*groups, **extra),
+            "location": rule.location.format(*groups, **extra) if rule.location else source.excerpt(start, end),
+            **source.region(start, end),
+            "rule": rule.id,
+        })
+
+
+def _summary(rule: Rule, **values) -> Dict:
+    """整体结论：问题条目（line 为 0），或带 details 的现代化建议"""
+    if rule.details:
+        return {"standard": rule.standard_label, **rule.details, "rule": rule.id}
+    return {
+        "type": rule.type,
+        "severity": rule.severity,
+        "message": rule.message.format(**values),
+        "suggestion": rule.suggestion.format(**values),
+        "location": rule.location or "",
+        "line": 0,
+        "rule": rule.id,
+    }
+
+
+# 全局实例：第一次使用时加载并编译全部规则
+_registry: Optional[RuleRegistry] = None
+
+def get_registry() -> RuleRegistry:
+    """获取全局规则注册表"""
+    global _registry
+    if _registry is None:
+        _registry = RuleRegistry.load()
+    return _registry
+
+
+def rule_ids() -> Tuple[str, ...]:
+    """全部规则 ID（按定义顺序）；注册表尚未编译时取自数据快照的规则表，不必编译规则"""
+    snapshot = get_snapshot()
+    if _registry is None and snapshot is not None:
+        return tuple(rule_id for ids in snapshot.rule_ids.values() for rule_id in ids)
+    return tuple(rule.id for rule in get_registry())
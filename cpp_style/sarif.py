@@ -0,0 +1,224 @@
+"""
+SARIF 2.1.0 输出
+
+output_format="sarif" 时，内存安全、const 正确性、现代化建议和包含保护的问题直接由
+FindingSet 转换为 SARIF 日志，供代码扫描平台和 IDE 导入：
+
+- tool.driver.rules 列出结果中出现的规则（名称、默认级别、固定建议、检查器标签），
+  每个结果通过 ruleIndex 引用
+- 区域使用与 json 格式相同的行列号（从 1 开始，结束列指向最后一个字符之后），
+  列号按 Unicode 码点计数（run.columnKind = unicodeCodePoints）
+- partialFingerprints.primaryLocationLineHash 由规则 ID 和所在行的文本（空白归一化）
+  计算，加上同一规则在相同文本行上的序号；代码上下移动时指纹不变
+- 日志逐段生成：外层结构只编码一次，结果每 _BATCH 个编码为一段后拼接，几万个结果
+  也不需要先构建整棵嵌套对象树
+"""
+
+import functools
+import hashlib
+import json
+import re
+import tomllib
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import quote
+
+from cpp_style import __version__
+from cpp_style.deadline import Deadline
+from cpp_style.output import FindingSet
+from cpp_style.rules import get_registry
+from cpp_style.source_buffer import SourceBuffer
+
+SARIF_VERSION = "2.1.0"
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+# 未提供 file_path 时结果所在文件的 URI
+DEFAULT_ARTIFACT_URI = "stdin"
+
+_TOOL_NAME = "cpp-style"
+# 项目主页取自 pyproject.toml 的 [project.urls]（源码目录中没有时取自已安装包的元数据）
+_DISTRIBUTION = "cpp-style-guide-mcp"
+_PYPROJECT = Path(__file__).resolve().parent.parent / "pyproject.toml"
+_URL_LABEL = "Repository"
+_FINGERPRINT_KEY = "primaryLocationLineHash"
+
+# 每段编码的结果数（逐个编码时 JSONEncoder 的调用开销占大头）
+_BATCH = 512
+
+_LEVELS = {"error": "error", "warning": "warning", "info": "note"}
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+_WHITESPACE_RE = re.compile(r'\s+')
+_DRIVE_RE = re.compile(r'^[A-Za-z]:/')
+
+
+@functools.lru_cache(maxsize=None)
+def information_uri() -> Optional[str]:
+    """工具的 informationUri：项目的 Repository 地址，都找不到时为 None（该字段可省略）"""
+    try:
+        with open(_PYPROJECT, "rb") as f:
+            return tomllib.load(f)["project"]["urls"][_URL_LABEL]
+    except (OSError, tomllib.TOMLDecodeError, KeyError):
+        pass
+    try:
+        entries = metadata.metadata(_DISTRIBUTION).get_all("Project-URL") or []
+    except metadata.PackageNotFoundError:
+        return None
+    for entry in entries:
+        label, _, url = entry.partition(",")
+        if label.strip() == _URL_LABEL:
+            return url.strip()
+    return None
+
+
+def artifact_uri(file_path: Optional[str]) -> str:
+    """文件路径转换为 SARIF 的 artifactLocation.uri（Windows 路径改用 / 分隔）"""
+    if not file_path:
+        return DEFAULT_ARTIFACT_URI
+    path = file_path.replace("\\", "/")
+    if _DRIVE_RE.match(path):
+        return "file:///" + quote(path, safe="/:")
+    return quote(path, safe="/:@")
+
+
+def render(
+    findings: FindingSet,
+    source: SourceBuffer,
+    file_path: Optional[str] = None,
+    deadline: Optional[Deadline] = None
+) -> str:
+    """
+    生成 SARIF 日志
+
+    Args:
+        findings: 问题列表
+        source: 被分析的源码（用于计算指纹）
+        file_path: 结果所在文件的路径，默认 DEFAULT_ARTIFACT_URI
+        deadline: 执行时使用的截止时间；有规则超时时记录为工具执行通知
+
+    Returns:
+        SARIF 2.1.0 JSON 文本
+    """
+    return "".join(iter_sarif(findings, source, file_path, deadline))
+
+
+def iter_sarif(
+    findings: FindingSet,
+    source: SourceBuffer,
+    file_path: Optional[str] = None,
+    deadline: Optional[Deadline] = None
+) -> Iterator[str]:
+    """逐段生成 SARIF 日志（参数同 render）"""
+    rule_index = {rule_id: i for i, rule_id in enumerate(findings.rules)}
+    location = {"uri": artifact_uri(file_path), "index": 0}
+
+    driver = {"name": _TOOL_NAME, "version": __version__}
+    if information_uri() is not None:
+        driver["informationUri"] = information_uri()
+    driver["rules"] = [_descriptor(rule_id, info) for rule_id, info in findings.rules.items()]
+    run = {
+        "tool": {"driver": driver},
+        "artifacts": [{"location": {"uri": location["uri"]}, "length": len(source.text.encode("utf-8"))}],
+        "invocations": [_invocation(deadline)],
+        "columnKind": "unicodeCodePoints",
+    }
+    head = _encode({"version": SARIF_VERSION, "$schema": SARIF_SCHEMA, "runs": [run]})
+    # 结果数组插入到 run 对象末尾：'...}]}' -> '...,"results":[' + 结果 + ']}]}'
+    yield head[:-3] + ',"results":['
+
+    occurrences: Dict[str, int] = {}
+    # 归一化后的行文本（不同规则常在同一行上报告问题）
+    contexts: Dict[int, str] = {}
+    batch: List[Dict] = []
+    separator = ""
+    for finding in findings.items:
+        rule_id = finding["rule"]
+        physical: Dict = {"artifactLocation": location}
+
+        finding_range = finding.get("range")
+        if finding_range:
+            line, column, end_line, end_column = finding_range
+            region = {"startLine": line, "startColumn": column, "endLine": end_line, "endColumn": end_column}
+            if finding.get("code"):
+                region["snippet"] = {"text": finding["code"]}
+            physical["region"] = region
+            context = contexts.get(line)
+            if context is None:
+                text_line = source.line_text(line) if line <= source.line_count else ""
+                context = contexts[line] = _WHITESPACE_RE.sub(" ", text_line).strip()
+        else:
+            context = ""
+
+        digest = hashlib.sha256(f"{rule_id}\0{context}".encode("utf-8")).hexdigest()[:16]
+        occurrence = occurrences.get(digest, 0) + 1
+        occurrences[digest] = occurrence
+
+        result = {
+            "ruleId": rule_id,
+            "ruleIndex": rule_index[rule_id],
+            "level": _LEVELS[finding["severity"]],
+            "message": {"text": _result_message(finding)},
+            "locations": [{"physicalLocation": physical}],
+            "partialFingerprints": {_FINGERPRINT_KEY: f"{digest}:{occurrence}"},
+        }
+        if finding.get("data"):
+            result["properties"] = finding["data"]
+        batch.append(result)
+        if len(batch) == _BATCH:
+            yield separator + _encode(batch)[1:-1]
+            separator = ","
+            batch.clear()
+
+    if batch:
+        yield separator + _encode(batch)[1:-1]
+    yield "]}]}"
+
+
+def _result_message(finding: Dict) -> str:
+    """结果消息：问题描述，问题专属的建议附在后面（规则共用的建议在规则的 help 中）"""
+    data = finding.get("data") or {}
+    if "old_pattern" in data:
+        # 现代化建议：旧写法 -> 新写法
+        return f"{finding['message']}：{data['old_pattern']} → {data['new_pattern']}"
+    if finding.get("suggestion"):
+        return f"{finding['message']}。建议：{finding['suggestion']}"
+    return finding["message"]
+
+
+def _descriptor(rule_id: str, info: Dict) -> Dict:
+    """规则元数据（reportingDescriptor）"""
+    descriptor: Dict = {
+        "id": rule_id,
+        "shortDescription": {"text": info["name"]},
+        "defaultConfiguration": {"level": _LEVELS[info["severity"]]},
+        "properties": {"tags": [info["checker"]]},
+    }
+    if info.get("suggestion"):
+        descriptor["help"] = {"text": info["suggestion"]}
+
+    rule = get_registry().get(rule_id)
+    if rule is not None:
+        descriptor["properties"]["tags"].append(rule.type)
+        if rule.checker == "modern_cpp":
+            descriptor["properties"]["minimumStandard"] = rule.standard_label
+    return descriptor
+
+
+def _invocation(deadline: Optional[Deadline]) -> Dict:
+    """执行情况：有规则超时或被跳过时 executionSuccessful 为 false，并逐条记录通知"""
+    invocation: Dict = {"executionSuccessful": deadline is None or not deadline.partial}
+    if deadline is None:
+        return invocation
+
+    notifications = [
+        {"level": "warning", "message": {"text": reason}, "descriptor": {"id": rule_id}}
+        for rule_id, reason in deadline.timeouts
+    ]
+    notifications.extend(
+        {"level": "note", "message": {"text": "截止时间已到，规则未执行"}, "descriptor": {"id": rule_id}}
+        for rule_id in deadline.skipped
+    )
+    if notifications:
+        invocation["toolExecutionNotifications"] = notifications
+    return invocation
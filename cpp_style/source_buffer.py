@@ -0,0 +1,120 @@
+"""C++ 源码缓冲区：一次构建、供所有检查器共享的行偏移索引"""
+
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple, Union
+
+from cpp_style.lexer import TokenStream, mask_code, tokenize
+
+
+class SourceBuffer:
+    """
+    源码缓冲区
+
+    每个请求只构建一次，预先计算每行起始偏移，行列号通过二分查找得到，
+    避免每个匹配都执行 code[:offset].count('\\n') 带来的平方级开销。
+    token 流和纯代码视图在首次访问时生成，之后由所有检查器共享。
+    """
+
+    __slots__ = ('text', '_line_starts', '_tokens', '_code')
+
+    def __init__(self, text: str):
+        self.text = text
+        starts = [0]
+        find = text.find
+        pos = find('\n')
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = find('\n', pos + 1)
+        self._line_starts = starts
+        self._tokens: Optional[TokenStream] = None
+        self._code: Optional[str] = None
+
+    @classmethod
+    def of(cls, code: Union[str, 'SourceBuffer']) -> 'SourceBuffer':
+        """将字符串包装为 SourceBuffer；已经是 SourceBuffer 时原样返回"""
+        if isinstance(code, SourceBuffer):
+            return code
+        return cls(code)
+
+    @property
+    def tokens(self) -> TokenStream:
+        """token 流（首次访问时词法分析）"""
+        if self._tokens is None:
+            self._tokens = tokenize(self.text)
+        return self._tokens
+
+    @property
+    def code(self) -> str:
+        """纯代码视图：注释、预处理指令和字面量内容已替换为空格，偏移与原文一致"""
+        if self._code is None:
+            self._code = mask_code(self.tokens)
+        return self._code
+
+    @property
+    def line_count(self) -> int:
+        """总行数"""
+        return len(self._line_starts)
+
+    def line_of(self, offset: int) -> int:
+        """偏移量所在的行号（从 1 开始）"""
+        return bisect_right(self._line_starts, offset)
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """
+        偏移量对应的位置
+
+        Returns:
+            (行号, 列号)，均从 1 开始
+        """
+        line = bisect_right(self._line_starts, offset)
+        return line, offset - self._line_starts[line - 1] + 1
+
+    def span(self, start: int, end: int) -> Tuple[int, int, int, int]:
+        """
+        [start, end) 区间对应的范围
+
+        Returns:
+            (起始行, 起始列, 结束行, 结束列)，结束列指向最后一个字符之后
+        """
+        line, column = self.position(start)
+        end_line, end_column = self.position(end)
+        return line, column, end_line, end_column
+
+    def region(self, start: int, end: int) -> Dict[str, int]:
+        """[start, end) 区间的范围字典，可直接合并进问题条目"""
+        line, column, end_line, end_column = self.span(start, end)
+        return {
+            "line": line,
+            "column": column,
+            "end_line": end_line,
+            "end_column": end_column,
+        }
+
+    def section(self, start: int, end: int) -> 'SourceBuffer':
+        """
+        [start, end) 区间的缓冲区
+
+        start 和 end 必须是不落在任何 token 中间的行首（如 chunking.boundaries 的切分点），
+        此时区间单独词法分析的结果与本缓冲区的对应部分相同，纯代码视图直接截取，不再重新分析
+        """
+        section = SourceBuffer(self.text[start:end])
+        if self._code is not None:
+            section._code = self._code[start:end]
+        return section
+
+    def excerpt(self, start: int, end: int) -> str:
+        """获取 [start, end) 区间的原文（在纯代码视图上匹配时用于展示原始代码）"""
+        return self.text[start:end]
+
+    def line_text(self, line: int) -> str:
+        """获取指定行（从 1 开始）的文本，不含换行符"""
+        start = self._line_starts[line - 1]
+        end = self._line_starts[line] - 1 if line < len(self._line_starts) else len(self.text)
+        return self.text[start:end]
+
+    def lines(self) -> List[str]:
+        """按行切分的文本"""
+        return self.text.split('\n')
+
+    def __len__(self) -> int:
+        return len(self.text)
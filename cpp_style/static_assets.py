@@ -0,0 +1,91 @@
+"""
+内存中的静态资源
+
+server-card.json 和 icon.svg 会被注册表扫描器频繁轮询。两个文件在启动时读入内存，
+同时准备好 gzip 压缩版本，请求处理不再访问磁盘：
+
+- 强 ETag 由内容哈希得出，原始内容和 gzip 版本各有一个（不同的表示形式）
+- Cache-Control 允许客户端和代理长时间缓存，过期后可以带 If-None-Match 重新验证
+- If-None-Match 匹配时返回 304，不发送内容
+- 客户端接受 gzip（Accept-Encoding）且压缩后更小时发送 gzip 版本
+"""
+
+import gzip
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+# 默认的缓存时间（秒）
+DEFAULT_MAX_AGE = 24 * 3600
+
+
+class StaticAsset(NamedTuple):
+    """一个加载到内存中的静态文件"""
+    body: bytes
+    etag: str
+    # gzip 版本及其 ETag；压缩后不比原始内容小时为 None
+    gzip_body: Optional[bytes]
+    gzip_etag: Optional[str]
+    media_type: str
+    max_age: int
+
+    @classmethod
+    def load(cls, path: Path, media_type: str, max_age: int = DEFAULT_MAX_AGE) -> Optional['StaticAsset']:
+        """读取文件并预先压缩；文件不存在时返回 None"""
+        try:
+            body = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # mtime=0：压缩结果只取决于内容
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(compressed) >= len(body):
+            return cls(body, f'"{digest}"', None, None, media_type, max_age)
+        return cls(body, f'"{digest}"', compressed, f'"{digest}-gzip"', media_type, max_age)
+
+    def response(self, request: Request) -> Response:
+        """按请求的 If-None-Match 和 Accept-Encoding 返回 304、gzip 版本或原始内容"""
+        use_gzip = self.gzip_body is not None and _accepts_gzip(request.headers.get("accept-encoding", ""))
+        etag = self.gzip_etag if use_gzip else self.etag
+        headers: Dict[str, str] = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={self.max_age}",
+            "Vary": "Accept-Encoding",
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None and _etag_matches(if_none_match, (self.etag, self.gzip_etag)):
+            # 客户端缓存的任一表示形式都仍然有效
+            return Response(status_code=304, headers=headers)
+
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(self.gzip_body, media_type=self.media_type, headers=headers)
+        return Response(self.body, media_type=self.media_type, headers=headers)
+
+
+def _etag_matches(if_none_match: str, etags: Iterable[Optional[str]]) -> bool:
+    """If-None-Match 是否匹配（弱比较：忽略 W/ 前缀）"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return any(etag is not None and etag in candidates for etag in etags)
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Accept-Encoding 是否接受 gzip（q=0 表示拒绝）"""
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
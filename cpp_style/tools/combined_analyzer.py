@@ -0,0 +1,213 @@
+"""C++ 综合分析工具：一次解析，运行所有代码检查器"""
+
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from cpp_style.deadline import Deadline
+from cpp_style.output import INCLUDE_GUARD_MISSING
+from cpp_style.rules import ALL_RULES, RuleSelection, get_registry
+from cpp_style.source_buffer import SourceBuffer
+from cpp_style.tools.const_checker import get_checker as get_const_checker
+from cpp_style.tools.include_guard_checker import get_checker as get_include_guard_checker
+from cpp_style.tools.memory_safety import get_analyzer as get_memory_analyzer
+from cpp_style.tools.modern_cpp import get_suggester as get_modern_cpp_suggester
+
+# 源文件扩展名：这些文件不需要包含保护
+_SOURCE_SUFFIXES = {'.c', '.cc', '.cpp', '.cxx', '.c++'}
+
+
+class CombinedAnalyzer:
+    """综合分析器：共享同一个 SourceBuffer，依次运行各检查器"""
+
+    SECTION_TITLES = {
+        "memory_safety": "内存安全",
+        "const_correctness": "const 正确性",
+        "modern_cpp": "现代 C++",
+        "include_guard": "包含保护",
+    }
+
+    def analyze_all(
+        self,
+        code: Union[str, SourceBuffer],
+        file_path: Optional[str] = None,
+        target_standard: str = "cpp17",
+        selection: Optional[RuleSelection] = None,
+        deadline: Optional[Deadline] = None,
+        render: bool = True
+    ) -> Tuple[Dict[str, Dict], str]:
+        """
+        对同一份代码运行所有检查器
+
+        Args:
+            code: 要分析的 C++ 代码（或已构建的 SourceBuffer）
+            file_path: 可选的文件路径；源文件（.cpp 等）会跳过包含保护检查
+            target_standard: 现代化建议的目标标准 (cpp11, cpp14, cpp17, cpp20, cpp23)
+            selection: 规则选择；没有任何规则被选中的检查器整体跳过。
+                包含保护检查不在规则注册表中，指定 rules 或 min_severity=error 时跳过
+            deadline: 可选的截止时间，由所有检查器共享；超时的检查器返回部分结果
+            render: 是否生成报告（结构化输出只需要各检查器的问题列表，报告均为空字符串）
+
+        Returns:
+            (各检查器结果 {名称: {"issues", "report", "elapsed_ms"}}, 合并后的报告)
+        """
+        total_start = time.perf_counter()
+
+        # 共享解析：行索引、token 流和纯代码视图只构建一次
+        source = SourceBuffer.of(code)
+        source.code  # 触发词法分析，后续检查器直接复用
+        parse_ms = (time.perf_counter() - total_start) * 1000
+
+        results: Dict[str, Dict] = {}
+        selection = selection or ALL_RULES
+        registry = get_registry()
+
+        checkers = (
+            ("memory_safety", lambda: get_memory_analyzer().analyze_memory_safety(
+                source, selection, deadline, render)),
+            ("const_correctness", lambda: get_const_checker().check_const_correctness(
+                source, selection, deadline, render)),
+            ("modern_cpp", lambda: get_modern_cpp_suggester().suggest_modern_cpp(
+                source, target_standard, selection, deadline, render)),
+        )
+        for name, func in checkers:
+            rules = selection.apply(registry.for_checker(name))
+            if rules:
+                self._run(results, name, func)
+                if deadline is not None and deadline.notice(rule.id for rule in rules):
+                    results[name]["partial"] = True
+            else:
+                self._skip(results, name, "跳过：未选择该检查器的任何规则\n")
+
+        reason = self.include_guard_skip_reason(file_path, selection, deadline)
+        if reason:
+            self._skip(results, "include_guard", reason)
+        else:
+            self._run(results, "include_guard",
+                      lambda: self.check_include_guard(source, file_path))
+
+        if not render:
+            return results, ""
+        total_ms = (time.perf_counter() - total_start) * 1000
+        report = self.render(results, source.line_count, parse_ms, total_ms)
+
+        return results, report
+
+    def include_guard_skip_reason(
+        self,
+        file_path: Optional[str],
+        selection: RuleSelection,
+        deadline: Optional[Deadline] = None
+    ) -> Optional[str]:
+        """包含保护检查需要跳过时返回原因，否则返回 None"""
+        if file_path and Path(file_path).suffix.lower() in _SOURCE_SUFFIXES:
+            return f"跳过：{file_path} 是源文件，不需要包含保护\n"
+        if selection.rules or selection.min_severity == "error":
+            return "跳过：包含保护检查不在所选规则中\n"
+        if deadline is not None and deadline.expired:
+            return "跳过：请求截止时间已到\n"
+        return None
+
+    def _run(self, results: Dict[str, Dict], name: str, func) -> None:
+        """运行单个检查器并记录耗时"""
+        start = time.perf_counter()
+        issues, report = func()
+        results[name] = {
+            "issues": issues,
+            "report": report,
+            "elapsed_ms": (time.perf_counter() - start) * 1000,
+        }
+
+    def _skip(self, results: Dict[str, Dict], name: str, reason: str) -> None:
+        """记录被跳过的检查器"""
+        results[name] = self.skipped(reason)
+
+    @staticmethod
+    def skipped(reason: str) -> Dict:
+        """被跳过的检查器的结果"""
+        return {
+            "issues": [],
+            "report": reason,
+            "elapsed_ms": 0.0,
+            "skipped": True,
+        }
+
+    def check_include_guard(self, source: SourceBuffer, file_path: Optional[str]) -> Tuple[List[Dict], str]:
+        """运行包含保护检查，转换为与其他检查器一致的 (问题列表, 报告) 形式"""
+        is_valid, details, suggestions = get_include_guard_checker().check_include_guard(source, file_path)
+
+        issues = []
+        if not is_valid:
+            issues.append({
+                "type": "missing_include_guard",
+                "severity": "warning",
+                "message": "缺少包含保护",
+                "suggestion": suggestions[0] if suggestions else "#pragma once",
+                "location": file_path or "",
+                "line": 0,
+                "rule": INCLUDE_GUARD_MISSING,
+            })
+
+        report = details
+        if suggestions and not is_valid:
+            report += "\n建议的保护宏名:\n"
+            for sug in suggestions:
+                report += f"  • {sug}\n"
+
+        return issues, report
+
+    def render(
+        self,
+        results: Dict[str, Dict],
+        line_count: int,
+        parse_ms: float,
+        total_ms: float
+    ) -> str:
+        """生成合并后的报告"""
+        report = "# 📋 C++ 综合分析报告\n\n"
+        report += f"**代码规模**: {line_count} 行\n"
+        report += f"**总耗时**: {total_ms:.1f} ms（共享解析 {parse_ms:.1f} ms）\n\n"
+
+        report += "| 检查项 | 结果 | 耗时 |\n"
+        report += "|--------|------|------|\n"
+        for name, result in results.items():
+            if result.get("skipped"):
+                summary = "跳过"
+            elif result.get("partial"):
+                summary = f"⚠️ 部分结果 {len(result['issues'])} 项"
+            elif result["issues"]:
+                summary = f"{len(result['issues'])} 项"
+            else:
+                summary = "✅ 通过"
+            report += f"| {self.SECTION_TITLES[name]} | {summary} | {result['elapsed_ms']:.1f} ms |\n"
+        report += "\n---\n\n"
+
+        for name, result in results.items():
+            report += f"## {self.SECTION_TITLES[name]}\n\n"
+            report += self._demote_headings(result["report"].strip())
+            report += "\n\n---\n\n"
+
+        return report
+
+    def _demote_headings(self, markdown: str) -> str:
+        """将子报告的标题降一级（跳过代码块），使其嵌套在各自的章节下"""
+        lines = []
+        in_code = False
+        for line in markdown.split('\n'):
+            if line.startswith('```'):
+                in_code = not in_code
+            elif not in_code and line.startswith('#'):
+                line = '#' + line
+            lines.append(line)
+        return '\n'.join(lines)
+
+
+# 全局实例
+_analyzer = None
+
+def get_analyzer() -> CombinedAnalyzer:
+    """获取全局综合分析器实例"""
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = CombinedAnalyzer()
+    return _analyzer
@@ -1,219 +1,124 @@
 """C++ const 正确性检查工具"""
 
 import re
-from typing import List, Dict, Tuple
+from bisect import bisect_left
+from typing import List, Dict, Optional, Tuple, Union
+
+from cpp_style.deadline import Deadline
+from cpp_style.rules import ALL_RULES, Rule, RuleSelection, get_registry, run_rules, validate_checks
+from cpp_style.source_buffer import SourceBuffer
+
+# 函数体中的赋值
+_ASSIGN_RE = re.compile(r'\w+\s*=')
+
+# "name =" 赋值，按变量名建立一次索引后供所有变量匹配查询
+_NAMED_ASSIGN_RE = re.compile(r'\b(\w+)\s*=')
+
+
+def _no_const_near(rule: Rule, match: re.Match, code: str, context: Dict) -> bool:
+    """匹配前 before 个字符内（include_match 时包括匹配本身）没有 const"""
+    end = match.end() if rule.params.get("include_match") else match.start()
+    return 'const' not in code[max(0, match.start() - rule.params["before"]):end]
+
+
+def _does_not_modify(rule: Rule, match: re.Match, code: str, context: Dict) -> bool:
+    """函数体中没有赋值，且签名中没有 const（跳过运算符重载）"""
+    if match.group(2).startswith('operator'):
+        return False
+    return not _ASSIGN_RE.search(match.group(3)) and 'const' not in match.group(0)
+
+
+def _large_type_by_value(rule: Rule, match: re.Match, code: str, context: Dict) -> bool:
+    """参数类型是大对象，且没有按引用传递"""
+    param_type = match.group(1).lower()
+    if not any(t in param_type for t in rule.params["types"]):
+        return False
+    return '&' not in code[match.start():match.end() + rule.params["window"]]
+
+
+def _non_const_pointer_signature(rule: Rule, match: re.Match, code: str, context: Dict) -> bool:
+    """所在函数签名返回指针且没有 const"""
+    func_start = code.rfind('(', 0, match.start())
+    if func_start <= 0:
+        return False
+    func_sig = code[max(0, func_start - rule.params["window"]):func_start]
+    return '*' in func_sig and 'const' not in func_sig
+
+
+def _never_reassigned(rule: Rule, match: re.Match, code: str, context: Dict) -> bool:
+    """变量前没有 const，且之后 window 个字符内没有再次赋值"""
+    if 'const' in code[max(0, match.start() - rule.params["before"]):match.start()]:
+        return False
+
+    index = context.get("assignments")
+    if index is None:
+        index = {}
+        for assign in _NAMED_ASSIGN_RE.finditer(code):
+            index.setdefault(assign.group(1), []).append((assign.start(), assign.end()))
+        context["assignments"] = index
+
+    spans = index.get(match.group(2))
+    if not spans:
+        return True
+    limit = match.end() + rule.params["window"]
+    k = bisect_left(spans, (match.end(), 0))
+    return not (k < len(spans) and spans[k][1] <= limit)
+
+
+_CHECKS = {
+    "no_const_near": _no_const_near,
+    "does_not_modify": _does_not_modify,
+    "large_type_by_value": _large_type_by_value,
+    "non_const_pointer_signature": _non_const_pointer_signature,
+    "never_reassigned": _never_reassigned,
+}
 
 
 class ConstCorrectnessChecker:
     """const 正确性检查器"""
 
-    def check_const_correctness(self, code: str) -> Tuple[List[Dict], str]:
+    def __init__(self):
+        """从规则注册表获取 const 正确性规则"""
+        self.rules = get_registry().for_checker("const_correctness")
+        self.checks = _CHECKS
+        validate_checks(self.rules, _CHECKS)
+
+    def check_const_correctness(
+        self,
+        code: Union[str, SourceBuffer],
+        selection: Optional[RuleSelection] = None,
+        deadline: Optional[Deadline] = None,
+        render: bool = True
+    ) -> Tuple[List[Dict], str]:
         """
         检查代码中的 const 正确性
 
         Args:
-            code: 要检查的 C++ 代码
+            code: 要检查的 C++ 代码（或已构建的 SourceBuffer）
+            selection: 规则选择，未选中的规则不会执行（默认全部）
+            deadline: 可选的截止时间；超时时返回部分结果，报告中注明超时的规则
+            render: 是否生成报告（结构化输出只需要问题列表，报告为空字符串）
 
         Returns:
             (问题列表, 格式化的检查报告)
         """
-        issues = []
+        source = SourceBuffer.of(code)
 
-        # 检查各种 const 使用问题
-        issues.extend(self._check_member_functions(code))
-        issues.extend(self._check_parameters(code))
-        issues.extend(self._check_return_values(code))
-        issues.extend(self._check_variables(code))
-        issues.extend(self._check_pointers_refs(code))
+        # 按注册表顺序执行被选中的 const 规则
+        issues = run_rules(self.select_rules(selection), source, _CHECKS, deadline)
 
-        # 生成报告
-        report = self._generate_report(issues)
+        return issues, self.render(issues, deadline) if render else ""
+
+    def select_rules(self, selection: Optional[RuleSelection] = None) -> Tuple[Rule, ...]:
+        """被选中的规则（按注册表顺序）"""
+        return (selection or ALL_RULES).apply(self.rules)
 
-        return issues, report
-
-    def _check_member_functions(self, code: str) -> List[Dict]:
-        """检查成员函数的 const 正确性"""
-        issues = []
-
-        # 检查 getter 函数是否是 const
-        getter_pattern = re.compile(r'(\w+)\s+(get\w+|is\w+|has\w+)\s*\(\s*\)\s*\{')
-        for match in getter_pattern.finditer(code):
-            func_name = match.group(2)
-            # 检查是否有 const 关键字
-            full_line = code[max(0, match.start() - 50):match.end()]
-            if 'const' not in full_line:
-                issues.append({
-                    "type": "missing_const_member",
-                    "severity": "warning",
-                    "message": f"getter 函数 {func_name}() 应该是 const",
-                    "suggestion": f"在函数声明后添加 const: {func_name}() const",
-                    "location": match.group(0),
-                    "line": code[:match.start()].count('\n') + 1
-                })
-
-        # 检查不修改成员的函数
-        method_pattern = re.compile(r'(\w+)\s+(\w+)\s*\([^)]*\)\s*\{([^}]*)\}', re.DOTALL)
-        for match in method_pattern.finditer(code):
-            return_type = match.group(1)
-            func_name = match.group(2)
-            func_body = match.group(3)
-
-            # 跳过构造函数、析构函数、运算符重载
-            if func_name in ['if', 'for', 'while'] or func_name.startswith('operator'):
-                continue
-
-            # 检查函数体是否修改成员
-            if not re.search(r'\w+\s*=', func_body) and 'const' not in code[match.start():match.end()]:
-                # 可能应该是 const
-                issues.append({
-                    "type": "potentially_const_member",
-                    "severity": "info",
-                    "message": f"函数 {func_name}() 可能应该是 const",
-                    "suggestion": "检查是否修改成员变量，如果不修改则添加 const",
-                    "location": f"{return_type} {func_name}()",
-                    "line": code[:match.start()].count('\n') + 1
-                })
-
-        return issues
-
-    def _check_parameters(self, code: str) -> List[Dict]:
-        """检查函数参数的 const 正确性"""
-        issues = []
-
-        # 检查大对象参数是否使用 const 引用
-        param_pattern = re.compile(r'(\w+(?:<[^>]+>)?)\s+(\w+)\s*[,)]')
-        for match in param_pattern.finditer(code):
-            param_type = match.group(1)
-            param_name = match.group(2)
-
-            # 检查是否是大对象类型
-            large_types = ['string', 'vector', 'map', 'set', 'list', 'deque', 'unordered_map', 'unordered_set']
-            is_large = any(t in param_type.lower() for t in large_types)
-
-            if is_large and '&' not in code[match.start():match.end() + 20]:
-                issues.append({
-                    "type": "missing_const_ref_param",
-                    "severity": "warning",
-                    "message": f"参数 {param_name} 应该使用 const 引用传递",
-                    "suggestion": f"const {param_type}& {param_name}",
-                    "location": match.group(0),
-                    "line": code[:match.start()].count('\n') + 1
-                })
-
-        # 检查引用参数是否缺少 const
-        ref_param_pattern = re.compile(r'(\w+)\s*&\s*(\w+)\s*[,)]')
-        for match in ref_param_pattern.finditer(code):
-            # 检查前面是否有 const
-            prefix = code[max(0, match.start() - 10):match.start()]
-            if 'const' not in prefix:
-                param_type = match.group(1)
-                param_name = match.group(2)
-                issues.append({
-                    "type": "non_const_ref_param",
-                    "severity": "info",
-                    "message": f"引用参数 {param_name} 可能应该是 const",
-                    "suggestion": f"如果不修改参数，使用 const {param_type}& {param_name}",
-                    "location": match.group(0),
-                    "line": code[:match.start()].count('\n') + 1
-                })
-
-        return issues
-
-    def _check_return_values(self, code: str) -> List[Dict]:
-        """检查返回值的 const 正确性"""
-        issues = []
-
-        # 检查返回指针是否应该是 const
-        return_ptr_pattern = re.compile(r'return\s+(\w+)\s*;')
-        for match in return_ptr_pattern.finditer(code):
-            var_name = match.group(1)
-            # 查找函数签名
-            func_start = code.rfind('(', 0, match.start())
-            if func_start > 0:
-                func_sig = code[max(0, func_start - 100):func_start]
-                if '*' in func_sig and 'const' not in func_sig:
-                    issues.append({
-                        "type": "non_const_return_ptr",
-                        "severity": "info",
-                        "message": "返回指针可能应该是 const",
-                        "suggestion": "如果不应修改返回的对象，返回 const T*",
-                        "location": match.group(0),
-                        "line": code[:match.start()].count('\n') + 1
-                    })
-
-        # 检查返回引用
-        return_ref_pattern = re.compile(r'(\w+)\s*&\s+(\w+)\s*\([^)]*\)')
-        for match in return_ref_pattern.finditer(code):
-            return_type = match.group(1)
-            func_name = match.group(2)
-            # 检查是否有 const
-            if 'const' not in code[max(0, match.start() - 10):match.start()]:
-                issues.append({
-                    "type": "non_const_return_ref",
-                    "severity": "info",
-                    "message": f"函数 {func_name} 返回引用可能应该是 const",
-                    "suggestion": f"const {return_type}& {func_name}()",
-                    "location": match.group(0),
-                    "line": code[:match.start()].count('\n') + 1
-                })
-
-        return issues
-
-    def _check_variables(self, code: str) -> List[Dict]:
-        """检查变量的 const 正确性"""
-        issues = []
-
-        # 检查未修改的局部变量
-        var_pattern = re.compile(r'(\w+)\s+(\w+)\s*=\s*([^;]+);')
-        for match in var_pattern.finditer(code):
-            var_type = match.group(1)
-            var_name = match.group(2)
-
-            # 跳过已经是 const 的
-            if var_type == 'const' or 'const' in code[max(0, match.start() - 10):match.start()]:
-                continue
-
-            # 检查后续是否修改了这个变量
-            rest_code = code[match.end():match.end() + 500]
-            assignment_pattern = rf'\b{var_name}\s*='
-            if not re.search(assignment_pattern, rest_code):
-                issues.append({
-                    "type": "missing_const_variable",
-                    "severity": "info",
-                    "message": f"变量 {var_name} 可能应该是 const",
-                    "suggestion": f"const {var_type} {var_name} = ...",
-                    "location": match.group(0),
-                    "line": code[:match.start()].count('\n') + 1
-                })
-
-        return issues
-
-    def _check_pointers_refs(self, code: str) -> List[Dict]:
-        """检查指针和引用的 const 正确性"""
-        issues = []
-
-        # 检查指针的 const 位置
-        ptr_pattern = re.compile(r'(\w+)\s*\*\s*(const)?\s*(\w+)')
-        for match in ptr_pattern.finditer(code):
-            type_name = match.group(1)
-            const_after = match.group(2)
-            var_name = match.group(3)
-
-            # 检查是否有 const before *
-            prefix = code[max(0, match.start() - 10):match.start()]
-            const_before = 'const' in prefix
-
-            if not const_before and not const_after:
-                issues.append({
-                    "type": "non_const_pointer",
-                    "severity": "info",
-                    "message": f"指针 {var_name} 缺少 const 限定",
-                    "suggestion": "使用 const T* (指向const) 或 T* const (const指针) 或 const T* const (都是const)",
-                    "location": match.group(0),
-                    "line": code[:match.start()].count('\n') + 1
-                })
-
-        return issues
+    def render(self, issues: List[Dict], deadline: Optional[Deadline] = None) -> str:
+        """生成报告；有截止时间时附上部分结果说明"""
+        report = self._generate_report(issues)
+        if deadline is not None:
+            report += deadline.notice(rule.id for rule in self.rules)
+        return report
 
     def _generate_report(self, issues: List[Dict]) -> str:
         """生成格式化的检查报告"""
@@ -0,0 +1,513 @@
+"""C++ 声明标识符提取工具"""
+
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from cpp_style.lexer import COMMENT, IDENTIFIER, PREPROCESSOR, PUNCT, parse_directive
+from cpp_style.source_buffer import SourceBuffer
+from cpp_style.tools.naming_checker import get_checker as get_naming_checker
+
+# 不可能是声明名称的关键字
+_KEYWORDS = frozenset({
+    'alignas', 'alignof', 'and', 'asm', 'auto', 'bool', 'break', 'case', 'catch', 'char',
+    'char8_t', 'char16_t', 'char32_t', 'class', 'co_await', 'co_return', 'co_yield',
+    'concept', 'const', 'const_cast', 'consteval', 'constexpr', 'constinit', 'continue',
+    'decltype', 'default', 'delete', 'do', 'double', 'dynamic_cast', 'else', 'enum',
+    'explicit', 'export', 'extern', 'false', 'final', 'float', 'for', 'friend', 'goto',
+    'if', 'inline', 'int', 'long', 'mutable', 'namespace', 'new', 'noexcept', 'not',
+    'nullptr', 'operator', 'or', 'override', 'private', 'protected', 'public', 'register',
+    'reinterpret_cast', 'requires', 'return', 'short', 'signed', 'sizeof', 'static',
+    'static_assert', 'static_cast', 'struct', 'switch', 'template', 'this', 'thread_local',
+    'throw', 'true', 'try', 'typedef', 'typeid', 'typename', 'union', 'unsigned', 'using',
+    'virtual', 'void', 'volatile', 'wchar_t', 'while',
+})
+
+# 以这些关键字开头的语句不是声明
+_STATEMENT_KEYWORDS = frozenset({
+    'return', 'throw', 'delete', 'goto', 'case', 'default', 'co_return', 'co_yield',
+    'co_await', 'if', 'while', 'switch', 'else', 'do', 'break', 'continue', 'new',
+    'sizeof', 'static_assert', 'friend', 'try', 'catch', 'for', 'using', 'typedef',
+    'public', 'private', 'protected', 'operator', 'requires', 'concept', 'export',
+})
+
+# 声明前缀中允许出现的标点（类型修饰）
+_TYPE_PUNCT = frozenset({'::', '*', '&', '...'})
+
+_ACCESS_LABELS = frozenset({'public', 'private', 'protected', 'case', 'default'})
+_CLASS_KEYS = frozenset({'class', 'struct', 'union'})
+
+
+class _DeclarationParser:
+    """
+    单遍声明扫描器
+
+    在 token 流上线性前进，以深度为 0 的 ';'、'{'、'}' 切分语句，
+    用作用域栈区分命名空间、类、枚举和函数体，据此推断每个声明的类别。
+    """
+
+    def __init__(self, source: SourceBuffer):
+        self.source = source
+        tokens = source.tokens
+        self.kinds: List[int] = []
+        self.texts: List[str] = []
+        self.starts: List[int] = []
+        self.declarations: List[Dict] = []
+        self._seen: Set[Tuple[str, str]] = set()
+        # 作用域栈: (类别, 名称)，类别为 namespace / class / enum / function / block
+        self.scopes: List[Tuple[str, Optional[str]]] = [("namespace", None)]
+
+        for kind, start, end in zip(tokens.kinds, tokens.starts, tokens.ends):
+            if kind == COMMENT:
+                continue
+            if kind == PREPROCESSOR:
+                self._directive(tokens.text[start:end], start)
+                continue
+            self.kinds.append(kind)
+            self.texts.append(tokens.text[start:end])
+            self.starts.append(start)
+
+    # ---------- 结果收集 ----------
+
+    def _add(self, name: str, category: str, offset: int) -> None:
+        if not name or name in _KEYWORDS or (name, category) in self._seen:
+            return
+        self._seen.add((name, category))
+        line, column = self.source.position(offset)
+        self.declarations.append({
+            "name": name,
+            "category": category,
+            "line": line,
+            "column": column,
+        })
+
+    def _add_token(self, pos: int, category: str) -> None:
+        self._add(self.texts[pos], category, self.starts[pos])
+
+    def _directive(self, directive: str, offset: int) -> None:
+        """#define 宏名按常量处理"""
+        name, args = parse_directive(directive)
+        if name == 'define' and args:
+            macro = args.split('(', 1)[0].split(None, 1)[0]
+            self._add(macro, "constant", offset)
+
+    # ---------- 主循环 ----------
+
+    def run(self) -> List[Dict]:
+        texts = self.texts
+        kinds = self.kinds
+        n = len(texts)
+        start = 0
+        depth = 0
+        i = 0
+
+        while i < n:
+            if kinds[i] == PUNCT:
+                tok = texts[i]
+                if tok == '(' or tok == '[':
+                    depth += 1
+                elif tok == ')' or tok == ']':
+                    depth = max(0, depth - 1)
+                elif depth == 0:
+                    if tok == ';':
+                        self._statement(start, i, ';')
+                        start = i + 1
+                    elif tok == '{':
+                        self.scopes.append(self._statement(start, i, '{'))
+                        start = i + 1
+                    elif tok == '}':
+                        self._statement(start, i, '}')
+                        if len(self.scopes) > 1:
+                            self.scopes.pop()
+                        start = i + 1
+                    elif tok == ':' and start < i and texts[start] in _ACCESS_LABELS:
+                        start = i + 1
+            i += 1
+
+        return self.declarations
+
+    # ---------- 语句分析 ----------
+
+    def _statement(self, start: int, end: int, terminator: str) -> Tuple[str, Optional[str]]:
+        """分析一条语句，返回以 '{' 结尾时要压入的作用域"""
+        scope = self.scopes[-1][0]
+        block = ("block", None)
+
+        if scope == "enum":
+            if terminator == '}':
+                self._enumerators(start, end)
+            return block
+
+        p = start
+        while p + 1 < end and self.texts[p] == 'template' and self.texts[p + 1] == '<':
+            p = self._template_parameters(p + 2, end)
+        if p >= end:
+            return block
+
+        first = self.texts[p]
+
+        if first == 'namespace' or (first == 'inline' and p + 1 < end and self.texts[p + 1] == 'namespace'):
+            name = None
+            for q in range(p + 1, end):
+                if self.kinds[q] == IDENTIFIER and self.texts[q] != 'namespace':
+                    self._add_token(q, "namespace")
+                    name = self.texts[q]
+            return ("namespace", name)
+
+        if first == 'using':
+            # using Alias = Type; 类型别名按类名规范检查
+            if p + 2 < end and self.kinds[p + 1] == IDENTIFIER and self.texts[p + 2] == '=':
+                self._add_token(p + 1, "class")
+            return block
+
+        if first == 'typedef':
+            last = end - 1
+            if last > p and self.kinds[last] == IDENTIFIER:
+                self._add_token(last, "class")
+            return block
+
+        head = self._type_head(p, end, terminator)
+        if head is not None:
+            return head
+
+        if scope in ("function", "block"):
+            if first == 'for' and p + 1 < end and self.texts[p + 1] == '(':
+                self._for_init(p + 2, end)
+            elif first == 'catch' and p + 1 < end and self.texts[p + 1] == '(':
+                close = self._matching(p + 1, end, '(', ')')
+                self._parameters(p + 2, close)
+            if first in _STATEMENT_KEYWORDS:
+                return block
+
+        if first in _STATEMENT_KEYWORDS:
+            return block
+
+        stop, name_pos = self._declarator(p, end)
+        stop_tok = self.texts[stop] if stop < end else terminator
+
+        if name_pos is not None:
+            qualified = self.texts[name_pos - 1] == '::'
+            if stop_tok == '(' and scope in ("namespace", "class"):
+                name = self.texts[name_pos]
+                is_constructor = (
+                    self.texts[name_pos - 1] == '~'
+                    or (qualified and name_pos >= 2 and self.texts[name_pos - 2] == name)
+                    or name == self.scopes[-1][1]
+                )
+                if not is_constructor:
+                    self._add_token(name_pos, "function")
+                close = self._matching(stop, end, '(', ')')
+                self._parameters(stop + 1, close)
+            elif not qualified:
+                self._add_token(name_pos, self._variable_category(p, name_pos, scope))
+                self._more_declarators(stop, end, p, scope)
+
+        if terminator == '{' and scope in ("namespace", "class"):
+            if self._has_call_parens(p, end):
+                return ("function", None)
+        return block
+
+    def _type_head(self, p: int, end: int, terminator: str) -> Optional[Tuple[str, Optional[str]]]:
+        """处理 class/struct/union/enum 的定义和前置声明"""
+        texts = self.texts
+        q = p
+        while q < end and texts[q] in ('typedef', 'friend', 'export'):
+            q += 1
+        if q >= end:
+            return None
+
+        key = texts[q]
+        if key not in _CLASS_KEYS and key != 'enum':
+            return None
+        if texts[p] == 'friend':
+            return ("block", None) if terminator == '{' else None
+
+        is_enum = key == 'enum'
+        q += 1
+        if is_enum and q < end and texts[q] in ('class', 'struct'):
+            q += 1
+
+        # 名称：基类列表 / 底层类型之前的最后一个标识符（跳过 final 和属性宏）
+        name_pos = None
+        while q < end and texts[q] != ':':
+            if self.kinds[q] == IDENTIFIER and texts[q] not in ('final', 'alignas'):
+                name_pos = q
+            elif texts[q] == '<':
+                q = self._skip_angles(q, end)
+                continue
+            q += 1
+
+        if terminator == '{':
+            name = None
+            if name_pos is not None:
+                self._add_token(name_pos, "class")
+                name = texts[name_pos]
+            return ("enum" if is_enum else "class", name)
+
+        # 前置声明: class Foo;
+        if terminator == ';' and name_pos is not None and name_pos == end - 1 and q == end:
+            self._add_token(name_pos, "class")
+            return ("block", None)
+        return None
+
+    def _declarator(self, p: int, end: int) -> Tuple[int, Optional[int]]:
+        """
+        扫描声明前缀 "[说明符] 类型 [*&] 名称"
+
+        Returns:
+            (前缀结束位置, 名称位置；不是声明时为 None)
+        """
+        texts = self.texts
+        kinds = self.kinds
+        q = p
+
+        if q + 1 < end and texts[q] == '[' and texts[q + 1] == '[':
+            q = self._matching(q, end, '[', ']') + 1
+            p = q
+
+        while q < end:
+            tok = texts[q]
+            if kinds[q] == PUNCT:
+                if tok == '<' and q > p and kinds[q - 1] == IDENTIFIER:
+                    q = self._skip_angles(q, end)
+                    if q < 0:
+                        return end, None
+                    continue
+                if tok not in _TYPE_PUNCT and tok != '~':
+                    break
+            elif kinds[q] != IDENTIFIER:
+                return q, None
+            q += 1
+
+        name_pos = q - 1
+        if name_pos <= p or kinds[name_pos] != IDENTIFIER or texts[name_pos] in _KEYWORDS:
+            return q, None
+        if q < end and texts[q] not in ('(', '=', '[', ',', ':', '{'):
+            return q, None
+
+        before = texts[name_pos - 1]
+        if kinds[name_pos - 1] == IDENTIFIER:
+            if before in _STATEMENT_KEYWORDS:
+                return q, None
+        elif before not in ('>', '*', '&', '::', '...', '~'):
+            return q, None
+
+        # 必须有类型部分：名称之前至少有一个非说明符标识符或 '>'
+        if not any(kinds[k] == IDENTIFIER or texts[k] == '>' for k in range(p, name_pos)):
+            return q, None
+        return q, name_pos
+
+    def _variable_category(self, p: int, name_pos: int, scope: str) -> str:
+        """根据说明符和作用域推断变量类别"""
+        prefix = self.texts[p:name_pos]
+        if 'constexpr' in prefix or 'constinit' in prefix:
+            return "constant"
+        if 'const' in prefix and '*' not in prefix and '&' not in prefix:
+            if scope == "namespace" or 'static' in prefix:
+                return "constant"
+        if scope == "class":
+            return "member_variable"
+        return "variable"
+
+    def _more_declarators(self, stop: int, end: int, p: int, scope: str) -> None:
+        """处理 "int a = 1, b, *c;" 中逗号之后的声明"""
+        texts = self.texts
+        q = stop
+        while q < end:
+            depth = 0
+            while q < end:
+                tok = texts[q]
+                if tok in ('(', '[', '{', '<'):
+                    depth += 1
+                elif tok in (')', ']', '}', '>'):
+                    depth -= 1
+                elif tok == ',' and depth <= 0:
+                    break
+                q += 1
+            q += 1
+            while q < end and texts[q] in ('*', '&'):
+                q += 1
+            if q < end and self.kinds[q] == IDENTIFIER and (q + 1 == end or texts[q + 1] in ('=', ',', '[', '{', '(')):
+                self._add_token(q, self._variable_category(p, stop - 1, scope))
+
+    def _parameters(self, start: int, end: int) -> None:
+        """函数参数列表中的参数名按变量检查"""
+        for a, b in self._split(start, end):
+            stop = a
+            while stop < b and self.texts[stop] != '=':
+                stop += 1
+            last = stop - 1
+            if last > a and self.kinds[last] == IDENTIFIER and self.texts[last] not in _KEYWORDS:
+                before = self.texts[last - 1]
+                if self.kinds[last - 1] == IDENTIFIER or before in ('>', '*', '&', '...'):
+                    self._add_token(last, "variable")
+
+    def _template_parameters(self, start: int, end: int) -> int:
+        """提取模板参数名，返回 '>' 之后的位置"""
+        close = self._skip_angles(start - 1, end)
+        if close < 0:
+            return end
+        for a, b in self._split(start, close - 1):
+            stop = a
+            while stop < b and self.texts[stop] != '=':
+                stop += 1
+            last = stop - 1
+            if last > a and self.kinds[last] == IDENTIFIER and self.texts[last] not in _KEYWORDS:
+                self._add_token(last, "template_parameter")
+        return close
+
+    def _enumerators(self, start: int, end: int) -> None:
+        """枚举值按常量检查"""
+        for a, b in self._split(start, end):
+            if a < b and self.kinds[a] == IDENTIFIER:
+                self._add_token(a, "constant")
+
+    def _for_init(self, start: int, end: int) -> None:
+        """for 语句初始化部分的循环变量（包括范围 for）"""
+        close = self._matching(start - 1, end, '(', ')')
+        q = start
+        while q < close and self.texts[q] not in (';', ':'):
+            q += 1
+        stop, name_pos = self._declarator(start, q)
+        if name_pos is not None:
+            self._add_token(name_pos, "variable")
+
+    # ---------- 辅助函数 ----------
+
+    def _has_call_parens(self, p: int, end: int) -> bool:
+        """语句在 '=' 之前是否有顶层括号（函数定义/构造函数）"""
+        for q in range(p, end):
+            tok = self.texts[q]
+            if tok == '=':
+                return False
+            if tok == '(':
+                return True
+        return False
+
+    def _matching(self, open_pos: int, end: int, open_tok: str, close_tok: str) -> int:
+        """返回与 open_pos 处括号匹配的位置（找不到时返回 end）"""
+        depth = 0
+        for q in range(open_pos, end):
+            tok = self.texts[q]
+            if tok == open_tok:
+                depth += 1
+            elif tok == close_tok:
+                depth -= 1
+                if depth == 0:
+                    return q
+        return end
+
+    def _skip_angles(self, open_pos: int, end: int) -> int:
+        """跳过模板实参 <...>，返回 '>' 之后的位置；不像模板实参时返回 -1"""
+        depth = 0
+        q = open_pos
+        while q < end:
+            tok = self.texts[q]
+            if tok == '<':
+                if q + 1 < end and self.texts[q + 1] == '<' and depth == 0:
+                    return -1
+                depth += 1
+            elif tok == '>':
+                depth -= 1
+                if depth == 0:
+                    return q + 1
+            elif tok in (';', '{', '}', '='):
+                if tok != '=' or depth == 0:
+                    return -1
+            q += 1
+        return -1
+
+    def _split(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """按顶层逗号切分 [start, end)"""
+        parts = []
+        depth = 0
+        a = start
+        for q in range(start, end):
+            tok = self.texts[q]
+            if tok in ('(', '[', '{', '<'):
+                depth += 1
+            elif tok in (')', ']', '}', '>'):
+                depth -= 1
+            elif tok == ',' and depth == 0:
+                parts.append((a, q))
+                a = q + 1
+        if a < end:
+            parts.append((a, end))
+        return parts
+
+
+class IdentifierExtractor:
+    """声明标识符提取器"""
+
+    def extract(self, code: Union[str, SourceBuffer]) -> List[Dict]:
+        """
+        提取代码中声明的所有标识符
+
+        Args:
+            code: C++ 代码（或已构建的 SourceBuffer）
+
+        Returns:
+            声明列表，每项包含 name、category、line、column；
+            同名同类别的声明只保留第一次出现
+        """
+        return _DeclarationParser(SourceBuffer.of(code)).run()
+
+    def check_code_naming(self, code: Union[str, SourceBuffer], render: bool = True) -> Tuple[List[Dict], str]:
+        """
+        提取代码中的声明并检查命名规范
+
+        Args:
+            code: C++ 代码（或已构建的 SourceBuffer）
+            render: 是否生成报告（结构化输出只需要不符合规范的声明，报告为空字符串）
+
+        Returns:
+            (不符合规范的声明列表, 格式化的检查报告)
+        """
+        declarations = self.extract(code)
+        failures, _ = get_naming_checker().check_naming_batch(
+            ((decl["name"], decl["category"]) for decl in declarations), render=False
+        )
+
+        by_key = {(decl["name"], decl["category"]): decl for decl in declarations}
+        issues = []
+        for failure in failures:
+            decl = by_key[(failure["identifier"], failure["category"])]
+            issues.append({**failure, "line": decl["line"], "column": decl["column"]})
+
+        return issues, self._generate_report(declarations, issues) if render else ""
+
+    def _generate_report(self, declarations: List[Dict], issues: List[Dict]) -> str:
+        """生成命名审查报告"""
+        counts: Dict[str, int] = {}
+        for decl in declarations:
+            counts[decl["category"]] = counts.get(decl["category"], 0) + 1
+
+        report = "# 🏷️ 命名规范审查报告\n\n"
+        report += f"**提取声明**: {len(declarations)} 个"
+        if counts:
+            report += "（" + ", ".join(f"{category}: {count}" for category, count in counts.items()) + "）"
+        report += "\n"
+
+        if not issues:
+            report += "\n**结果**: ✓ 所有声明都符合命名规范\n"
+            return report
+
+        report += f"**不符合规范**: {len(issues)} 个\n\n"
+        report += "| 行 | 标识符 | 类别 | 问题 | 建议 |\n"
+        report += "|----|--------|------|------|------|\n"
+        for issue in issues:
+            suggestions = ", ".join(f"`{sug}`" for sug in issue["suggestions"]) or "-"
+            report += (
+                f"| {issue['line']} | `{issue['identifier']}` | {issue['category']} "
+                f"| {issue['message']} | {suggestions} |\n"
+            )
+        return report
+
+
+# 全局实例
+_extractor = None
+
+def get_extractor() -> IdentifierExtractor:
+    """获取全局声明标识符提取器实例"""
+    global _extractor
+    if _extractor is None:
+        _extractor = IdentifierExtractor()
+    return _extractor
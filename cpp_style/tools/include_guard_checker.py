@@ -1,37 +1,41 @@
 """C++ 头文件包含保护检查工具"""
 
 import re
-from typing import Tuple, Optional, List
+from typing import Tuple, Optional, List, Union
 from pathlib import Path
 
+from cpp_style.lexer import PREPROCESSOR, parse_directive
+from cpp_style.source_buffer import SourceBuffer
+
 
 class IncludeGuardChecker:
     """包含保护检查器"""
 
     def check_include_guard(
         self,
-        code: str,
+        code: Union[str, SourceBuffer],
         file_path: Optional[str] = None
     ) -> Tuple[bool, str, List[str]]:
         """
         检查头文件的包含保护
 
         Args:
-            code: 头文件代码
+            code: 头文件代码（或已构建的 SourceBuffer）
             file_path: 可选的文件路径，用于生成建议的保护宏名
 
         Returns:
             (是否符合规范, 详细说明, 建议列表)
         """
-        lines = code.strip().split('\n')
+        source = SourceBuffer.of(code)
+        lines = source.text.strip().split('\n')
         if len(lines) < 3:
             return False, "文件太短，无法包含有效的包含保护", []
 
         # 检查 #pragma once
-        has_pragma_once = self._check_pragma_once(code)
+        has_pragma_once = self._check_pragma_once(source)
 
         # 检查传统的 #ifndef/#define/#endif 保护
-        has_traditional_guard, guard_name = self._check_traditional_guard(code)
+        has_traditional_guard, guard_name = self._check_traditional_guard(source)
 
         suggestions = []
         details = ""
@@ -97,68 +101,56 @@ class IncludeGuardChecker:
 
         return False, details, suggestions
 
-    def _check_pragma_once(self, code: str) -> bool:
+    def _check_pragma_once(self, source: SourceBuffer) -> bool:
         """检查是否使用 #pragma once"""
-        return bool(re.search(r'^\s*#\s*pragma\s+once\s*$', code, re.MULTILINE))
-
-    def _check_traditional_guard(self, code: str) -> Tuple[bool, Optional[str]]:
+        tokens = source.tokens
+        for i in tokens.indices(PREPROCESSOR):
+            name, args = parse_directive(tokens.text_of(i))
+            if name == 'pragma' and args == 'once':
+                return True
+        return False
+
+    def _check_traditional_guard(self, source: SourceBuffer) -> Tuple[bool, Optional[str]]:
         """
         检查传统的 #ifndef/#define/#endif 保护
 
+        注释由词法分析器识别，不会被误当作指令或打断 #ifndef 与 #define 的相邻关系。
+
         Returns:
             (是否存在, 保护宏名)
         """
-        lines = code.split('\n')
-
-        # 查找 #ifndef
-        ifndef_pattern = re.compile(r'^\s*#\s*ifndef\s+([A-Z_][A-Z0-9_]*)\s*$')
-        define_pattern = re.compile(r'^\s*#\s*define\s+([A-Z_][A-Z0-9_]*)\s*$')
-        endif_pattern = re.compile(r'^\s*#\s*endif')
-
+        tokens = source.tokens
+        significant = tokens.significant()
+        macro_pattern = re.compile(r'[A-Z_][A-Z0-9_]*')
+
+        def directive_at(position: int) -> Tuple[str, str]:
+            index = significant[position]
+            if tokens.kinds[index] != PREPROCESSOR:
+                return "", ""
+            return parse_directive(tokens.text_of(index))
+
+        # 找到第一个 #ifndef
+        ifndef_position = None
         ifndef_macro = None
-        define_macro = None
-
-        # 找到第一个 #ifndef（跳过注释）
-        for line in lines:
-            stripped = line.strip()
-            if stripped.startswith('//') or stripped.startswith('/*'):
-                continue
-            match = ifndef_pattern.match(line)
-            if match:
-                ifndef_macro = match.group(1)
+        for position in range(len(significant)):
+            name, args = directive_at(position)
+            if name == 'ifndef' and macro_pattern.fullmatch(args):
+                ifndef_position = position
+                ifndef_macro = args
                 break
 
-        if not ifndef_macro:
+        if ifndef_position is None or ifndef_position + 1 >= len(significant):
+            return False, None
+
+        # 检查紧跟的 #define，且宏名与 #ifndef 一致
+        name, define_macro = directive_at(ifndef_position + 1)
+        if name != 'define' or define_macro != ifndef_macro:
             return False, None
 
-        # 检查紧跟的 #define
-        found_ifndef = False
-        for line in lines:
-            if found_ifndef:
-                match = define_pattern.match(line)
-                if match:
-                    define_macro = match.group(1)
-                    break
-                # 如果不是空行或注释，则失败
-                stripped = line.strip()
-                if stripped and not stripped.startswith('//'):
-                    break
-            elif ifndef_pattern.match(line):
-                found_ifndef = True
-
-        # 检查 #ifndef 和 #define 的宏名是否一致
-        if ifndef_macro and define_macro and ifndef_macro == define_macro:
-            # 检查文件末尾是否有 #endif
-            has_endif = False
-            for line in reversed(lines):
-                stripped = line.strip()
-                if stripped and not stripped.startswith('//'):
-                    if endif_pattern.match(line):
-                        has_endif = True
-                    break
-
-            if has_endif:
-                return True, ifndef_macro
+        # 检查文件末尾是否有 #endif
+        name, _ = directive_at(len(significant) - 1)
+        if name == 'endif':
+            return True, ifndef_macro
 
         return False, None
 
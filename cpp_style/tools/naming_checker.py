@@ -1,9 +1,29 @@
 """C++ 命名规范检查工具"""
 
 import re
-import json
-from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from cpp_style.data import get_store
+
+# 风格名 -> (预编译正则, 符合时的说明, 不符合时的要求)
+# naming_conventions.json 中的 style 可以是 "A 或 B" 形式，满足任一风格即可
+_STYLE_RULES = {
+    "snake_case": (re.compile(r'[a-z][a-z0-9_]*'), "符合 snake_case 风格", "小写字母和下划线"),
+    "UPPER_SNAKE_CASE": (re.compile(r'[A-Z][A-Z0-9_]*'), "符合 UPPER_SNAKE_CASE 风格", "UPPER_SNAKE_CASE"),
+    "kCamelCase": (re.compile(r'k[A-Z][a-zA-Z0-9]*'), "符合 kCamelCase 风格（Google Style）", "kCamelCase"),
+    "PascalCase": (re.compile(r'[A-Z][a-zA-Z0-9]*'), "符合 PascalCase 风格", "大驼峰命名（首字母大写）"),
+    "CamelCase": (re.compile(r'[A-Z][a-zA-Z0-9]*'), "符合 PascalCase 风格", "大驼峰命名（首字母大写）"),
+    "camelCase": (re.compile(r'[a-z][a-zA-Z0-9]*'), "符合 camelCase 风格", "小驼峰命名（首字母小写）"),
+    "lowercase": (re.compile(r'[a-z][a-z0-9_]*'), "符合小写命名风格", "全小写字母"),
+    "single uppercase": (re.compile(r'[A-Z]'), "符合模板参数命名规范", "单个大写字母"),
+    "suffix with _": (re.compile(r'[A-Za-z]\w*_'), "符合成员变量命名规范", "下划线后缀"),
+    "m_ prefix": (re.compile(r'm_[A-Za-z0-9]\w*'), "符合成员变量命名规范", "m_ 前缀"),
+}
+
+# 文件命名风格（如 "snake_case.cpp"）允许的扩展名
+_FILE_SUFFIX_RE = re.compile(r'(.+)\.(?:h|hh|hpp|hxx|h\+\+|c|cc|cpp|cxx|c\+\+|ipp|inl|tpp)')
+
+Validator = Callable[[str], Tuple[bool, str]]
 
 
 class NamingChecker:
@@ -11,9 +31,8 @@ class NamingChecker:
 
     def __init__(self):
         """加载命名规范数据"""
-        data_path = Path(__file__).parent.parent / "data" / "naming_conventions.json"
-        with open(data_path, 'r', encoding='utf-8') as f:
-            self.conventions = json.load(f)
+        self.conventions = get_store().load("naming_conventions")
+        self._validators: Dict[str, Validator] = {}
 
     def check_naming(self, identifier: str, category: str) -> Tuple[bool, str, List[str]]:
         """
@@ -34,7 +53,7 @@ class NamingChecker:
         style = conv["style"]
 
         # 根据不同风格进行检查
-        is_valid, message = self._check_style(identifier, style, category)
+        is_valid, message = self._get_validator(category)(identifier)
 
         suggestions = []
         if not is_valid:
@@ -64,55 +83,118 @@ class NamingChecker:
 
         return is_valid, details, suggestions
 
-    def _check_style(self, identifier: str, style: str, category: str) -> Tuple[bool, str]:
-        """检查标识符是否符合指定风格"""
-
-        # snake_case: 小写字母和下划线
-        if "snake_case" in style.lower():
-            if re.match(r'^[a-z][a-z0-9_]*$', identifier):
-                return True, "符合 snake_case 风格"
-            return False, "应使用小写字母和下划线"
-
-        # UPPER_SNAKE_CASE: 大写字母和下划线
-        if "UPPER_SNAKE_CASE" in style or "upper" in style.lower():
-            if re.match(r'^[A-Z][A-Z0-9_]*$', identifier):
-                return True, "符合 UPPER_SNAKE_CASE 风格"
-            # 如果是 constant 类别，也检查 kCamelCase
-            if category == "constant" and re.match(r'^k[A-Z][a-zA-Z0-9]*$', identifier):
-                return True, "符合 kCamelCase 风格（Google Style）"
-            return False, "常量应使用 UPPER_SNAKE_CASE 或 kCamelCase"
-
-        # PascalCase/CamelCase: 大驼峰
-        if "PascalCase" in style or "CamelCase" in style:
-            if re.match(r'^[A-Z][a-zA-Z0-9]*$', identifier):
-                return True, "符合 PascalCase 风格"
-            return False, "应使用大驼峰命名（首字母大写）"
-
-        # camelCase: 小驼峰
-        if "camelCase" in style:
-            if re.match(r'^[a-z][a-zA-Z0-9]*$', identifier):
-                return True, "符合 camelCase 风格"
-            return False, "应使用小驼峰命名（首字母小写）"
+    def check_naming_batch(self, items: Iterable[Tuple[str, str]], render: bool = True) -> Tuple[List[Dict], str]:
+        """
+        批量检查标识符命名
 
-        # member_variable: 下划线后缀或 m_ 前缀
-        if category == "member_variable":
-            if identifier.endswith('_') or identifier.startswith('m_'):
-                return True, "符合成员变量命名规范"
-            return False, "成员变量应使用下划线后缀或 m_ 前缀"
-
-        # template_parameter: 单个大写字母或 PascalCase
-        if category == "template_parameter":
-            if re.match(r'^[A-Z]$', identifier) or re.match(r'^T[A-Z][a-zA-Z0-9]*$', identifier):
-                return True, "符合模板参数命名规范"
-            return False, "模板参数应使用单个大写字母或 T 开头的大驼峰"
-
-        # lowercase: 全小写
-        if "lowercase" in style:
-            if re.match(r'^[a-z][a-z0-9_]*$', identifier):
-                return True, "符合小写命名风格"
-            return False, "应使用全小写字母"
-
-        return True, "符合规范"
+        按类别分组，每个类别的预编译校验函数只获取一次并作用于整组标识符；
+        只为不符合规范的标识符生成建议，报告只列出失败项。
+
+        Args:
+            items: (标识符, 类别) 序列
+            render: 是否生成报告（结构化输出只需要失败项列表，报告为空字符串）
+
+        Returns:
+            (不符合规范的条目列表, 紧凑的表格报告)
+        """
+        groups: Dict[str, List[Tuple[int, str]]] = {}
+        total = 0
+        for index, (identifier, category) in enumerate(items):
+            groups.setdefault(category, []).append((index, identifier))
+            total += 1
+
+        failures: List[Tuple[int, Dict]] = []
+        for category, group in groups.items():
+            if category not in self.conventions:
+                for index, identifier in group:
+                    failures.append((index, {
+                        "identifier": identifier,
+                        "category": category,
+                        "message": f"未知的类别: {category}",
+                        "suggestions": [],
+                    }))
+                continue
+
+            validate = self._get_validator(category)
+            style = self.conventions[category]["style"]
+            seen: Dict[str, Optional[Dict]] = {}
+
+            for index, identifier in group:
+                if identifier not in seen:
+                    is_valid, message = validate(identifier)
+                    seen[identifier] = None if is_valid else {
+                        "identifier": identifier,
+                        "category": category,
+                        "message": message,
+                        "suggestions": self._generate_suggestions(identifier, style, category),
+                    }
+                failure = seen[identifier]
+                if failure is not None:
+                    failures.append((index, failure))
+
+        failures.sort(key=lambda item: item[0])
+        results = [failure for _, failure in failures]
+        return results, self._generate_batch_report(results, total) if render else ""
+
+    def _generate_batch_report(self, failures: List[Dict], total: int) -> str:
+        """生成批量检查的表格报告（只包含不符合规范的标识符）"""
+        if not failures:
+            return f"✓ 全部 {total} 个标识符符合命名规范\n"
+
+        lines = [
+            f"检查 {total} 个标识符，{len(failures)} 个不符合规范:",
+            "",
+            "| 标识符 | 类别 | 问题 | 建议 |",
+            "|--------|------|------|------|",
+        ]
+        for failure in failures:
+            suggestions = ", ".join(f"`{sug}`" for sug in failure["suggestions"]) or "-"
+            lines.append(
+                f"| `{failure['identifier']}` | {failure['category']} | {failure['message']} | {suggestions} |"
+            )
+        return "\n".join(lines) + "\n"
+
+    def _get_validator(self, category: str) -> Validator:
+        """获取类别的校验函数（首次使用时根据风格构建，之后复用）"""
+        validator = self._validators.get(category)
+        if validator is None:
+            validator = self._build_validator(self.conventions[category]["style"])
+            self._validators[category] = validator
+        return validator
+
+    def _build_validator(self, style: str) -> Validator:
+        """
+        根据风格描述构建校验函数
+
+        风格描述中的每个备选项（以 "或" 分隔）对应一个预编译正则，
+        标识符满足任一备选项即视为符合规范。
+        """
+        alternatives = []
+        for option in style.split('或'):
+            option = option.strip()
+            is_file = option.endswith('.cpp')
+            rule = _STYLE_RULES.get(option[:-len('.cpp')] if is_file else option)
+            if rule is not None:
+                alternatives.append((rule, is_file))
+
+        if not alternatives:
+            return lambda identifier: (True, "符合规范")
+
+        requirement = "应使用 " + " 或 ".join(rule[2] for rule, _ in alternatives)
+
+        def validate(identifier: str) -> Tuple[bool, str]:
+            for (pattern, passed, _), is_file in alternatives:
+                name = identifier
+                if is_file:
+                    match = _FILE_SUFFIX_RE.fullmatch(identifier)
+                    if not match:
+                        continue
+                    name = match.group(1)
+                if pattern.fullmatch(name):
+                    return True, passed
+            return False, requirement
+
+        return validate
 
     def _generate_suggestions(self, identifier: str, style: str, category: str) -> List[str]:
         """生成命名建议"""
@@ -0,0 +1,131 @@
+"""
+启动预热
+
+Fly.io 自动启动机器后，第一个真实请求要承担所有延迟到首次使用的工作：导入检查器模块、
+构建单例、编译规则、加载数据集、渲染资源文档。预热在服务器开始监听后依次执行：
+
+- 每个工具用一段有代表性的合成代码调用一次（不同工具覆盖 markdown、json、sarif 和紧凑输出）
+- 读取每个资源的概览文档，生成每个提示模板
+
+预热期间 /ready 返回 503，完成后返回 200 并给出预热耗时；/health 始终只做存活检查。
+单个步骤失败只记录错误，不影响其余步骤，也不会让服务器一直处于未就绪状态。
+"""
+
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 合成代码：触发内存安全、现代化、const 正确性和命名检查的常见规则
+SAMPLE_CODE = """#ifndef WARMUP_SAMPLE_H
+#define WARMUP_SAMPLE_H
+
+#include <cstdio>
+#include <string>
+#include <vector>
+
+typedef std::vector<int> IntList;
+
+class buffer_holder {
+public:
+    buffer_holder(int size) : size_(size) { data_ = new char[size]; }
+    ~buffer_holder() { delete data_; }
+
+    int GetSize() { return size_; }
+    void Append(std::string text) { strcpy(data_, text.c_str()); }
+
+private:
+    char* data_;
+    int size_;
+};
+
+int SumAll(IntList& values) {
+    int total = 0;
+    for (IntList::iterator it = values.begin(); it != values.end(); ++it) {
+        total += *it;
+    }
+    int* scratch = (int*)malloc(sizeof(int) * 4);
+    if (scratch == NULL) return total;
+    free(scratch);
+    return total;
+}
+
+#endif
+"""
+
+# 工具 -> 预热调用的参数
+TOOL_CALLS: Dict[str, Dict[str, Any]] = {
+    "check_naming": {"identifier": "buffer_holder", "category": "class"},
+    "check_naming_batch": {"items": [
+        {"identifier": "GetSize", "category": "function"},
+        {"identifier": "maxCount", "category": "constant"},
+    ]},
+    "check_naming_in_code": {"code": SAMPLE_CODE},
+    "check_include_guard": {"code": SAMPLE_CODE, "file_path": "warmup_sample.h"},
+    "analyze_memory_safety": {"code": SAMPLE_CODE, "output_format": "sarif"},
+    "suggest_modern_cpp": {"code": SAMPLE_CODE, "target_standard": "cpp17"},
+    "check_const_correctness": {"code": SAMPLE_CODE, "verbosity": "compact"},
+    "analyze_all": {"code": SAMPLE_CODE, "file_path": "warmup_sample.h", "output_format": "json"},
+}
+
+# 预热读取的资源（各资源的概览文档）
+RESOURCE_URIS = (
+    "cpp-style://naming/all",
+    "cpp-style://best-practices/all",
+    "cpp-style://standard/all",
+    "cpp-style://examples/all",
+    "cpp-style://rules/all",
+)
+
+# 提示模板 -> 参数
+PROMPT_CALLS: Dict[str, Dict[str, Any]] = {
+    "code_review": {"focus": "general"},
+    "refactor_suggestion": {"target_standard": "cpp17"},
+}
+
+# 预热步骤: (名称, 执行该步骤的协程函数)
+Step = Tuple[str, Callable[[], Awaitable[Any]]]
+
+
+class Warmup:
+    """预热状态：pending（尚未开始）、running、done，未启用时为 disabled"""
+
+    def __init__(self, enabled: bool = True):
+        self.status = "pending" if enabled else "disabled"
+        self.duration_ms: Optional[float] = None
+        self.steps: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+
+    @property
+    def ready(self) -> bool:
+        """预热是否已结束（未启用预热时始终就绪）"""
+        return self.status in ("done", "disabled")
+
+    async def run(self, steps: Sequence[Step]) -> None:
+        """依次执行预热步骤，记录每步耗时和失败原因"""
+        if self.status != "pending":
+            return
+        self.status = "running"
+        start = time.perf_counter()
+        for name, step in steps:
+            step_start = time.perf_counter()
+            try:
+                await step()
+            except Exception as e:
+                self.errors[name] = f"{type(e).__name__}: {e}"
+                logger.warning("预热步骤 %s 失败: %s", name, e)
+            self.steps[name] = (time.perf_counter() - step_start) * 1000
+        self.duration_ms = (time.perf_counter() - start) * 1000
+        self.status = "done"
+        logger.info("预热完成: %d 个步骤，耗时 %.0f ms，%d 个失败", len(steps), self.duration_ms, len(self.errors))
+
+    def stats(self) -> Dict[str, Any]:
+        """预热状态（用于 /ready）"""
+        stats: Dict[str, Any] = {"status": self.status}
+        if self.duration_ms is not None:
+            stats["duration_ms"] = round(self.duration_ms, 1)
+            stats["steps"] = {name: round(ms, 1) for name, ms in self.steps.items()}
+        if self.errors:
+            stats["errors"] = dict(self.errors)
+        return stats
@@ -4,31 +4,65 @@ C++ 编码规范 MCP 服务器
 提供 C++ 代码规范检查、最佳实践建议和代码审查支持。
 """
 
+import asyncio
+import contextlib
+import functools
+import json
+import logging
 import os
+import signal
+import sys
+import time
 from pathlib import Path
-from typing import Literal
+from typing import Annotated, Literal
 
-from mcp.server.fastmcp import FastMCP
-from mcp.types import ToolAnnotations
-from starlette.requests import Request
-from starlette.responses import FileResponse, JSONResponse, RedirectResponse
-
-# 导入工具模块
-from cpp_style.tools.naming_checker import get_checker as get_naming_checker
-from cpp_style.tools.include_guard_checker import get_checker as get_include_guard_checker
-from cpp_style.tools.memory_safety import get_analyzer as get_memory_analyzer
-from cpp_style.tools.modern_cpp import get_suggester as get_modern_cpp_suggester
-from cpp_style.tools.const_checker import get_checker as get_const_checker
+# 模块导入耗时从这里开始计算（主要是 MCP SDK 和工具 schema 的注册）
+_IMPORT_START = time.perf_counter()
 
-# 导入资源模块
-from cpp_style.resources.naming_rules import get_resource as get_naming_resource
-from cpp_style.resources.best_practices import get_resource as get_practices_resource
-from cpp_style.resources.cpp_standards import get_resource as get_standards_resource
-from cpp_style.resources.design_patterns import get_resource as get_patterns_resource
-
-# 导入提示模块
-from cpp_style.prompts.code_review import get_prompt as get_code_review_prompt
-from cpp_style.prompts.refactor_suggestion import get_prompt as get_refactor_prompt
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.types import CallToolResult, TextContent, ToolAnnotations
+from pydantic import BaseModel, Field
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, RedirectResponse, Response
+
+from cpp_style import lazy
+from cpp_style.cache import PersistentResultStore, ResultCache
+from cpp_style.compact import DEFAULT_MAX_ISSUES
+from cpp_style.data.snapshot import get_snapshot
+from cpp_style.executor import AnalysisExecutor, Limits, default_workers
+from cpp_style.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from cpp_style.metrics import Family, Metrics, resident_memory_bytes
+from cpp_style.output import AnalysisOutput, FindingSet, NamingOutputFormat, OutputFormat, structured
+from cpp_style.profiling import render as render_profile
+from cpp_style.rules import RuleSelection
+# 执行器已经导入了 SARIF 输出模块，这里直接引用
+from cpp_style.sarif import render as render_sarif
+from cpp_style.source_buffer import SourceBuffer
+from cpp_style.static_assets import DEFAULT_MAX_AGE, StaticAsset
+from cpp_style.warmup import PROMPT_CALLS, RESOURCE_URIS, TOOL_CALLS, Step, Warmup
+
+logger = logging.getLogger(__name__)
+
+# 工具、资源和提示模板的实现在第一次调用时才导入（见 cpp_style.lazy）；
+# 工具函数本身（参数签名和 schema）在启动时照常注册
+
+# 工具模块
+get_naming_checker = lazy.lazy("cpp_style.tools.naming_checker:get_checker")
+get_include_guard_checker = lazy.lazy("cpp_style.tools.include_guard_checker:get_checker")
+# 代码分析工具（内存安全、现代 C++、const 正确性、综合分析、代码命名检查）
+# 通过 cpp_style.executor 执行，可以在进程池中运行
+
+# 资源模块
+get_naming_resource = lazy.lazy("cpp_style.resources.naming_rules:get_resource")
+get_practices_resource = lazy.lazy("cpp_style.resources.best_practices:get_resource")
+get_standards_resource = lazy.lazy("cpp_style.resources.cpp_standards:get_resource")
+get_patterns_resource = lazy.lazy("cpp_style.resources.design_patterns:get_resource")
+get_rule_catalog_resource = lazy.lazy("cpp_style.resources.rule_catalog:get_resource")
+
+# 提示模块
+get_code_review_prompt = lazy.lazy("cpp_style.prompts.code_review:get_prompt")
+get_refactor_prompt = lazy.lazy("cpp_style.prompts.refactor_suggestion:get_prompt")
 
 # ==================== OAuth 配置 ====================
 
@@ -64,6 +98,182 @@ if _GITHUB_CLIENT_ID and _GITHUB_CLIENT_SECRET:
         ),
     )
 
+# ==================== 结果缓存 ====================
+
+# 工具结果缓存的总字节数上限（默认 32 MB，设为 0 禁用）
+_CACHE_MAX_BYTES = int(os.environ.get("CPP_STYLE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# 持久化缓存目录（未设置时不启用）；Fly.io 上挂载卷，机器停止后缓存依然保留
+_CACHE_DIR = os.environ.get("CPP_STYLE_CACHE_DIR", "")
+_CACHE_DISK_MAX_BYTES = int(os.environ.get("CPP_STYLE_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+_CACHE_MAX_AGE = float(os.environ.get("CPP_STYLE_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+
+_result_store = None
+if _CACHE_DIR:
+    _result_store = PersistentResultStore(
+        str(Path(_CACHE_DIR) / "results.sqlite3"),
+        max_bytes=_CACHE_DISK_MAX_BYTES,
+        max_age=_CACHE_MAX_AGE,
+    )
+_result_cache = ResultCache(_CACHE_MAX_BYTES, store=_result_store)
+
+# ==================== 执行时限 ====================
+
+# 单个请求的截止时间（毫秒），也是 deadline_ms 参数的上限；0 表示不限
+_DEADLINE_MS = int(os.environ.get("CPP_STYLE_DEADLINE_MS", "10000"))
+# 单条规则的执行预算（毫秒），超出时中止该规则并返回部分结果；0 表示不限
+_RULE_BUDGET_MS = int(os.environ.get("CPP_STYLE_RULE_BUDGET_MS", "2000"))
+
+
+def _limits(deadline_ms: int) -> Limits:
+    """由工具参数确定执行时限（秒）；请求值不能超过服务器上限"""
+    total = _DEADLINE_MS
+    if deadline_ms > 0:
+        total = min(deadline_ms, _DEADLINE_MS) if _DEADLINE_MS else deadline_ms
+    return (
+        total / 1000 if total else None,
+        _RULE_BUDGET_MS / 1000 if _RULE_BUDGET_MS else None,
+    )
+
+# ==================== 分析执行器 ====================
+
+# streamable-http 模式下分析任务在进程池中执行，事件循环不被阻塞；
+# 工作进程数默认等于可用 CPU 核数，设为 0 时在事件循环中直接执行（stdio 模式始终如此）
+_WORKERS = int(os.environ.get("CPP_STYLE_WORKERS", str(default_workers())))
+# 同时执行的分析数上限（0 表示与工作进程数相同）和排队请求数上限；
+# 队列满时新请求立即返回"服务器繁忙"错误，而不是在 256 MB 的机器上无限堆积
+_MAX_IN_FLIGHT = int(os.environ.get("CPP_STYLE_MAX_IN_FLIGHT", "0"))
+_MAX_QUEUE = int(os.environ.get("CPP_STYLE_MAX_QUEUE", "16"))
+# 超过该长度的输入在顶层声明边界处切分，由多个工作进程并行分析（只有一个工作进程时不分块）
+_CHUNK_BYTES = int(os.environ.get("CPP_STYLE_CHUNK_BYTES", str(512 * 1024)))
+_executor = AnalysisExecutor(_WORKERS, _MAX_IN_FLIGHT, _MAX_QUEUE, _CHUNK_BYTES)
+
+# ==================== 指标 ====================
+
+# 每个工具、资源和提示模板处理函数都由 _metrics.instrument 记录请求数、耗时和输入大小，
+# /metrics 以 Prometheus 文本格式输出（见 cpp_style.metrics）
+_metrics = Metrics()
+
+
+def _collect_state() -> list[Family]:
+    """抓取时读取的状态：结果缓存、执行器和进程内存"""
+    cache = _result_cache.stats()
+    executor = _executor.stats()
+    admission = executor["admission"]
+    families: list[Family] = [
+        ("cpp_style_cache_hits_total", "counter", "Result cache hits", [({}, cache["hits"])]),
+        ("cpp_style_cache_misses_total", "counter", "Result cache misses", [({}, cache["misses"])]),
+        ("cpp_style_cache_evictions_total", "counter", "Result cache evictions", [({}, cache["evictions"])]),
+        ("cpp_style_cache_hit_ratio", "gauge", "Result cache hit ratio since startup", [({}, cache["hit_ratio"])]),
+        ("cpp_style_cache_bytes", "gauge", "Bytes held by the result cache", [({}, cache["bytes"])]),
+        ("cpp_style_cache_entries", "gauge", "Entries in the result cache", [({}, cache["entries"])]),
+        ("cpp_style_analyses_in_flight", "gauge", "Analyses currently executing", [({}, admission["in_flight"])]),
+        ("cpp_style_analyses_queued", "gauge", "Analyses waiting for an execution slot", [({}, admission["queued"])]),
+        ("cpp_style_analyses_rejected_total", "counter", "Analyses rejected because the queue was full", [({}, admission["rejected"])]),
+        ("cpp_style_analyses_chunked_total", "counter", "Analyses split into chunks", [({}, executor["chunked"])]),
+        ("cpp_style_workers", "gauge", "Analysis worker processes", [({}, executor["workers"])]),
+        ("cpp_style_worker_restarts_total", "counter", "Worker pool restarts", [({}, executor["restarts"])]),
+    ]
+    if cache["persistent"] is not None:
+        persistent = cache["persistent"]
+        families += [
+            ("cpp_style_persistent_cache_hits_total", "counter", "Persistent cache hits", [({}, persistent["hits"])]),
+            ("cpp_style_persistent_cache_misses_total", "counter", "Persistent cache misses", [({}, persistent["misses"])]),
+            ("cpp_style_persistent_cache_bytes", "gauge", "Bytes held by the persistent cache", [({}, persistent["bytes"])]),
+        ]
+
+    rss = resident_memory_bytes()
+    if rss is not None:
+        families.append(("process_resident_memory_bytes", "gauge", "Resident memory of the server process", [({}, rss)]))
+    worker_rss = [resident_memory_bytes(pid) for pid in _executor.worker_pids()]
+    if worker_rss:
+        families.append((
+            "cpp_style_workers_resident_memory_bytes", "gauge", "Total resident memory of the worker processes",
+            [({}, sum(value for value in worker_rss if value is not None))],
+        ))
+    return families
+
+
+_metrics.add_collector(_collect_state)
+
+
+def _progress(ctx: Context | None):
+    """客户端请求了进度通知（带 progressToken）时返回进度回调，否则返回 None"""
+    if ctx is None:
+        return None
+    try:
+        meta = ctx.request_context.meta
+    except ValueError:
+        # 不在请求上下文中（如直接调用工具函数）
+        return None
+    if meta is None or meta.progressToken is None:
+        return None
+
+    # Context.report_progress 不带 related_request_id，streamable-http 下通知会发到
+    # 独立的 GET 流（无状态模式没有这个流），这里关联到当前请求的响应流
+    async def report(progress: float, total: float | None = None, message: str | None = None) -> None:
+        await ctx.session.send_progress_notification(
+            progress_token=meta.progressToken,
+            progress=progress,
+            total=total,
+            message=message,
+            related_request_id=ctx.request_id,
+        )
+
+    return report
+
+
+# 工具返回值：文本内容，加上符合 AnalysisOutput 的 structuredContent（发布为工具的 outputSchema）
+ToolResult = Annotated[CallToolResult, AnalysisOutput]
+
+# 工具返回值在缓存中保存为 JSON 字符串
+_RESULT_CODEC = (CallToolResult.model_dump_json, CallToolResult.model_validate_json)
+
+
+def _tool_result(
+    tool: str, result: str | dict, partial: bool = False, output_format: str = "markdown",
+    profile: list[dict] | None = None
+) -> CallToolResult:
+    """
+    把 markdown 报告、SARIF 日志或 json 结构化结果转换为工具返回值
+
+    markdown 报告和 SARIF 日志作为文本内容返回，structuredContent 只标明格式；结构化结果放在
+    structuredContent 中，文本内容是同一结果的紧凑 JSON（兼容不读取 structuredContent 的客户端）。
+    有规则耗时时放在 structuredContent 的 profile 中，markdown 和 SARIF 另附一段耗时表
+    （单独的文本内容，SARIF 日志保持完整）
+    """
+    if isinstance(result, str):
+        content = [TextContent(type="text", text=result)]
+        structured_content = {"format": output_format, "tool": tool, "partial": partial}
+        if profile is not None:
+            content.append(TextContent(type="text", text=render_profile(profile)))
+            structured_content["profile"] = profile
+        return CallToolResult(content=content, structuredContent=structured_content)
+    if profile is not None:
+        result = {**result, "profile": profile}
+    return CallToolResult(
+        content=[TextContent(type="text", text=json.dumps(result, ensure_ascii=False, separators=(",", ":")))],
+        structuredContent=result,
+    )
+
+
+async def _analyze(
+    task: str, deadline_ms: int, *args, output_format: str = "markdown", ctx: Context | None = None,
+    profile: bool = False
+) -> CallToolResult:
+    """
+    在执行器中运行分析任务；部分结果不写入缓存，避免一次超时的结果被长期复用
+
+    客户端请求进度时，每条规则（大文件每个分块）完成后以进度通知发送结果摘要，
+    完整报告仍作为工具结果返回。profile 为 True 时附带各规则的耗时，同样不写入缓存
+    （缓存命中时耗时已无意义）
+    """
+    result, partial, rule_counts, rule_profile = await _executor.run(
+        task, (*args, output_format), _limits(deadline_ms), _progress(ctx), profile)
+    _metrics.add_rule_findings(rule_counts)
+    if partial or profile:
+        _result_cache.skip_store()
+    return _tool_result(task, result, partial, output_format, rule_profile)
+
 # 创建 MCP 服务器实例
 # stateless_http=True：每个请求独立处理，无需 session ID
 # 使 Smithery 扫描器可以直接查询 tools/list 等端点
@@ -86,25 +296,49 @@ async def health_check(request: Request) -> JSONResponse:
         "status": "ok",
         "service": "cpp-style-guide-mcp",
         "auth": "github" if auth_enabled else "disabled",
+        "cache": _result_cache.stats(),
+        "executor": _executor.stats(),
+        "startup": _startup_stats(),
     })
 
 
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> Response:
+    """Prometheus 指标"""
+    return Response(_metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@mcp.custom_route("/ready", methods=["GET"])
+async def ready_check(request: Request) -> JSONResponse:
+    """就绪检查：启动预热完成后返回 200，预热期间返回 503"""
+    ready = _warmup.ready
+    return JSONResponse(
+        {"status": "ready" if ready else "warming", "warmup": _warmup.stats()},
+        status_code=200 if ready else 503,
+    )
+
+
+# 静态资源在启动时读入内存（见 cpp_style.static_assets），轮询请求不访问磁盘
+_STATIC_DIR = Path(__file__).parent / "static"
+_STATIC_MAX_AGE = int(os.environ.get("CPP_STYLE_STATIC_MAX_AGE", str(DEFAULT_MAX_AGE)))
+_server_card = StaticAsset.load(_STATIC_DIR / ".well-known" / "mcp" / "server-card.json", "application/json", _STATIC_MAX_AGE)
+_server_icon = StaticAsset.load(_STATIC_DIR / "icon.svg", "image/svg+xml", _STATIC_MAX_AGE)
+
+
 @mcp.custom_route("/.well-known/mcp/server-card.json", methods=["GET"])
-async def server_card(request: Request) -> FileResponse | JSONResponse:
+async def server_card(request: Request) -> Response:
     """Smithery 服务器元数据（用于 Smithery 平台展示）"""
-    card_path = Path(__file__).parent / "static" / ".well-known" / "mcp" / "server-card.json"
-    if card_path.exists():
-        return FileResponse(str(card_path), media_type="application/json")
-    return JSONResponse({"error": "server-card.json 未找到"}, status_code=404)
+    if _server_card is None:
+        return JSONResponse({"error": "server-card.json 未找到"}, status_code=404)
+    return _server_card.response(request)
 
 
 @mcp.custom_route("/icon.svg", methods=["GET"])
-async def server_icon(request: Request) -> FileResponse | JSONResponse:
+async def server_icon(request: Request) -> Response:
     """服务器图标"""
-    icon_path = Path(__file__).parent / "static" / "icon.svg"
-    if icon_path.exists():
-        return FileResponse(str(icon_path), media_type="image/svg+xml")
-    return JSONResponse({"error": "icon.svg 未找到"}, status_code=404)
+    if _server_icon is None:
+        return JSONResponse({"error": "icon.svg 未找到"}, status_code=404)
+    return _server_icon.response(request)
 
 
 @mcp.custom_route("/oauth/callback", methods=["GET"])
@@ -130,26 +364,74 @@ async def oauth_callback(request: Request) -> RedirectResponse | JSONResponse:
 
 _READ_ONLY = ToolAnnotations(readOnlyHint=True, destructiveHint=False, idempotentHint=True, openWorldHint=False)
 
+NamingCategory = Literal["variable", "constant", "function", "class", "namespace", "member_variable", "template_parameter", "file_naming"]
+
+
+Severity = Literal["error", "warning", "info"]
+
+Verbosity = Literal["full", "compact"]
+
+# max_issues 参数的上限
+MAX_ISSUES_LIMIT = 50
+
+_DEADLINE_HELP = " deadline_ms sets a request deadline (capped by the server limit); a watchdog aborts any rule that exceeds its time budget and the report is then marked as partial, naming the rule that timed out."
+
+_OUTPUT_HELP = " Set output_format=\"json\" to skip the markdown report and get the raw findings (rule ID, severity, source range, suggestion) as structured content matching the tool's output schema."
+
+_VERBOSITY_HELP = " Set verbosity=\"compact\" for reports that fit a context budget: repeated findings are aggregated per rule (count plus the first max_issues locations), static guides are dropped and the report is hard-capped in size; with output_format=\"json\" it keeps only max_issues findings per rule."
+
+_SARIF_HELP = " Set output_format=\"sarif\" to get a SARIF 2.1.0 log (rule metadata, precise regions, stable fingerprints) as text content, ready for code scanning upload; file_path becomes the result location."
+
+_PROFILE_HELP = " Set debug_profile=true to get the wall time and finding count of every rule that ran, slowest first, as structured content (profile) and, for markdown and sarif, as an extra text block; profiled results are never cached."
+
+_SELECTION_HELP = " Use rules / exclude_rules (rule IDs or wildcards such as \"mem-*\", listed in cpp-style://rules/all) and min_severity to run only part of the rule set; unselected rules are never executed."
+
+
+def _compact(verbosity: Verbosity, max_issues: int) -> int:
+    """任务的 compact 参数：紧凑模式下每条规则列出的问题数，完整模式为 0"""
+    return max_issues if verbosity == "compact" else 0
+
+
+def _rule_selection(rules: list[str] | None, exclude_rules: list[str] | None, min_severity: Severity) -> RuleSelection:
+    """由工具参数构建规则选择（未知的规则 ID 会作为工具错误返回）"""
+    return RuleSelection.of(rules, exclude_rules, min_severity)
+
+
+class NamingItem(BaseModel):
+    """批量命名检查的单个条目"""
+    identifier: str = Field(description="C++ identifier to check")
+    category: NamingCategory = Field(description="Identifier category")
+
 
 @mcp.tool(
-    description="Check whether a C++ identifier follows naming conventions. Validates variables, constants, functions, classes, namespaces, member variables, template parameters, and file names against established C++ style guidelines. Returns whether the identifier is valid, a detailed explanation, and suggested alternatives if it violates the rules.",
+    description="Check whether a C++ identifier follows naming conventions. Validates variables, constants, functions, classes, namespaces, member variables, template parameters, and file names against established C++ style guidelines. Returns whether the identifier is valid, a detailed explanation, and suggested alternatives if it violates the rules." + _OUTPUT_HELP,
     annotations=_READ_ONLY,
 )
+@_metrics.instrument("tool")
+@_result_cache.cached(codec=_RESULT_CODEC)
 def check_naming(
     identifier: str,
-    category: Literal["variable", "constant", "function", "class", "namespace", "member_variable", "template_parameter", "file_naming"],
-) -> str:
+    category: NamingCategory,
+    output_format: NamingOutputFormat = "markdown",
+) -> ToolResult:
     """
     检查 C++ 标识符命名是否符合规范
 
     参数:
         identifier: 要检查的标识符名称
         category: 标识符类别（variable/constant/function/class/namespace/member_variable/template_parameter/file_naming）
+        output_format: 输出格式（markdown 报告，或 json 结构化结果）
 
     返回:
         检查结果，包含是否符合规范、详细说明和建议
     """
     checker = get_naming_checker()
+    if output_format == "json":
+        failures, _ = checker.check_naming_batch([(identifier, category)], render=False)
+        findings = FindingSet()
+        findings.add_naming(failures)
+        return _tool_result("check_naming", structured("check_naming", findings))
+
     is_valid, details, suggestions = checker.check_naming(identifier, category)
 
     result = details
@@ -158,20 +440,66 @@ def check_naming(
         for sug in suggestions:
             result += f"  • {sug}\n"
 
-    return result
+    return _tool_result("check_naming", result)
 
 
 @mcp.tool(
-    description="Check whether a C++ header file has correct include guards or #pragma once directives. Detects missing guards, malformed macro names, mismatched #endif comments, and suggests correctly formatted guard macros based on the file path.",
+    description="Check many C++ identifiers against naming conventions in one call. Takes a list of (identifier, category) pairs, validates each category group with its precompiled rule, and returns a compact table listing only the identifiers that violate the conventions together with suggested names. Handles thousands of identifiers per call." + _OUTPUT_HELP,
     annotations=_READ_ONLY,
 )
-def check_include_guard(code: str, file_path: str = "") -> str:
+@_metrics.instrument("tool")
+@_result_cache.cached(codec=_RESULT_CODEC)
+async def check_naming_batch(items: list[NamingItem], output_format: NamingOutputFormat = "markdown") -> ToolResult:
+    """
+    批量检查 C++ 标识符命名
+
+    参数:
+        items: 要检查的 (identifier, category) 条目列表
+        output_format: 输出格式（markdown 报告，或 json 结构化结果）
+
+    返回:
+        只包含不符合规范条目的表格，以及建议的命名
+    """
+    return await _analyze(
+        "check_naming_batch", 0, tuple((item.identifier, item.category) for item in items),
+        output_format=output_format,
+    )
+
+
+@mcp.tool(
+    description="Extract every identifier declared in a C++ code blob and check it against naming conventions. A single linear pass over the token stream finds namespaces, classes/structs/enums and type aliases, functions and their parameters, member variables, constants (constexpr/const, enumerators, macros), template parameters and local variables, then validates them in one batch. Returns only the violations with line numbers and suggested names." + _OUTPUT_HELP,
+    annotations=_READ_ONLY,
+)
+@_metrics.instrument("tool")
+@_result_cache.cached(codec=_RESULT_CODEC)
+async def check_naming_in_code(code: str, output_format: NamingOutputFormat = "markdown") -> ToolResult:
+    """
+    提取代码中声明的所有标识符并检查命名规范
+
+    参数:
+        code: 要检查的 C++ 代码
+        output_format: 输出格式（markdown 报告，或 json 结构化结果）
+
+    返回:
+        命名审查报告：各类别的声明数量，以及不符合规范的标识符、所在行和建议的命名
+    """
+    return await _analyze("check_naming_in_code", 0, code, output_format=output_format)
+
+
+@mcp.tool(
+    description="Check whether a C++ header file has correct include guards or #pragma once directives. Detects missing guards, malformed macro names, mismatched #endif comments, and suggests correctly formatted guard macros based on the file path." + _OUTPUT_HELP + _SARIF_HELP,
+    annotations=_READ_ONLY,
+)
+@_metrics.instrument("tool")
+@_result_cache.cached(codec=_RESULT_CODEC)
+def check_include_guard(code: str, file_path: str = "", output_format: OutputFormat = "markdown") -> ToolResult:
     """
     检查 C++ 头文件的包含保护是否正确
 
     参数:
         code: 头文件的完整代码
         file_path: 可选的文件路径，用于生成建议的保护宏名
+        output_format: 输出格式（markdown 报告、json 结构化结果或 SARIF 日志）
 
     返回:
         检查结果，包含是否符合规范、详细说明和建议
@@ -180,6 +508,13 @@ def check_include_guard(code: str, file_path: str = "") -> str:
 
     file_path_param = file_path if file_path else None
     is_valid, details, suggestions = checker.check_include_guard(code, file_path_param)
+    if output_format != "markdown":
+        findings = FindingSet()
+        findings.add_include_guard(is_valid, suggestions)
+        if output_format == "sarif":
+            log = render_sarif(findings, SourceBuffer(code), file_path_param)
+            return _tool_result("check_include_guard", log, output_format=output_format)
+        return _tool_result("check_include_guard", structured("check_include_guard", findings))
 
     result = details
     if suggestions and not is_valid:
@@ -187,73 +522,197 @@ def check_include_guard(code: str, file_path: str = "") -> str:
         for sug in suggestions:
             result += f"  • {sug}\n"
 
-    return result
+    return _tool_result("check_include_guard", result)
 
 
 @mcp.tool(
-    description="Analyze C++ code for memory safety issues including memory leaks, dangling pointers, double-free errors, use of raw owning pointers, missing RAII patterns, and unsafe array operations. Returns a detailed report with line-level findings and recommendations to use modern C++ alternatives like smart pointers.",
+    description="Analyze C++ code for memory safety issues including memory leaks, dangling pointers, double-free errors, use of raw owning pointers, missing RAII patterns, and unsafe array operations. Returns a detailed report with line-level findings and recommendations to use modern C++ alternatives like smart pointers." + _SELECTION_HELP + _DEADLINE_HELP + _OUTPUT_HELP + _VERBOSITY_HELP + _SARIF_HELP + _PROFILE_HELP,
     annotations=_READ_ONLY,
 )
-def analyze_memory_safety(code: str) -> str:
+@_metrics.instrument("tool")
+@_result_cache.cached(ignore=("deadline_ms", "ctx"), codec=_RESULT_CODEC)
+async def analyze_memory_safety(
+    code: str,
+    file_path: str = "",
+    rules: list[str] | None = None,
+    exclude_rules: list[str] | None = None,
+    min_severity: Severity = "info",
+    output_format: OutputFormat = "markdown",
+    verbosity: Verbosity = "full",
+    max_issues: Annotated[int, Field(ge=1, le=MAX_ISSUES_LIMIT)] = DEFAULT_MAX_ISSUES,
+    debug_profile: bool = False,
+    deadline_ms: int = 0,
+    ctx: Context | None = None,
+) -> ToolResult:
     """
     分析 C++ 代码中的内存安全问题
 
     参数:
         code: 要分析的 C++ 代码
+        file_path: 可选的文件路径，作为 SARIF 结果中的文件位置
+        rules: 只执行这些规则（规则 ID 或通配符，默认全部）
+        exclude_rules: 不执行这些规则
+        min_severity: 只执行严重程度不低于该级别的规则（默认 info，即全部）
+        output_format: 输出格式（markdown 报告、json 结构化结果或 SARIF 日志）
+        verbosity: full 为完整报告；compact 按规则汇总问题，只列出前 max_issues 个位置，不附带固定指南
+        max_issues: compact 模式下每条规则列出的位置数（json 格式下每条规则返回的问题数）
+        debug_profile: 附带各规则的耗时和结果数（结果不写入缓存）
+        deadline_ms: 请求截止时间（毫秒，0 表示使用服务器默认值），超时时返回部分结果
+        ctx: MCP 请求上下文（由 FastMCP 注入，用于发送进度通知）
 
     返回:
         内存安全分析报告，包括潜在的内存泄漏、悬空指针、不安全操作等
     """
-    analyzer = get_memory_analyzer()
-    issues, report = analyzer.analyze_memory_safety(code)
-    return report
+    selection = _rule_selection(rules, exclude_rules, min_severity)
+    return await _analyze(
+        "analyze_memory_safety", deadline_ms, code, selection, file_path or None,
+        _compact(verbosity, max_issues), output_format=output_format, ctx=ctx, profile=debug_profile,
+    )
 
 
 @mcp.tool(
-    description="Suggest how to modernize C++ code to use features from a target standard (C++11 through C++23). Identifies outdated patterns such as raw loops replaceable by range-for, C-style casts, manual memory management, pre-C++11 type aliases, and suggests concrete rewrites using modern idioms like auto, structured bindings, std::optional, concepts, and ranges.",
+    description="Suggest how to modernize C++ code to use features from a target standard (C++11 through C++23). Identifies outdated patterns such as raw loops replaceable by range-for, C-style casts, manual memory management, pre-C++11 type aliases, and suggests concrete rewrites using modern idioms like auto, structured bindings, std::optional, concepts, and ranges." + _SELECTION_HELP + _DEADLINE_HELP + _OUTPUT_HELP + _VERBOSITY_HELP + _SARIF_HELP + _PROFILE_HELP,
     annotations=_READ_ONLY,
 )
-def suggest_modern_cpp(
+@_metrics.instrument("tool")
+@_result_cache.cached(ignore=("deadline_ms", "ctx"), codec=_RESULT_CODEC)
+async def suggest_modern_cpp(
     code: str,
+    file_path: str = "",
     target_standard: Literal["cpp11", "cpp14", "cpp17", "cpp20", "cpp23"] = "cpp17",
-) -> str:
+    rules: list[str] | None = None,
+    exclude_rules: list[str] | None = None,
+    min_severity: Severity = "info",
+    output_format: OutputFormat = "markdown",
+    verbosity: Verbosity = "full",
+    max_issues: Annotated[int, Field(ge=1, le=MAX_ISSUES_LIMIT)] = DEFAULT_MAX_ISSUES,
+    debug_profile: bool = False,
+    deadline_ms: int = 0,
+    ctx: Context | None = None,
+) -> ToolResult:
     """
     建议将代码升级为现代 C++ 写法
 
     参数:
         code: 要分析的 C++ 代码
+        file_path: 可选的文件路径，作为 SARIF 结果中的文件位置
         target_standard: 目标 C++ 标准（cpp11/cpp14/cpp17/cpp20/cpp23，默认 cpp17）
+        rules: 只执行这些规则（规则 ID 或通配符，默认全部）
+        exclude_rules: 不执行这些规则
+        min_severity: 只执行严重程度不低于该级别的规则（默认 info，即全部）
+        output_format: 输出格式（markdown 报告、json 结构化结果或 SARIF 日志）
+        verbosity: full 为完整报告；compact 按规则汇总问题，只列出前 max_issues 个位置，不附带固定指南
+        max_issues: compact 模式下每条规则列出的位置数（json 格式下每条规则返回的问题数）
+        debug_profile: 附带各规则的耗时和结果数（结果不写入缓存）
+        deadline_ms: 请求截止时间（毫秒，0 表示使用服务器默认值），超时时返回部分结果
+        ctx: MCP 请求上下文（由 FastMCP 注入，用于发送进度通知）
 
     返回:
         现代化建议报告，包括可以使用的新特性和重写示例
     """
-    suggester = get_modern_cpp_suggester()
-    suggestions, report = suggester.suggest_modern_cpp(code, target_standard)
-    return report
+    selection = _rule_selection(rules, exclude_rules, min_severity)
+    return await _analyze(
+        "suggest_modern_cpp", deadline_ms, code, target_standard, selection, file_path or None,
+        _compact(verbosity, max_issues), output_format=output_format, ctx=ctx, profile=debug_profile,
+    )
 
 
 @mcp.tool(
-    description="Check C++ code for const correctness issues. Identifies member functions that do not modify state but are missing the const qualifier, non-const references where const references would suffice, and variables that are never modified but not declared const. Returns a report with specific locations and suggested fixes.",
+    description="Check C++ code for const correctness issues. Identifies member functions that do not modify state but are missing the const qualifier, non-const references where const references would suffice, and variables that are never modified but not declared const. Returns a report with specific locations and suggested fixes." + _SELECTION_HELP + _DEADLINE_HELP + _OUTPUT_HELP + _VERBOSITY_HELP + _SARIF_HELP + _PROFILE_HELP,
     annotations=_READ_ONLY,
 )
-def check_const_correctness(code: str) -> str:
+@_metrics.instrument("tool")
+@_result_cache.cached(ignore=("deadline_ms", "ctx"), codec=_RESULT_CODEC)
+async def check_const_correctness(
+    code: str,
+    file_path: str = "",
+    rules: list[str] | None = None,
+    exclude_rules: list[str] | None = None,
+    min_severity: Severity = "info",
+    output_format: OutputFormat = "markdown",
+    verbosity: Verbosity = "full",
+    max_issues: Annotated[int, Field(ge=1, le=MAX_ISSUES_LIMIT)] = DEFAULT_MAX_ISSUES,
+    debug_profile: bool = False,
+    deadline_ms: int = 0,
+    ctx: Context | None = None,
+) -> ToolResult:
     """
     检查 C++ 代码中的 const 正确性
 
     参数:
         code: 要检查的 C++ 代码
+        file_path: 可选的文件路径，作为 SARIF 结果中的文件位置
+        rules: 只执行这些规则（规则 ID 或通配符，默认全部）
+        exclude_rules: 不执行这些规则
+        min_severity: 只执行严重程度不低于该级别的规则（默认 info，即全部）
+        output_format: 输出格式（markdown 报告、json 结构化结果或 SARIF 日志）
+        verbosity: full 为完整报告；compact 按规则汇总问题，只列出前 max_issues 个位置，不附带固定指南
+        max_issues: compact 模式下每条规则列出的位置数（json 格式下每条规则返回的问题数）
+        debug_profile: 附带各规则的耗时和结果数（结果不写入缓存）
+        deadline_ms: 请求截止时间（毫秒，0 表示使用服务器默认值），超时时返回部分结果
+        ctx: MCP 请求上下文（由 FastMCP 注入，用于发送进度通知）
 
     返回:
         const 正确性检查报告，包括缺少 const 的地方和改进建议
     """
-    checker = get_const_checker()
-    issues, report = checker.check_const_correctness(code)
-    return report
+    selection = _rule_selection(rules, exclude_rules, min_severity)
+    return await _analyze(
+        "check_const_correctness", deadline_ms, code, selection, file_path or None,
+        _compact(verbosity, max_issues), output_format=output_format, ctx=ctx, profile=debug_profile,
+    )
+
+
+@mcp.tool(
+    description="Run memory safety, const correctness, modern C++ and include guard checks on the same code in a single call. The code is uploaded and parsed once, the parse is shared by every checker, and the result is a merged report with one section and one timing per checker. Include guard checks are skipped when file_path points to a source file (.cpp, .cc, ...)." + _SELECTION_HELP + " Checkers with no selected rule are skipped entirely." + _DEADLINE_HELP + _OUTPUT_HELP + _VERBOSITY_HELP + _SARIF_HELP + _PROFILE_HELP,
+    annotations=_READ_ONLY,
+)
+@_metrics.instrument("tool")
+@_result_cache.cached(ignore=("deadline_ms", "ctx"), codec=_RESULT_CODEC)
+async def analyze_all(
+    code: str,
+    file_path: str = "",
+    target_standard: Literal["cpp11", "cpp14", "cpp17", "cpp20", "cpp23"] = "cpp17",
+    rules: list[str] | None = None,
+    exclude_rules: list[str] | None = None,
+    min_severity: Severity = "info",
+    output_format: OutputFormat = "markdown",
+    verbosity: Verbosity = "full",
+    max_issues: Annotated[int, Field(ge=1, le=MAX_ISSUES_LIMIT)] = DEFAULT_MAX_ISSUES,
+    debug_profile: bool = False,
+    deadline_ms: int = 0,
+    ctx: Context | None = None,
+) -> ToolResult:
+    """
+    一次调用运行所有代码检查器
+
+    参数:
+        code: 要分析的 C++ 代码
+        file_path: 可选的文件路径，用于包含保护检查（源文件会跳过该检查），也是 SARIF 结果中的文件位置
+        target_standard: 现代化建议的目标 C++ 标准（默认 cpp17）
+        rules: 只执行这些规则（规则 ID 或通配符，默认全部）
+        exclude_rules: 不执行这些规则
+        min_severity: 只执行严重程度不低于该级别的规则（默认 info，即全部）
+        output_format: 输出格式（markdown 报告、json 结构化结果或 SARIF 日志）
+        verbosity: full 为完整报告；compact 按规则汇总问题，只列出前 max_issues 个位置，不附带固定指南
+        max_issues: compact 模式下每条规则列出的位置数（json 格式下每条规则返回的问题数）
+        debug_profile: 附带各规则的耗时和结果数（结果不写入缓存）
+        deadline_ms: 请求截止时间（毫秒，0 表示使用服务器默认值），超时时返回部分结果
+        ctx: MCP 请求上下文（由 FastMCP 注入，用于发送进度通知）
+
+    返回:
+        合并后的分析报告，包含每个检查器的章节和耗时
+    """
+    selection = _rule_selection(rules, exclude_rules, min_severity)
+    return await _analyze(
+        "analyze_all", deadline_ms, code, file_path or None, target_standard, selection,
+        _compact(verbosity, max_issues), output_format=output_format, ctx=ctx, profile=debug_profile,
+    )
 
 
 # ==================== Resources ====================
 
 @mcp.resource("cpp-style://naming/{category}")
+@_metrics.instrument("resource")
 def get_naming_convention(category: str) -> str:
     """
     获取 C++ 命名规范文档
@@ -278,6 +737,7 @@ def get_naming_convention(category: str) -> str:
 
 
 @mcp.resource("cpp-style://best-practices/{topic}")
+@_metrics.instrument("resource")
 def get_best_practice(topic: str) -> str:
     """
     获取 C++ 最佳实践指南
@@ -300,6 +760,7 @@ def get_best_practice(topic: str) -> str:
 
 
 @mcp.resource("cpp-style://standard/{version}")
+@_metrics.instrument("resource")
 def get_cpp_standard(version: str) -> str:
     """
     获取 C++ 标准特性文档
@@ -321,6 +782,7 @@ def get_cpp_standard(version: str) -> str:
 
 
 @mcp.resource("cpp-style://examples/{pattern}")
+@_metrics.instrument("resource")
 def get_design_pattern(pattern: str) -> str:
     """
     获取 C++ 设计模式示例
@@ -342,9 +804,30 @@ def get_design_pattern(pattern: str) -> str:
     return resource.get_pattern_example(pattern)
 
 
+@mcp.resource("cpp-style://rules/{checker}")
+@_metrics.instrument("resource")
+def get_rule_catalog(checker: str) -> str:
+    """
+    获取检查规则目录（规则 ID、严重程度、最低标准）
+
+    可用的检查器:
+    - memory_safety: 内存安全规则
+    - const_correctness: const 正确性规则
+    - modern_cpp: 现代 C++ 规则
+    - all: 查看所有规则
+    """
+    resource = get_rule_catalog_resource()
+
+    if checker == "all":
+        return resource.get_all_rules()
+
+    return resource.get_checker_rules(checker)
+
+
 # ==================== Prompts ====================
 
 @mcp.prompt()
+@_metrics.instrument("prompt")
 def code_review(focus: str = "general") -> str:
     """
     生成 C++ 代码审查提示模板
@@ -362,6 +845,7 @@ def code_review(focus: str = "general") -> str:
 
 
 @mcp.prompt()
+@_metrics.instrument("prompt")
 def refactor_suggestion(target_standard: str = "cpp17") -> str:
     """
     生成代码重构建议提示模板
@@ -378,8 +862,77 @@ def refactor_suggestion(target_standard: str = "cpp17") -> str:
     return prompt_generator.generate(target_standard)
 
 
+# ==================== 导入耗时 ====================
+
+# 服务器模块的导入耗时预算（毫秒），决定机器冷启动后多久能响应第一个请求；
+# 超出时启动日志给出警告，/health 中可以查看实际耗时；0 表示不检查
+_IMPORT_BUDGET_MS = int(os.environ.get("CPP_STYLE_IMPORT_BUDGET_MS", "1500"))
+_IMPORT_MS = (time.perf_counter() - _IMPORT_START) * 1000
+
+
+def _startup_stats() -> dict:
+    """导入耗时、数据快照的加载耗时（没有可用的快照时为 None）和启动后按需加载过的模块"""
+    snapshot = get_snapshot()
+    return {
+        "import_ms": round(_IMPORT_MS, 1),
+        "import_budget_ms": _IMPORT_BUDGET_MS,
+        "snapshot_ms": round(snapshot.load_ms, 1) if snapshot is not None else None,
+        "lazy_loaded": {target: round(ms, 1) for target, ms in lazy.loaded().items()},
+    }
+
+
+def _check_import_budget() -> None:
+    """导入耗时超出预算时记录警告"""
+    if _IMPORT_BUDGET_MS and _IMPORT_MS > _IMPORT_BUDGET_MS:
+        logger.warning(
+            "服务器模块导入耗时 %.0f ms，超出预算 %d ms（可用 python -X importtime 查看各模块耗时）",
+            _IMPORT_MS, _IMPORT_BUDGET_MS,
+        )
+
+
+# ==================== 启动预热 ====================
+
+# streamable-http 模式下服务器开始监听后执行预热（见 cpp_style.warmup），完成前 /ready 返回 503；
+# 设为 0 时不预热，/ready 立即返回 200
+_WARMUP = os.environ.get("CPP_STYLE_WARMUP", "1") != "0"
+_warmup = Warmup(_WARMUP)
+
+
+def _warmup_steps() -> list[Step]:
+    """预热步骤：调用每个工具、读取每个资源的概览、生成每个提示模板"""
+    steps: list[Step] = [(f"tool:{name}", functools.partial(mcp.call_tool, name, args)) for name, args in TOOL_CALLS.items()]
+    steps += [(f"resource:{uri}", functools.partial(mcp.read_resource, uri)) for uri in RESOURCE_URIS]
+    steps += [(f"prompt:{name}", functools.partial(mcp.get_prompt, name, args)) for name, args in PROMPT_CALLS.items()]
+    return steps
+
+
+async def _run_warmup() -> None:
+    """执行预热；合成输入的结果不读写结果缓存，也不计入请求指标"""
+    with _result_cache.bypass(), _metrics.suppress():
+        await _warmup.run(_warmup_steps())
+
+
+def _start_warmup_with(app: Starlette) -> None:
+    """包装应用的 lifespan：启动完成（开始监听）后在后台执行预热，关闭时取消"""
+    lifespan = app.router.lifespan_context
+
+    @contextlib.asynccontextmanager
+    async def warmup_lifespan(app: Starlette):
+        async with lifespan(app) as state:
+            task = asyncio.create_task(_run_warmup())
+            try:
+                yield state
+            finally:
+                task.cancel()
+
+    app.router.lifespan_context = warmup_lifespan
+
+
 # 启动服务器（仅在直接运行时）
 if __name__ == "__main__":
+    _check_import_budget()
+    # 加载构建时生成的数据快照（一次读取），之后的数据集、资源文档和规则表都取自快照
+    get_snapshot()
     # 从环境变量检测运行模式，默认为 stdio
     # Smithery 部署时使用 streamable-http，本地开发使用 stdio
     transport = os.environ.get("MCP_TRANSPORT", "stdio")
@@ -392,9 +945,19 @@ if __name__ == "__main__":
 
         # 获取 FastMCP 的 streamable HTTP 应用（已包含 /health 自定义路由）
         app = mcp.streamable_http_app()
+        if _WARMUP:
+            _start_warmup_with(app)
+
+        # 启动分析进程池，CPU 密集的分析不再阻塞事件循环
+        _executor.start()
+        # uvicorn 优雅退出后会重新触发捕获到的 SIGTERM，转为 SystemExit 以便关闭进程池
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
 
         # 启动服务器
-        uvicorn.run(app, host="0.0.0.0", port=port)
+        try:
+            uvicorn.run(app, host="0.0.0.0", port=port)
+        finally:
+            _executor.shutdown()
     else:
         # stdio 模式：使用标准方式启动
         mcp.run(transport=transport)
@@ -0,0 +1,223 @@
+"""工具调用结果缓存：缓存键、LRU 淘汰、装饰器、跳过写入和绕过，以及持久化存储"""
+
+import asyncio
+import inspect
+import time
+
+from cpp_style import cache
+from cpp_style.cache import PersistentResultStore, ResultCache
+
+
+def counting_tool(result_cache: ResultCache, **cached_options):
+    """一个记录实际调用次数的工具函数"""
+    calls = []
+
+    @result_cache.cached(**cached_options)
+    def check(code: str, strict: bool = False, deadline_ms: int = 0) -> str:
+        """检查代码"""
+        calls.append((code, strict, deadline_ms))
+        return f"report for {code} strict={strict}"
+
+    return check, calls
+
+
+def test_key_depends_on_tool_params_and_data_version(monkeypatch):
+    result_cache = ResultCache(1 << 20)
+    key = result_cache.make_key("analyze", {"code": "int x;", "strict": True})
+    assert key == result_cache.make_key("analyze", {"strict": True, "code": "int x;"})
+    assert key != result_cache.make_key("check", {"code": "int x;", "strict": True})
+    assert key != result_cache.make_key("analyze", {"code": "int y;", "strict": True})
+    assert key != result_cache.make_key("analyze", {"code": "int x;", "strict": False})
+    monkeypatch.setattr(cache, "_data_version", "other")
+    assert key != result_cache.make_key("analyze", {"code": "int x;", "strict": True})
+
+
+def test_key_fields_cannot_run_together():
+    result_cache = ResultCache(1 << 20)
+    assert result_cache.make_key("t", {"a": "bc", "d": ""}) != result_cache.make_key("t", {"a": "b", "d": "c"})
+    assert result_cache.make_key("t", {"a": "1"}) != result_cache.make_key("t", {"a": 1})
+
+
+def test_lru_eviction_by_bytes():
+    value = "x" * 1000
+    result_cache = ResultCache(3 * len(value) + 200)
+    for key in "abc":
+        result_cache.put(key, value + key)
+    assert result_cache.get("a") is not None
+    result_cache.put("d", value + "d")
+    assert result_cache.get("b") is None
+    assert result_cache.get("a") is not None
+    assert result_cache.stats()["evictions"] == 1
+
+
+def test_oversized_value_is_not_cached():
+    result_cache = ResultCache(100)
+    result_cache.put("big", "x" * 1000)
+    assert result_cache.get("big") is None
+    assert result_cache.stats()["entries"] == 0
+
+
+def test_cached_returns_stored_result_and_keeps_signature():
+    result_cache = ResultCache(1 << 20)
+    check, calls = counting_tool(result_cache, ignore=("deadline_ms",))
+    assert check("int x;") == check("int x;", deadline_ms=500) == check(code="int x;", strict=False)
+    assert len(calls) == 1
+    check("int x;", strict=True)
+    assert len(calls) == 2
+    assert list(inspect.signature(check).parameters) == ["code", "strict", "deadline_ms"]
+    assert check.__doc__ == "检查代码"
+    stats = result_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+
+
+def test_disabled_cache_always_calls_tool():
+    result_cache = ResultCache(0)
+    check, calls = counting_tool(result_cache)
+    check("int x;")
+    check("int x;")
+    assert len(calls) == 2
+    assert not result_cache.enabled
+
+
+def test_skip_store_keeps_partial_results_out():
+    result_cache = ResultCache(1 << 20)
+    calls = []
+
+    @result_cache.cached
+    def partial(code: str) -> str:
+        calls.append(code)
+        result_cache.skip_store()
+        return "partial"
+
+    partial("int x;")
+    partial("int x;")
+    assert len(calls) == 2
+    assert result_cache.stats()["entries"] == 0
+
+
+def test_bypass_neither_reads_nor_writes():
+    result_cache = ResultCache(1 << 20)
+    check, calls = counting_tool(result_cache)
+    check("int x;")
+    with result_cache.bypass():
+        check("int x;")
+        check("int y;")
+    assert len(calls) == 3
+    stats = result_cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 0, 1)
+    check("int x;")
+    assert len(calls) == 3
+
+
+def test_async_tool_with_codec():
+    result_cache = ResultCache(1 << 20)
+    calls = []
+
+    @result_cache.cached(codec=(lambda value: ",".join(value), lambda text: text.split(",")))
+    async def tokens(code: str) -> list:
+        calls.append(code)
+        return code.split()
+
+    async def scenario():
+        first = await tokens("int x ;")
+        second = await tokens("int x ;")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second == ["int", "x", ";"]
+    assert len(calls) == 1
+    assert result_cache.get(result_cache.make_key("tokens", {"code": "int x ;"})) == "int,x,;"
+
+
+
+# ==================== 持久化存储 ====================
+
+def test_store_opens_lazily_and_round_trips(tmp_path):
+    path = tmp_path / "cache" / "results.db"
+    store = PersistentResultStore(str(path), 1 << 20, 3600)
+    assert not path.exists()
+    store.put("k", {"report": "ok"})
+    assert path.exists()
+    assert store.get("k") == {"report": "ok"}
+    assert store.get("missing") is None
+    assert (store.hits, store.misses) == (1, 1)
+    store.close()
+
+
+def test_store_survives_restart(tmp_path):
+    path = str(tmp_path / "results.db")
+    first = PersistentResultStore(path, 1 << 20, 3600)
+    first.put("k", "report")
+    first.close()
+    second = PersistentResultStore(path, 1 << 20, 3600)
+    assert second.get("k") == "report"
+    assert second.stats()["bytes"] == len('"report"')
+    second.close()
+
+
+def test_store_cleared_when_data_version_changes(tmp_path, monkeypatch):
+    path = str(tmp_path / "results.db")
+    first = PersistentResultStore(path, 1 << 20, 3600)
+    first.put("k", "report")
+    first.close()
+    monkeypatch.setattr(cache, "_data_version", "changed")
+    second = PersistentResultStore(path, 1 << 20, 3600)
+    assert second.get("k") is None
+    second.close()
+
+
+def test_store_expires_old_entries(tmp_path, monkeypatch):
+    store = PersistentResultStore(str(tmp_path / "results.db"), 1 << 20, 60)
+    store.put("k", "report")
+    now = time.time()
+    monkeypatch.setattr(cache.time, "time", lambda: now + 120)
+    assert store.get("k") is None
+    assert store.evictions == 1
+    assert store.stats()["bytes"] == 0
+    store.close()
+
+
+def test_store_evicts_least_recently_accessed(tmp_path, monkeypatch):
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(cache.time, "time", lambda: next(clock))
+    value = "x" * 100
+    store = PersistentResultStore(str(tmp_path / "results.db"), 350, 3600)
+    for key in "abc":
+        store.put(key, value)
+    assert store.get("a") == value
+    store.put("d", value)
+    assert store.get("b") is None
+    assert store.get("a") == value
+    assert store.stats()["bytes"] <= 350
+    store.close()
+
+
+def test_store_reopens_in_another_process(tmp_path):
+    store = PersistentResultStore(str(tmp_path / "results.db"), 1 << 20, 3600)
+    store.put("k", "report")
+    inherited = store._conn
+    # 模拟 fork 之后的子进程：继承的连接不再使用
+    store._pid = -1
+    assert store.get("k") == "report"
+    assert store._conn is not inherited
+    inherited.close()
+    store.close()
+
+
+def test_store_errors_are_misses(tmp_path):
+    path = tmp_path / "results.db"
+    path.write_bytes(b"not a database" * 100)
+    store = PersistentResultStore(str(path), 1 << 20, 3600)
+    store.put("k", "report")
+    assert store.get("k") is None
+    assert store.errors == 2
+
+
+def test_result_cache_falls_back_to_store(tmp_path):
+    store = PersistentResultStore(str(tmp_path / "results.db"), 1 << 20, 3600)
+    ResultCache(1 << 20, store=store).put("k", "report")
+    restarted = ResultCache(1 << 20, store=store)
+    assert restarted.get("k") == "report"
+    assert restarted.stats()["entries"] == 1
+    assert restarted.stats()["persistent"]["hits"] == 1
+    store.close()
@@ -0,0 +1,122 @@
+"""大文件分块分析：合并后的结果必须与整文件分析相同"""
+
+import asyncio
+import json
+
+import pytest
+
+from cpp_style import chunking
+from cpp_style.executor import AnalysisExecutor, run_task
+from cpp_style.rules import ALL_RULES
+
+LIMITS = (None, None)
+FILE_PATH = "src/widget.cpp"
+
+# 谓词窗口经常跨越分块边界：变量之后是否再次赋值、delete 之后是否置空、
+# 前面是否有 const、所在函数是否返回指针
+_SNIPPETS = (
+    "int counter{n}(int n) {{\n    int i = 0;\n    return n;\n}}\n",
+    "void reset{n}() {{\n    i = {n};\n}}\n",
+    "void drop{n}(Widget* w) {{\n    delete w;\n}}\n",
+    "void clear{n}() {{\n    w = nullptr;\n}}\n",
+    "const int k{n} = {n};\n",
+    "std::string name{n}(std::string s) {{ return s; }}\n",
+    "int* find{n}(int* p) {{\n    return p;\n}}\n",
+    "static const char* const_tag{n} = \"x\";\nchar* raw{n}(int v);\n",
+    "class Holder{n} {{\npublic:\n    int GetSize() {{ return size_; }}\n    char* data_;\n    int size_;\n}};\n",
+    "// comment {n} with int i = 0;\nvoid loop{n}(std::vector<int>& v) {{\n"
+    "    for (std::vector<int>::iterator it = v.begin(); it != v.end(); ++it) {{ *it += 1; }}\n}}\n",
+)
+
+
+def synthetic_source(count: int = 600) -> str:
+    """合成的大文件"""
+    return "".join(_SNIPPETS[(n * 7) % len(_SNIPPETS)].format(n=n) for n in range(count))
+
+
+def whole_file(tool: str, code: str, output_format: str):
+    """整文件分析的结果（与执行器中未分块的任务相同）"""
+    args = {
+        "analyze_memory_safety": (code, ALL_RULES, FILE_PATH, 0),
+        "check_const_correctness": (code, ALL_RULES, FILE_PATH, 0),
+        "suggest_modern_cpp": (code, "cpp23", ALL_RULES, FILE_PATH, 0),
+        "analyze_all": (code, FILE_PATH, "cpp23", ALL_RULES, 0),
+    }[tool]
+    return run_task(tool, (*args, output_format), LIMITS)[0]
+
+
+def chunked(tool: str, code: str, parts: int, output_format: str):
+    """按执行器的方式切分、逐块分析并合并（在当前进程中执行）"""
+    request = chunking.ChunkRequest(tool, code, ALL_RULES, "cpp23", FILE_PATH, output_format)
+    starts, views, guard = chunking.prepare(code, parts, tool == "analyze_all", FILE_PATH)
+    assert len(starts) == parts
+    outputs = []
+    for (start, end), (view_start, view_end) in zip(zip(starts, starts[1:] + [len(code)]), views):
+        outputs.append(chunking.analyze_chunk(
+            chunking.CHUNKED_TOOLS[tool], code[view_start:view_end], ALL_RULES, "cpp23", LIMITS, False,
+            (start - view_start, end - view_start),
+        ))
+    return chunking.merge(request, starts, outputs, guard, LIMITS, 0.0)[0]
+
+
+@pytest.mark.parametrize("parts", [2, 8, 40])
+def test_const_correctness_windows_across_chunk_boundaries(parts):
+    code = synthetic_source()
+    expected = whole_file("check_const_correctness", code, "json")
+    result = chunked("check_const_correctness", code, parts, "json")
+    assert result["findings"] == expected["findings"]
+    assert result["summary"] == expected["summary"]
+
+
+def test_chunk_views_end_at_split_points():
+    code = synthetic_source(200)
+    source = chunking.SourceBuffer(code)
+    points = chunking.boundaries(source)
+    starts = chunking.split_points(source, 6, points)
+    views = chunking.chunk_views(points, starts, len(code), 300)
+    for (start, end), (view_start, view_end) in zip(zip(starts, starts[1:] + [len(code)]), views):
+        assert view_start in (0, *points) and view_end in (len(code), *points)
+        assert view_start <= max(0, start - 300) and view_end >= min(len(code), end + 300)
+
+
+@pytest.mark.parametrize("tool", sorted(chunking.CHUNKED_TOOLS))
+@pytest.mark.parametrize("parts", [3, 16])
+def test_structured_results_match_whole_file(tool, parts):
+    code = synthetic_source()
+    expected = whole_file(tool, code, "json")
+    result = chunked(tool, code, parts, "json")
+    for key in ("findings", "rules", "summary", "partial"):
+        assert result[key] == expected[key], key
+
+
+@pytest.mark.parametrize("tool", sorted(chunking.CHUNKED_TOOLS))
+def test_sarif_results_match_whole_file(tool):
+    code = synthetic_source()
+    expected = json.loads(whole_file(tool, code, "sarif"))["runs"][0]
+    result = json.loads(chunked(tool, code, 8, "sarif"))["runs"][0]
+    assert result["results"] == expected["results"]
+    assert result["tool"] == expected["tool"]
+
+
+@pytest.mark.parametrize("tool", ["analyze_memory_safety", "check_const_correctness", "suggest_modern_cpp"])
+def test_markdown_reports_match_whole_file(tool):
+    code = synthetic_source()
+    expected = whole_file(tool, code, "markdown")
+    result = chunked(tool, code, 8, "markdown")
+    assert result == expected + chunking._chunk_note(list(range(8)))
+
+
+def test_executor_merges_chunks_like_whole_file():
+    code = synthetic_source()
+    args = (code, ALL_RULES, FILE_PATH, 0, "json")
+    executor = AnalysisExecutor(workers=2, chunk_bytes=len(code) // 2)
+    executor.start()
+    try:
+        result, partial, counts, _ = asyncio.run(executor.run("check_const_correctness", args, LIMITS))
+    finally:
+        executor.shutdown()
+    expected = whole_file("check_const_correctness", code, "json")
+    assert executor.chunked == 1
+    assert not partial
+    assert result["findings"] == expected["findings"]
+    assert counts == expected["summary"]["by_rule"]
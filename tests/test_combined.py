@@ -0,0 +1,73 @@
+"""综合分析：共享一次解析运行所有检查器，结果与单独调用一致，按文件类型和规则选择跳过检查器"""
+
+import pytest
+
+from cpp_style.deadline import Deadline
+from cpp_style.rules import RuleSelection
+from cpp_style.tools.combined_analyzer import get_analyzer
+from cpp_style.tools.const_checker import get_checker as get_const_checker
+from cpp_style.tools.memory_safety import get_analyzer as get_memory_analyzer
+from cpp_style.tools.modern_cpp import get_suggester as get_modern_cpp_suggester
+
+CODE = (
+    "class Widget {\n"
+    "public:\n"
+    "    int get_size() { return size_; }\n"
+    "    void process(std::string name);\n"
+    "private:\n"
+    "    int size_ = 0;\n"
+    "};\n"
+    "void f() {\n"
+    "    int* p = new int;\n"
+    "    Widget* w = NULL;\n"
+    "    delete p;\n"
+    "}\n"
+)
+
+
+def test_results_match_individual_checkers():
+    results, report = get_analyzer().analyze_all(CODE, "include/widget.h", "cpp20")
+    assert list(results) == ["memory_safety", "const_correctness", "modern_cpp", "include_guard"]
+    assert results["memory_safety"]["issues"] == get_memory_analyzer().analyze_memory_safety(CODE)[0]
+    assert results["const_correctness"]["issues"] == get_const_checker().check_const_correctness(CODE)[0]
+    assert results["modern_cpp"]["issues"] == get_modern_cpp_suggester().suggest_modern_cpp(CODE, "cpp20")[0]
+    assert [issue["rule"] for issue in results["include_guard"]["issues"]] == ["include-guard-missing"]
+    assert report.startswith("# 📋 C++ 综合分析报告")
+    # 子报告的标题降一级，嵌套在各自的章节下
+    assert "\n## 内存安全\n\n## " in report
+
+
+@pytest.mark.parametrize("file_path,skipped", [
+    ("src/widget.cpp", True),
+    ("src/widget.CC", True),
+    ("include/widget.hpp", False),
+    (None, False),
+])
+def test_include_guard_skipped_for_source_files(file_path, skipped):
+    results, _ = get_analyzer().analyze_all(CODE, file_path, render=False)
+    assert results["include_guard"].get("skipped", False) == skipped
+
+
+def test_selection_skips_checkers_without_rules():
+    results, report = get_analyzer().analyze_all(CODE, "include/widget.h", selection=RuleSelection.of(["mem-*"]))
+    assert not results["memory_safety"].get("skipped")
+    for name in ("const_correctness", "modern_cpp", "include_guard"):
+        assert results[name]["skipped"]
+        assert results[name]["issues"] == []
+    assert "| const 正确性 | 跳过 |" in report
+
+
+def test_render_false_returns_issues_only():
+    results, report = get_analyzer().analyze_all(CODE, render=False)
+    assert report == ""
+    assert all(result["report"] == "" for name, result in results.items() if name != "include_guard")
+    assert results["memory_safety"]["issues"]
+
+
+def test_expired_deadline_marks_partial_results():
+    deadline = Deadline(1.0, expires=0.0)
+    results, report = get_analyzer().analyze_all(CODE, deadline=deadline)
+    assert results["memory_safety"]["partial"]
+    assert results["memory_safety"]["issues"] == []
+    assert results["include_guard"]["skipped"]
+    assert "部分结果" in report
@@ -0,0 +1,87 @@
+"""紧凑报告：按规则汇总、严重程度排序、位置数和长度上限，以及 json 格式的每规则截断"""
+
+from cpp_style import compact
+from cpp_style.deadline import Deadline
+from cpp_style.output import FindingSet, rule_findings, structured
+from cpp_style.tools.memory_safety import get_analyzer
+
+CODE = "".join(f"int* p{i} = new int;\n" for i in range(8)) + "char* s = (char*)malloc(8);\nint a[4];\n"
+
+
+def memory_findings(code=CODE):
+    issues, _ = get_analyzer().analyze_memory_safety(code, render=False)
+    return rule_findings("memory_safety", issues)
+
+
+def synthetic_findings(rules, per_rule, width):
+    """rules 条规则各 per_rule 个问题，代码片段长 width 个字符"""
+    findings = FindingSet()
+    for r in range(rules):
+        findings.add_rule_issues("memory_safety", [
+            {
+                "rule": f"synthetic-{r}", "severity": "warning", "message": f"问题 {r}",
+                "line": i + 1, "column": 1, "end_line": i + 1, "end_column": width + 1, "location": "x" * width,
+            }
+            for i in range(per_rule)
+        ])
+    return findings
+
+
+def test_findings_grouped_per_rule():
+    report = compact.render("analyze_memory_safety", memory_findings(), max_issues=3)
+    assert report.startswith("# 📋 内存安全分析报告（紧凑模式）")
+    assert report.count("`mem-raw-new`") == 1
+    assert "— 8 处" in report
+    assert "- 第 1 行 `new int`" in report
+    assert "- 第 3 行 `new int`" in report
+    assert "第 4 行 `new int`" not in report
+    assert "- …另有 5 处" in report
+
+
+def test_rules_ordered_by_severity():
+    report = compact.render("analyze_memory_safety", memory_findings())
+    positions = [report.index(f"`{rule_id}`") for rule_id in ("mem-c-allocation", "mem-raw-new", "mem-c-array")]
+    assert positions == sorted(positions)
+
+
+def test_no_findings():
+    report = compact.render("analyze_memory_safety", FindingSet())
+    assert "未发现问题" in report
+    assert "###" not in report
+
+
+def test_report_is_capped():
+    findings = synthetic_findings(rules=200, per_rule=5, width=60)
+    report = compact.render("analyze_memory_safety", findings)
+    assert len(report.encode()) <= compact.COMPACT_LIMIT_BYTES
+    kept = report.count("### ")
+    assert 0 < kept < 200
+    assert f"其余 {200 - kept} 条规则的 {(200 - kept) * 5} 个问题已省略" in report
+    # 规则整项省略，不会截断到一半
+    assert report.count("- 第 ") == kept * 5
+
+
+def test_long_snippets_are_shortened():
+    report = compact.render("analyze_memory_safety", synthetic_findings(rules=1, per_rule=1, width=500))
+    assert "x" * 200 not in report
+    assert "x" * 79 + "…" in report
+
+
+def test_partial_notice_is_kept():
+    deadline = Deadline(1.0)
+    deadline.skip(["mem-c-free"])
+    report = compact.render("analyze_memory_safety", memory_findings(), deadline=deadline)
+    assert "`mem-c-free`" in report
+
+
+def test_structured_keeps_max_per_rule():
+    findings = memory_findings()
+    result = structured("analyze_memory_safety", findings, max_per_rule=2)
+    assert result["summary"]["total"] == len(findings.items)
+    assert result["summary"]["by_rule"]["mem-raw-new"] == 8
+    assert [finding["rule"] for finding in result["findings"]].count("mem-raw-new") == 2
+    assert result["omitted"]["mem-raw-new"] == 6
+    assert result["omitted"] == {
+        rule_id: count - 2 for rule_id, count in result["summary"]["by_rule"].items() if count > 2
+    }
+    assert "omitted" not in structured("analyze_memory_safety", findings)
@@ -0,0 +1,133 @@
+"""数据集存储：每个数据集只加载一次、只读视图和汇总哈希；数据快照：生成、加载和指纹失效"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from types import MappingProxyType
+
+import pytest
+
+from cpp_style.data import DATA_DIR, DataStore, freeze, get_store, snapshot
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """数据集目录的副本（修改其中的 JSON 不影响包内的数据）"""
+    target = tmp_path / "data"
+    target.mkdir()
+    for path in DATA_DIR.glob("*.json"):
+        shutil.copy2(path, target / path.name)
+    return target
+
+
+def test_freeze_makes_read_only_views():
+    frozen = freeze({"a": [1, {"b": [2]}]})
+    assert isinstance(frozen, MappingProxyType)
+    assert frozen["a"] == (1, MappingProxyType({"b": (2,)}))
+    with pytest.raises(TypeError):
+        frozen["a"] = ()
+
+
+def test_dataset_loaded_once(data_dir):
+    store = DataStore(data_dir)
+    first = store.load("naming_conventions")
+    (data_dir / "naming_conventions.json").write_text("{}")
+    assert store.load("naming_conventions") is first
+    assert list(store.loaded()) == ["naming_conventions"]
+
+
+def test_dataset_records_hash_and_size(data_dir):
+    dataset = DataStore(data_dir).dataset("cpp_standards")
+    raw = (data_dir / "cpp_standards.json").read_bytes()
+    assert dataset.size == len(raw)
+    assert dataset.content == freeze(json.loads(raw))
+
+
+def test_names_and_missing_dataset(data_dir):
+    store = DataStore(data_dir)
+    assert store.names("rules_") == ["rules_const_correctness", "rules_memory_safety", "rules_modern_cpp"]
+    assert "best_practices" in store.names()
+    with pytest.raises(FileNotFoundError):
+        store.load("missing")
+
+
+def test_digest_follows_data(data_dir):
+    digest = DataStore(data_dir).digest()
+    assert digest == get_store().digest()
+    path = data_dir / "best_practices.json"
+    data = json.loads(path.read_text())
+    path.write_text(json.dumps(data, ensure_ascii=False))
+    assert DataStore(data_dir).digest() != digest
+
+
+# ==================== 数据快照 ====================
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    """包目录的副本（保留大小和修改时间），快照的指纹按副本计算"""
+    target = tmp_path / "cpp_style"
+    shutil.copytree(snapshot._PACKAGE_DIR, target, ignore=shutil.ignore_patterns("__pycache__", "*.pickle"))
+    monkeypatch.setattr(snapshot, "_PACKAGE_DIR", target)
+    return target
+
+
+@pytest.fixture(scope="module")
+def built(tmp_path_factory):
+    """在新进程中生成的快照文件"""
+    path = tmp_path_factory.mktemp("snapshot") / "snapshot.pickle"
+    subprocess.run(
+        [sys.executable, "-m", "cpp_style.data"], check=True, capture_output=True,
+        env={**os.environ, "CPP_STYLE_SNAPSHOT": str(path)}, cwd=Path(__file__).resolve().parent.parent,
+    )
+    return path
+
+
+def test_snapshot_round_trip(package, built):
+    loaded = snapshot.load(built)
+    assert loaded is not None
+    assert set(loaded.datasets) == set(DataStore().names())
+    assert set(loaded.documents) == set(snapshot.RESOURCES)
+    assert loaded.rule_ids["memory_safety"][0] == "mem-raw-new"
+
+    store = DataStore(package / "data", loaded)
+    assert store.digest() == DataStore(package / "data").digest()
+    assert store.load("cpp_standards") == DataStore(package / "data").load("cpp_standards")
+
+
+@pytest.mark.parametrize("change", ["data/best_practices.json", "rules.py", "resources/best_practices.py"])
+def test_changed_input_makes_snapshot_stale(package, built, change, caplog):
+    path = package / change
+    path.write_bytes(path.read_bytes() + b"\n")
+    assert snapshot.load(built) is None
+    assert "已过期" in caplog.text
+
+
+def test_touched_input_makes_snapshot_stale(package, built):
+    path = package / "data" / "cpp_standards.json"
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert snapshot.load(built) is None
+
+
+def test_new_version_makes_snapshot_stale(package, built, monkeypatch):
+    monkeypatch.setattr(snapshot, "__version__", "0.0.0")
+    assert snapshot.load(built) is None
+
+
+def test_missing_or_corrupt_snapshot(package, tmp_path):
+    assert snapshot.load(tmp_path / "missing.pickle") is None
+    corrupt = tmp_path / "corrupt.pickle"
+    corrupt.write_bytes(b"not a pickle")
+    assert snapshot.load(corrupt) is None
+
+
+def test_stale_snapshot_falls_back_to_json(package, built):
+    path = package / "data" / "best_practices.json"
+    data = json.loads(path.read_text())
+    path.write_text(json.dumps(data, ensure_ascii=False))
+    store = DataStore(package / "data", snapshot.load(built))
+    assert store.snapshot is None
+    assert store.dataset("best_practices").size == path.stat().st_size
@@ -0,0 +1,72 @@
+"""预渲染的资源文档：每个资源的文档只渲染一次、不可修改，快照中的文档与渲染结果相同"""
+
+import importlib
+
+import pytest
+
+from cpp_style.data import snapshot
+from cpp_style.resources import documents
+from cpp_style.resources.documents import OVERVIEW, Document, DocumentSet, load_documents, render_documents
+
+
+def fresh_resource(name, monkeypatch):
+    """不使用数据快照、重新构建的资源"""
+    monkeypatch.setattr(documents, "get_snapshot", lambda: None)
+    module = importlib.import_module(f"cpp_style.resources.{name}")
+    return type(module.get_resource())()
+
+
+def test_document_set_is_read_only():
+    docs = DocumentSet({"a": "text"})
+    assert docs["a"] == Document("text")
+    assert list(docs) == ["a"] and len(docs) == 1
+    with pytest.raises(TypeError):
+        docs["b"] = Document("other")
+    with pytest.raises(TypeError):
+        docs._documents["b"] = Document("other")
+
+
+def test_render_documents_adds_overview():
+    calls = []
+
+    def render(key):
+        calls.append(key)
+        return key.upper()
+
+    docs = render_documents(("x", "y"), render, lambda: "overview")
+    assert {key: doc.text for key, doc in docs.items()} == {"x": "X", "y": "Y", OVERVIEW: "overview"}
+    assert calls == ["x", "y"]
+
+
+def test_load_documents_prefers_snapshot(monkeypatch):
+    cached = snapshot.Snapshot({}, {"naming_rules": {OVERVIEW: "from snapshot"}}, {}, 0.0)
+    monkeypatch.setattr(documents, "get_snapshot", lambda: cached)
+    assert load_documents("naming_rules", lambda: pytest.fail("不应渲染"))[OVERVIEW].text == "from snapshot"
+    assert load_documents("best_practices", lambda: DocumentSet({OVERVIEW: "rendered"}))[OVERVIEW].text == "rendered"
+
+
+@pytest.mark.parametrize("name", snapshot.RESOURCES)
+def test_documents_rendered_once(name, monkeypatch):
+    resource = fresh_resource(name, monkeypatch)
+    docs = resource.documents
+    assert resource.documents is docs
+    assert OVERVIEW in docs
+    assert all(doc.text.strip() for doc in docs.values())
+
+
+@pytest.mark.parametrize("name", snapshot.RESOURCES)
+def test_snapshot_documents_match_rendering(name, monkeypatch):
+    loaded = snapshot.get_snapshot()
+    if loaded is None:
+        pytest.skip("没有可用的数据快照")
+    rendered = {key: doc.text for key, doc in fresh_resource(name, monkeypatch).documents.items()}
+    assert loaded.documents[name] == rendered
+
+
+def test_unknown_key_lists_available_topics(monkeypatch):
+    resource = fresh_resource("best_practices", monkeypatch)
+    text = resource.get_best_practice("nope")
+    assert text.startswith("未知的主题: nope")
+    assert "memory" in text
+    assert resource.get_best_practice("memory") == resource.documents["memory"].text
+    assert resource.get_all_topics() == resource.documents[OVERVIEW].text
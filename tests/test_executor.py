@@ -0,0 +1,260 @@
+"""执行器：准入控制，请求截止时间从到达时开始计算（排队等待准入和工作进程的时间都计入），进度通知，进程池重建"""
+
+import asyncio
+import os
+import signal
+import time
+
+import pytest
+
+from cpp_style.deadline import Deadline
+from cpp_style.executor import AdmissionControl, AnalysisExecutor, ProgressStream, ServerBusy, describe_findings
+from cpp_style.rules import ALL_RULES, get_registry
+
+CODE = "void f() {\n    int* p = new int;\n    delete p;\n}\n"
+ARGS = (CODE, ALL_RULES, "src/widget.cpp", 0, "json")
+
+
+def test_admission_bounds_concurrency_and_queue():
+    admission = AdmissionControl(max_in_flight=2, max_queue=1)
+    order = []
+    release = None
+
+    async def request(name):
+        async with admission.slot():
+            order.append(name)
+            await release.wait()
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        running = [asyncio.create_task(request(name)) for name in ("a", "b", "c")]
+        await asyncio.sleep(0.01)
+        assert (admission.in_flight, admission.queued) == (2, 1)
+        # 排队已满：新请求立即失败，不再等待
+        with pytest.raises(ServerBusy, match="服务器繁忙"):
+            async with admission.slot():
+                pass
+        release.set()
+        await asyncio.gather(*running)
+
+    asyncio.run(scenario())
+    assert order == ["a", "b", "c"]
+    stats = admission.stats()
+    assert (stats["in_flight"], stats["queued"], stats["peak_queued"]) == (0, 0, 1)
+    assert (stats["admitted"], stats["rejected"]) == (3, 1)
+    assert stats["wait_max_ms"] > 0
+
+
+def test_admission_without_queue_rejects_when_full():
+    admission = AdmissionControl(max_in_flight=1, max_queue=0)
+
+    async def scenario():
+        async with admission.slot():
+            with pytest.raises(ServerBusy):
+                async with admission.slot():
+                    pass
+        async with admission.slot():
+            pass
+
+    asyncio.run(scenario())
+    assert (admission.admitted, admission.rejected) == (2, 1)
+
+
+def test_cancelled_waiter_leaves_queue():
+    admission = AdmissionControl(max_in_flight=1, max_queue=1)
+
+    async def wait_for_slot():
+        async with admission.slot():
+            pass
+
+    async def scenario():
+        async with admission.slot():
+            waiter = asyncio.create_task(wait_for_slot())
+            await asyncio.sleep(0.01)
+            assert admission.queued == 1
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            assert admission.queued == 0
+        async with admission.slot():
+            pass
+
+    asyncio.run(scenario())
+    assert admission.in_flight == 0
+
+def test_deadline_from_absolute_expiry():
+    assert Deadline(2.0).expires is not None
+    assert Deadline(None).expires is None
+    # 截止时刻在别处算出（请求到达时）：已经过去时立即到期，total 只用于说明
+    deadline = Deadline(2.0, expires=time.monotonic() - 1.0)
+    assert deadline.expired
+    assert deadline.total == 2.0
+
+
+def test_admission_wait_counts_toward_deadline():
+    async def scenario():
+        executor = AnalysisExecutor(workers=0, max_in_flight=1)
+        async with executor.admission.slot():
+            queued = asyncio.create_task(executor.run("analyze_memory_safety", ARGS, (0.05, None)))
+            await asyncio.sleep(0.1)
+        return await queued
+
+    result, partial, counts, _ = asyncio.run(scenario())
+    assert partial
+    assert result["summary"]["total"] == 0
+    assert not counts
+
+
+def test_deadline_not_reached_without_wait():
+    executor = AnalysisExecutor(workers=0, max_in_flight=1)
+    _, partial, counts, _ = asyncio.run(executor.run("analyze_memory_safety", ARGS, (5.0, None)))
+    assert not partial
+    assert counts
+
+
+def test_pool_wait_counts_toward_deadline():
+    async def scenario(executor):
+        # 唯一的工作进程正忙，请求在进程池中排队，轮到它时截止时间已过
+        busy = executor._pool.submit(time.sleep, 0.5)
+        result = await executor.run("analyze_memory_safety", ARGS, (0.2, None))
+        busy.result()
+        return result
+
+    executor = AnalysisExecutor(workers=1, max_in_flight=2)
+    executor.start()
+    try:
+        result, partial, counts, _ = asyncio.run(scenario(executor))
+        assert partial
+        assert result["summary"]["total"] == 0
+        # 工作进程空闲时同样的请求在截止时间内完成
+        _, partial, counts, _ = asyncio.run(executor.run("analyze_memory_safety", ARGS, (5.0, None)))
+        assert not partial
+        assert counts
+    finally:
+        executor.shutdown()
+
+
+def test_restart_does_not_block_event_loop():
+    async def report(done, total, message):
+        pass
+
+    async def scenario(executor):
+        await executor.run("analyze_memory_safety", ARGS, (None, None), progress=report)
+        old_reader, old_queue = executor._reader, executor._progress_queue
+        assert old_reader is not None and old_reader.is_alive()
+        # 模拟工作进程退出时正持有进度队列的写锁：结束标记发不出去，停止读取线程要等满超时
+        old_queue._wlock.acquire()
+        os.kill(executor.worker_pids()[0], signal.SIGKILL)
+        await asyncio.sleep(0.3)
+
+        gaps = []
+
+        async def ticker():
+            last = time.monotonic()
+            while True:
+                await asyncio.sleep(0.01)
+                now = time.monotonic()
+                gaps.append(now - last)
+                last = now
+
+        ticking = asyncio.create_task(ticker())
+        await asyncio.sleep(0.05)
+        with pytest.raises(RuntimeError):
+            await executor.run("analyze_memory_safety", ARGS, (None, None))
+        await asyncio.sleep(0.05)
+        ticking.cancel()
+        assert max(gaps) < 0.5
+        assert executor.restarts == 1
+        assert executor._reader is None
+
+        _, partial, counts, _ = await executor.run("analyze_memory_safety", ARGS, (None, None), progress=report)
+        assert not partial and counts
+        assert executor._reader is not old_reader
+        old_queue._wlock.release()
+        old_reader.join(timeout=2.0)
+        assert not old_reader.is_alive()
+
+    executor = AnalysisExecutor(workers=1)
+    executor.start()
+    try:
+        asyncio.run(scenario(executor))
+    finally:
+        executor.shutdown()
+
+
+# ==================== 进度通知 ====================
+
+def run_with_progress(executor):
+    events = []
+
+    async def report(done, total, message):
+        events.append((done, total, message))
+
+    result = asyncio.run(executor.run("analyze_memory_safety", ARGS, (None, None), progress=report))
+    return result, events
+
+
+def check_progress(events):
+    rule_ids = [rule.id for rule in get_registry().for_checker("memory_safety")]
+    assert [done for done, _, _ in events] == list(range(1, len(rule_ids) + 2))
+    assert {total for _, total, _ in events} == {len(rule_ids) + 1}
+    assert [message.split(":")[0] for _, _, message in events[:-1]] == rule_ids
+    assert events[-1][2] == "分析完成，完整报告见工具结果"
+
+
+def test_progress_per_rule_in_process():
+    (_, partial, counts, _), events = run_with_progress(AnalysisExecutor(workers=0))
+    assert not partial
+    check_progress(events)
+    new = next(message for _, _, message in events if message.startswith("mem-raw-new"))
+    assert new.startswith(f"mem-raw-new: {counts['mem-raw-new']} 项\n- 第 2 行 [warning] mem-raw-new:")
+
+
+def test_progress_per_rule_in_pool():
+    executor = AnalysisExecutor(workers=1)
+    executor.start()
+    try:
+        _, events = run_with_progress(executor)
+    finally:
+        executor.shutdown()
+    check_progress(events)
+
+
+def test_failed_progress_does_not_fail_analysis():
+    async def broken(done, total, message):
+        raise ConnectionError("client gone")
+
+    _, partial, counts, _ = asyncio.run(
+        AnalysisExecutor(workers=0).run("analyze_memory_safety", ARGS, (None, None), progress=broken))
+    assert not partial and counts
+
+
+def test_finish_fills_skipped_steps():
+    events = []
+
+    async def report(done, total, message):
+        events.append((done, total))
+
+    async def scenario():
+        stream = ProgressStream(report)
+        stream.expect(5)
+        await stream.send("first")
+        await stream.finish("done")
+
+    asyncio.run(scenario())
+    assert events == [(1, 6), (6, 6)]
+
+
+def test_describe_findings():
+    findings = [
+        {"rule": "mem-raw-new", "severity": "warning", "message": f"new {i}", "line": i + 1}
+        for i in range(5)
+    ] + [{"rule": "modern-auto", "feature": "auto"}]
+    assert describe_findings("mem-raw-new", []) == "mem-raw-new: 未发现问题"
+    lines = describe_findings("块 2", findings, line_offset=100).split("\n")
+    assert lines[0] == "块 2: 6 项"
+    assert lines[1] == "- 第 101 行 [warning] mem-raw-new: new 0"
+    assert len(lines) == 7
+    assert lines[-1] == "- …… 另有 1 项"
+    assert describe_findings("x", findings[-1:]).endswith("- 整体 [info] modern-auto: auto")
@@ -0,0 +1,92 @@
+"""声明标识符提取：按作用域推断类别，跳过注释和字符串，提取结果交给命名检查"""
+
+from cpp_style.tools.identifier_extractor import get_extractor
+
+CODE = '''#define MAX_SIZE 10
+namespace my_lib {
+template <typename T, int N>
+class RingBuffer {
+public:
+    static const int kCapacity = 4;
+    void push_back(const T& value);
+    int size() const { int count = 0; return count; }
+private:
+    T items_[N];
+    int head_, tail_;
+};
+enum class Color { kRed, kGreen };
+struct point { double x, y; };
+using Name = std::string;
+int globalCount = 0;
+void doWork(int inputValue, char* out) {
+    for (int i = 0; i < 3; ++i) {}
+    auto result = compute(inputValue);
+    // int commented_out;
+    const char* s = "int in_string;";
+    return;
+}
+}
+'''
+
+# (名称, 类别, 行, 列)，按出现顺序
+DECLARATIONS = [
+    ("MAX_SIZE", "constant", 1, 1),
+    ("my_lib", "namespace", 2, 11),
+    ("T", "template_parameter", 3, 20),
+    ("N", "template_parameter", 3, 27),
+    ("RingBuffer", "class", 4, 7),
+    ("kCapacity", "constant", 6, 22),
+    ("push_back", "function", 7, 10),
+    ("value", "variable", 7, 29),
+    ("size", "function", 8, 9),
+    ("count", "variable", 8, 28),
+    ("items_", "member_variable", 10, 7),
+    ("head_", "member_variable", 11, 9),
+    ("tail_", "member_variable", 11, 16),
+    ("Color", "class", 13, 12),
+    ("kRed", "constant", 13, 20),
+    ("kGreen", "constant", 13, 26),
+    ("point", "class", 14, 8),
+    ("x", "member_variable", 14, 23),
+    ("y", "member_variable", 14, 26),
+    ("Name", "class", 15, 7),
+    ("globalCount", "variable", 16, 5),
+    ("doWork", "function", 17, 6),
+    ("inputValue", "variable", 17, 17),
+    ("out", "variable", 17, 35),
+    ("i", "variable", 18, 14),
+    ("result", "variable", 19, 10),
+    ("s", "variable", 21, 17),
+]
+
+
+def test_declarations():
+    found = get_extractor().extract(CODE)
+    assert [(d["name"], d["category"], d["line"], d["column"]) for d in found] == DECLARATIONS
+
+
+def test_repeated_declarations_kept_once():
+    found = get_extractor().extract("void f() { int n = 0; }\nvoid g() { int n = 1; }\n")
+    assert [(d["name"], d["line"]) for d in found] == [("f", 1), ("n", 1), ("g", 2)]
+
+
+def test_check_code_naming_reports_failures_with_positions():
+    issues, report = get_extractor().check_code_naming(CODE)
+    assert [(issue["identifier"], issue["category"], issue["line"]) for issue in issues] == [
+        ("point", "class", 14),
+        ("x", "member_variable", 14),
+        ("y", "member_variable", 14),
+        ("globalCount", "variable", 16),
+        ("doWork", "function", 17),
+        ("inputValue", "variable", 17),
+    ]
+    assert f"**提取声明**: {len(DECLARATIONS)} 个" in report
+    assert "| 16 | `globalCount` | variable |" in report
+    assert "global_count" in report
+
+
+def test_clean_code():
+    issues, report = get_extractor().check_code_naming("int item_count = 0;\nvoid run_once();\n")
+    assert issues == []
+    assert "所有声明都符合命名规范" in report
+    assert get_extractor().check_code_naming("int itemCount;\n", render=False)[1] == ""
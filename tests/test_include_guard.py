@@ -0,0 +1,53 @@
+"""包含保护检查：#pragma once 与 #ifndef/#define/#endif，含缩进和注释的写法"""
+
+import pytest
+
+from cpp_style.tools.include_guard_checker import get_checker
+
+FILE_PATH = "include/widget.h"
+
+
+@pytest.mark.parametrize("code", [
+    "#pragma once\n\nint x;\n",
+    "  #pragma once\nint x;\nint y;\n",
+    "// widget\n\t#  pragma   once  // guard\nint x;\n",
+    "#ifndef WIDGET_H\n#define WIDGET_H\nint x;\n#endif\n",
+    "#ifndef WIDGET_H\n#define WIDGET_H\nint x;\n  #endif\n",
+    "  #ifndef WIDGET_H\n  #define WIDGET_H\nint x;\n  #endif  // WIDGET_H\n",
+    "/* header */\n#ifndef WIDGET_H  // guard\n/* between */\n#define WIDGET_H\nint x;\n#endif /* WIDGET_H */\n",
+    "int a;\n\n   \n#ifndef WIDGET_H\n\t#define WIDGET_H\nint x;\n\t#endif\n",
+])
+def test_guarded(code):
+    is_valid, details, _ = get_checker().check_include_guard(code, FILE_PATH)
+    assert is_valid, details
+    assert details.startswith("✓")
+
+
+@pytest.mark.parametrize("code", [
+    "int x;\nint y;\nint z;\n",
+    "// #pragma once\nint x;\nint y;\n",
+    'const char* s = "#pragma once";\nint x;\nint y;\n',
+    "#ifndef WIDGET_H\n#define OTHER_H\nint x;\n#endif\n",
+    "#ifndef WIDGET_H\nint x;\n#define WIDGET_H\n#endif\n",
+    "#ifndef WIDGET_H\n#define WIDGET_H\n#endif\nint x;\n",
+    "#ifndef WIDGET_H\n#define WIDGET_H\nint x;\n// #endif\n",
+])
+def test_unguarded(code):
+    is_valid, details, suggestions = get_checker().check_include_guard(code, FILE_PATH)
+    assert not is_valid
+    assert details.startswith("✗ 缺少包含保护")
+    assert suggestions[0] == "WIDGET_H"
+
+
+def test_too_short():
+    is_valid, details, suggestions = get_checker().check_include_guard("#pragma once\n", FILE_PATH)
+    assert not is_valid
+    assert suggestions == []
+
+
+def test_guard_name_suggestions():
+    code = "#ifndef _WIDGET\n#define _WIDGET\nint x;\n#endif\n"
+    is_valid, details, suggestions = get_checker().check_include_guard(code, "src/ui/widget.hpp")
+    assert is_valid
+    assert "命名检查: ✗" in details
+    assert suggestions == ["WIDGET_H", "WIDGET_HPP", "UI_WIDGET_H"]
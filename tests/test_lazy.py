@@ -0,0 +1,44 @@
+"""按需加载：目标模块在第一次调用时才导入，服务器导入时不加载检查器、资源和提示模板"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from cpp_style import lazy
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_target_imported_on_first_call(tmp_path, monkeypatch):
+    (tmp_path / "lazy_target.py").write_text(
+        "IMPORTS = []\nIMPORTS.append(1)\n\ndef get_value(x):\n    return x * 2\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "lazy_target", raising=False)
+
+    loader = lazy.lazy("lazy_target:get_value")
+    assert loader.module == "lazy_target"
+    assert "lazy_target" not in sys.modules
+    assert "lazy_target:get_value" not in lazy.loaded()
+
+    assert loader(21) == 42
+    assert loader(1) == 2
+    assert sys.modules["lazy_target"].IMPORTS == [1]
+    assert lazy.loaded()["lazy_target:get_value"] >= 0
+
+
+def test_server_import_defers_checkers():
+    script = (
+        "import json, sys, cpp_style_server\n"
+        "from cpp_style import rules\n"
+        "print(json.dumps({'modules': sorted(m for m in sys.modules if m.startswith('cpp_style')),"
+        " 'registry': rules._registry is not None}))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", script], cwd=ROOT, check=True, capture_output=True, text=True,
+    )
+    state = json.loads(result.stdout.strip().splitlines()[-1])
+    for prefix in ("cpp_style.tools", "cpp_style.resources", "cpp_style.prompts"):
+        assert not [module for module in state["modules"] if module.startswith(prefix)], prefix
+    assert not state["registry"]
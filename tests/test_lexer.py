@@ -0,0 +1,111 @@
+"""词法分析器：注释、字面量、续行和预处理指令的识别，以及纯代码视图"""
+
+import pytest
+
+from cpp_style.lexer import (
+    CHAR, COMMENT, IDENTIFIER, KIND_NAMES, NUMBER, PREPROCESSOR, PUNCT, STRING,
+    mask_code, parse_directive, tokenize,
+)
+
+
+def kinds_and_texts(text: str):
+    return [(KIND_NAMES[token.kind], token.text) for token in tokenize(text)]
+
+
+def test_basic_tokens():
+    assert kinds_and_texts("std::vector<int> v = {1, 0x1F, 1'000};") == [
+        ("identifier", "std"), ("punct", "::"), ("identifier", "vector"), ("punct", "<"),
+        ("identifier", "int"), ("punct", ">"), ("identifier", "v"), ("punct", "="), ("punct", "{"),
+        ("number", "1"), ("punct", ","), ("number", "0x1F"), ("punct", ","), ("number", "1'000"),
+        ("punct", "}"), ("punct", ";"),
+    ]
+
+
+def test_comments_and_strings_are_masked():
+    code = 'int* p = new int; // delete p\n/* malloc(\n 4) */ char c = \'x\'; auto s = "new int";\n'
+    masked = mask_code(tokenize(code))
+    assert len(masked) == len(code)
+    assert masked.count('\n') == code.count('\n')
+    assert "new int;" in masked
+    assert "delete" not in masked
+    assert "malloc" not in masked
+    assert '"       "' in masked
+    assert "' '" in masked
+
+
+def test_string_prefixes_keep_their_quotes():
+    code = 'auto a = u8"x"; auto b = L\'y\';'
+    stream = tokenize(code)
+    assert [token.text for token in stream if token.kind in (STRING, CHAR)] == ['u8"x"', "L'y'"]
+    assert mask_code(stream) == 'auto a = u8" "; auto b = L\' \';'
+
+
+def test_raw_strings():
+    code = 'auto r = R"sql(SELECT ")" /* not a comment */\nnew int)sql"; int x;'
+    stream = tokenize(code)
+    raw = [token for token in stream if token.kind == STRING]
+    assert len(raw) == 1
+    assert raw[0].text.startswith('R"sql(') and raw[0].text.endswith(')sql"')
+    assert COMMENT not in stream.kinds
+    masked = mask_code(stream)
+    assert "new int" not in masked
+    assert masked.endswith('"; int x;')
+
+
+def test_line_comment_continuation():
+    code = "// comment \\\ndelete p;\nint x;\n"
+    stream = tokenize(code)
+    assert stream[0].kind == COMMENT
+    assert stream[0].text == "// comment \\\ndelete p;"
+    assert "delete" not in mask_code(stream)
+
+
+def test_directive_continuation():
+    code = "#define RELEASE(p) \\\n    delete p; \\\n    p = nullptr\nint x;\n"
+    stream = tokenize(code)
+    assert stream[0].kind == PREPROCESSOR
+    assert stream[0].text.endswith("p = nullptr")
+    assert [(token.kind, token.text) for token in list(stream)[1:]] == [
+        (IDENTIFIER, "int"), (IDENTIFIER, "x"), (PUNCT, ";"),
+    ]
+    masked = mask_code(stream)
+    assert "delete" not in masked
+    assert masked.count('\n') == code.count('\n')
+
+
+@pytest.mark.parametrize("directive", [
+    "  #define F(p) delete p",
+    "\t#include <memory>",
+    "    #  endif  // GUARD",
+    "  #pragma once",
+])
+def test_indented_directives(directive):
+    code = f"int a;\n{directive}\nint b;\n"
+    stream = tokenize(code)
+    directives = [token.text for token in stream if token.kind == PREPROCESSOR]
+    assert directives == [directive]
+    masked = mask_code(stream)
+    assert masked.splitlines()[1].strip() == ""
+
+
+def test_indented_directive_after_blank_lines():
+    stream = tokenize("int a;\n\n   \n  #endif\n")
+    assert [token.text for token in stream if token.kind == PREPROCESSOR] == ["  #endif"]
+
+
+def test_hash_inside_a_line_is_not_a_directive():
+    stream = tokenize("int a = b # c;\n")
+    assert PREPROCESSOR not in stream.kinds
+    assert NUMBER not in stream.kinds
+
+
+@pytest.mark.parametrize("directive,expected", [
+    ("#ifndef FOO_H  // guard", ("ifndef", "FOO_H")),
+    ("  #  define FOO_H /* x */", ("define", "FOO_H")),
+    ("#define F(a) \\\n  (a)", ("define", "F(a)    (a)")),
+    ("#endif", ("endif", "")),
+    ("#", ("", "")),
+    ("not a directive", ("", "")),
+])
+def test_parse_directive(directive, expected):
+    assert parse_directive(directive) == expected
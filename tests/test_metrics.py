@@ -0,0 +1,123 @@
+"""Prometheus 指标：请求计数、耗时和输入大小直方图、规则问题数、抓取时的回调和 suppress"""
+
+import asyncio
+import inspect
+import os
+
+import pytest
+
+from cpp_style.metrics import LATENCY_BUCKETS, Histogram, Metrics, resident_memory_bytes
+
+
+def parse(text):
+    """样本行 -> 值（跳过 HELP 和 TYPE）"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = value
+    return samples
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((1.0, 2.0))
+    for value in (0.5, 1.0, 1.5, 3.0):
+        histogram.observe(("t",), value)
+    assert list(histogram.samples(("handler",))) == [
+        ("_bucket", {"handler": "t", "le": "1"}, 2),
+        ("_bucket", {"handler": "t", "le": "2"}, 3),
+        ("_bucket", {"handler": "t", "le": "+Inf"}, 4),
+        ("_sum", {"handler": "t"}, 6.0),
+        ("_count", {"handler": "t"}, 4),
+    ]
+
+
+def test_instrument_counts_requests_and_input_size():
+    metrics = Metrics()
+
+    @metrics.instrument("tool")
+    def check(code: str, strict: bool = False) -> str:
+        """检查代码"""
+        if strict:
+            raise ValueError("strict")
+        return "ok"
+
+    assert check("x" * 300) == "ok"
+    check(code="y")
+    with pytest.raises(ValueError):
+        check("z", strict=True)
+    assert list(inspect.signature(check).parameters) == ["code", "strict"]
+    assert check.__doc__ == "检查代码"
+
+    samples = parse(metrics.render())
+    assert samples['cpp_style_requests_total{handler="check",kind="tool",status="ok"}'] == "2"
+    assert samples['cpp_style_requests_total{handler="check",kind="tool",status="error"}'] == "1"
+    assert samples['cpp_style_request_duration_seconds_count{handler="check",kind="tool"}'] == "3"
+    assert samples['cpp_style_request_duration_seconds_bucket{handler="check",kind="tool",le="+Inf"}'] == "3"
+    assert len([name for name in samples if name.startswith("cpp_style_request_duration_seconds_bucket")]) == (
+        len(LATENCY_BUCKETS) + 1
+    )
+    assert samples['cpp_style_input_chars_bucket{handler="check",le="256"}'] == "2"
+    assert samples['cpp_style_input_chars_bucket{handler="check",le="1024"}'] == "3"
+
+
+def test_instrument_async_handler_without_code():
+    metrics = Metrics()
+
+    @metrics.instrument("resource")
+    async def get_rules(checker: str) -> str:
+        return checker
+
+    assert asyncio.run(get_rules("memory_safety")) == "memory_safety"
+    samples = parse(metrics.render())
+    assert samples['cpp_style_requests_total{handler="get_rules",kind="resource",status="ok"}'] == "1"
+    assert not [name for name in samples if name.startswith("cpp_style_input_chars")]
+
+
+def test_rule_findings_accumulate():
+    metrics = Metrics()
+    metrics.add_rule_findings({"mem-raw-new": 2, "mem-c-free": 1})
+    metrics.add_rule_findings({"mem-raw-new": 3})
+    metrics.add_rule_findings({})
+    samples = parse(metrics.render())
+    assert samples['cpp_style_rule_findings_total{rule="mem-raw-new"}'] == "5"
+    assert samples['cpp_style_rule_findings_total{rule="mem-c-free"}'] == "1"
+
+
+def test_suppressed_calls_are_not_counted():
+    metrics = Metrics()
+
+    @metrics.instrument("tool")
+    async def check(code: str) -> str:
+        return code
+
+    async def scenario():
+        with metrics.suppress():
+            # suppress 期间创建的任务同样不计入
+            await asyncio.create_task(check("x"))
+            metrics.add_rule_findings({"mem-raw-new": 1})
+        await check("y")
+
+    asyncio.run(scenario())
+    samples = parse(metrics.render())
+    assert samples['cpp_style_requests_total{handler="check",kind="tool",status="ok"}'] == "1"
+    assert not [name for name in samples if name.startswith("cpp_style_rule_findings_total")]
+
+
+def test_collectors_and_label_escaping():
+    metrics = Metrics(prefix="test")
+    metrics.add_collector(lambda: [
+        ("test_cache_entries", "gauge", "Entries", [({}, 3)]),
+        ("test_info", "gauge", "Info", [({"path": 'C:\\a "b"\nc'}, 1.5)]),
+    ])
+    text = metrics.render()
+    assert "# TYPE test_cache_entries gauge\ntest_cache_entries 3\n" in text
+    assert 'test_info{path="C:\\\\a \\"b\\"\\nc"} 1.5\n' in text
+    assert text.endswith("\n")
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="需要 /proc")
+def test_resident_memory():
+    assert resident_memory_bytes() > 0
+    assert resident_memory_bytes(os.getpid()) > 0
+    assert resident_memory_bytes(2 ** 22 + 12345) is None
@@ -0,0 +1,144 @@
+"""命名规范检查：naming_conventions.json 中每个风格备选项的判定"""
+
+import pytest
+
+from cpp_style.tools.naming_checker import _STYLE_RULES, NamingChecker
+
+# (类别, 标识符, 是否符合规范)：按类别的风格备选项分组，每个备选项都有符合和不符合的例子
+VERDICTS = (
+    # variable: snake_case
+    ("variable", "user_name", True),
+    ("variable", "x", True),
+    ("variable", "item2", True),
+    ("variable", "userName", False),
+    ("variable", "TotalCount", False),
+    ("variable", "MAXVALUE", False),
+    ("variable", "_name", False),
+    ("variable", "2d", False),
+    # constant: UPPER_SNAKE_CASE
+    ("constant", "MAX_SIZE", True),
+    ("constant", "MAX_BUFFER_SIZE2", True),
+    ("constant", "PI", True),
+    ("constant", "K", True),
+    ("constant", "max_buffer_size", False),
+    # constant: kCamelCase
+    ("constant", "kDefaultTimeout", True),
+    ("constant", "kPi", True),
+    ("constant", "kdefault", False),
+    ("constant", "k_timeout", False),
+    ("constant", "maxBufferSize", False),
+    # function: snake_case
+    ("function", "calculate_total", True),
+    ("function", "get", True),
+    ("function", "calculatetotal", True),
+    ("function", "_helper", False),
+    # function: CamelCase（首字母大写）
+    ("function", "DoThing", True),
+    ("function", "CalculateTotal", True),
+    ("function", "calculateTotal", False),
+    ("function", "Calculate_Total", False),
+    ("function", "CALCULATE_TOTAL", False),
+    # class: PascalCase
+    ("class", "UserManager", True),
+    ("class", "HttpClient", True),
+    ("class", "HTTPClient", True),
+    ("class", "A", True),
+    ("class", "userManager", False),
+    ("class", "database_connection", False),
+    ("class", "User_Manager", False),
+    # namespace: snake_case 或 lowercase（两者接受的名字相同）
+    ("namespace", "utils", True),
+    ("namespace", "http_client", True),
+    ("namespace", "v2", True),
+    ("namespace", "Utils", False),
+    ("namespace", "HttpClient", False),
+    ("namespace", "DATA_BASE", False),
+    ("namespace", "_detail", False),
+    # member_variable: suffix with _
+    ("member_variable", "name_", True),
+    ("member_variable", "count_", True),
+    ("member_variable", "data__", True),
+    ("member_variable", "m_", True),
+    ("member_variable", "name", False),
+    ("member_variable", "_name", False),
+    # member_variable: m_ prefix
+    ("member_variable", "m_name", True),
+    ("member_variable", "m_count", True),
+    ("member_variable", "mName", False),
+    # template_parameter: PascalCase
+    ("template_parameter", "TKey", True),
+    ("template_parameter", "Container", True),
+    ("template_parameter", "tKey", False),
+    ("template_parameter", "container", False),
+    ("template_parameter", "T_", False),
+    # template_parameter: single uppercase
+    ("template_parameter", "T", True),
+    ("template_parameter", "U", True),
+    ("template_parameter", "t", False),
+    # file_naming: snake_case.cpp（任意 C/C++ 源文件或头文件扩展名）
+    ("file_naming", "my_file.cpp", True),
+    ("file_naming", "user_manager.cpp", True),
+    ("file_naming", "http_client.h", True),
+    ("file_naming", "io.cc", True),
+    ("file_naming", "user-manager.cpp", False),
+    ("file_naming", "user_manager", False),
+    ("file_naming", "my_file.py", False),
+    ("file_naming", ".cpp", False),
+    # file_naming: PascalCase.cpp
+    ("file_naming", "UserManager.cpp", True),
+    ("file_naming", "Widget.hpp", True),
+    ("file_naming", "UserManager.CPP", False),
+)
+
+
+@pytest.fixture(scope="module")
+def checker() -> NamingChecker:
+    return NamingChecker()
+
+
+def style_alternatives(style: str):
+    """风格描述中的各备选项（文件命名去掉 .cpp 后缀）"""
+    for option in style.split('或'):
+        option = option.strip()
+        yield option[:-len('.cpp')] if option.endswith('.cpp') else option
+
+
+def test_every_style_alternative_is_known(checker):
+    for category, convention in checker.conventions.items():
+        for option in style_alternatives(convention["style"]):
+            assert option in _STYLE_RULES, (category, option)
+
+
+def test_table_covers_every_category(checker):
+    assert {category for category, _, _ in VERDICTS} == set(checker.conventions)
+
+
+@pytest.mark.parametrize("category,identifier,expected", VERDICTS)
+def test_verdict(checker, category, identifier, expected):
+    is_valid, details, suggestions = checker.check_naming(identifier, category)
+    assert is_valid is expected
+    assert ("✓ 符合规范" in details) is expected
+    if expected:
+        assert suggestions == []
+
+
+def test_good_examples_pass(checker):
+    for category, convention in checker.conventions.items():
+        for identifier in convention["examples"]["good"]:
+            assert checker.check_naming(identifier, category)[0], (category, identifier)
+
+
+def test_batch_matches_single_checks(checker):
+    items = [(identifier, category) for category, identifier, _ in VERDICTS]
+    failures, report = checker.check_naming_batch(items)
+    assert [(failure["identifier"], failure["category"]) for failure in failures] == [
+        (identifier, category) for category, identifier, expected in VERDICTS if not expected
+    ]
+    assert f"检查 {len(items)} 个标识符" in report
+
+
+def test_unknown_category(checker):
+    is_valid, details, suggestions = checker.check_naming("name", "macro")
+    assert not is_valid
+    assert details == "未知的类别: macro"
+    assert suggestions == []
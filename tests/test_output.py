@@ -0,0 +1,97 @@
+"""json 结构化输出：每个工具的结果都符合 AnalysisOutput，统计与问题列表一致，部分结果有标注"""
+
+import time
+
+import pytest
+
+from cpp_style.executor import run_task
+from cpp_style.output import AnalysisOutput, FindingSet, rule_findings, structured
+from cpp_style.rules import ALL_RULES
+from cpp_style.tools.memory_safety import get_analyzer
+
+LIMITS = (None, None)
+FILE_PATH = "include/widget.h"
+CODE = (
+    "class Widget {\n"
+    "public:\n"
+    "    int getSize() { return size_; }\n"
+    "private:\n"
+    "    int size_;\n"
+    "};\n"
+    "void process(std::string name) {\n"
+    "    int* p = new int;\n"
+    "    char* buffer = (char*)malloc(8);\n"
+    "    Widget* w = NULL;\n"
+    "}\n"
+)
+
+TASKS = {
+    "analyze_memory_safety": (CODE, ALL_RULES, FILE_PATH, 0),
+    "check_const_correctness": (CODE, ALL_RULES, FILE_PATH, 0),
+    "suggest_modern_cpp": (CODE, "cpp20", ALL_RULES, FILE_PATH, 0),
+    "analyze_all": (CODE, FILE_PATH, "cpp20", ALL_RULES, 0),
+    "check_naming_in_code": (CODE,),
+    "check_naming_batch": ((("GetSize", "function"), ("size", "member_variable"), ("kMax", "constant")),),
+}
+
+
+def json_result(tool, expires=None):
+    result, partial, _, _ = run_task(tool, (*TASKS[tool], "json"), LIMITS, expires=expires)
+    assert result["partial"] == partial
+    return result
+
+
+@pytest.mark.parametrize("tool", TASKS)
+def test_result_matches_schema(tool):
+    result = json_result(tool)
+    output = AnalysisOutput.model_validate(result)
+    assert (output.format, output.tool, output.partial) == ("json", tool, False)
+    assert result["findings"]
+    assert {finding["rule"] for finding in result["findings"]} == set(result["rules"])
+
+    summary = result["summary"]
+    assert summary["total"] == len(result["findings"])
+    assert sum(summary["by_severity"].values()) == summary["total"]
+    assert sum(summary["by_rule"].values()) == summary["total"]
+    for finding in result["findings"]:
+        if "range" in finding:
+            line, column, end_line, end_column = finding["range"]
+            assert 1 <= line <= end_line and column >= 1
+            assert end_line > line or end_column > column
+
+
+def test_analyze_all_reports_checker_status():
+    checkers = json_result("analyze_all")["checkers"]
+    assert list(checkers) == ["memory_safety", "const_correctness", "modern_cpp", "include_guard"]
+    assert checkers["memory_safety"]["status"] == "ok"
+    assert checkers["memory_safety"]["findings"] > 0
+
+
+def test_naming_findings_carry_suggestions():
+    result = json_result("check_naming_in_code")
+    finding = next(finding for finding in result["findings"] if finding["code"] == "getSize")
+    assert finding["rule"] == "naming-function"
+    assert finding["range"] == [3, 9, 3, 16]
+    assert finding["suggestion"] == "get_size"
+    assert result["rules"]["naming-function"]["checker"] == "naming"
+
+
+def test_shared_suggestion_listed_once():
+    issues, _ = get_analyzer().analyze_memory_safety("int* a = new int;\nint* b = new int;\n", render=False)
+    result = structured("analyze_memory_safety", rule_findings("memory_safety", issues))
+    assert result["rules"]["mem-raw-new"]["suggestion"]
+    assert all("suggestion" not in finding for finding in result["findings"] if finding["rule"] == "mem-raw-new")
+
+
+def test_expired_deadline_is_marked_partial():
+    result = json_result("analyze_memory_safety", expires=time.monotonic() - 1)
+    assert result["partial"]
+    assert result["findings"] == []
+    assert result["skipped_rules"]
+    AnalysisOutput.model_validate(result)
+
+
+def test_empty_result():
+    result = structured("analyze_memory_safety", FindingSet())
+    assert result["findings"] == []
+    assert result["summary"] == {"total": 0, "by_severity": {"error": 0, "warning": 0, "info": 0}, "by_rule": {}}
@@ -0,0 +1,80 @@
+"""规则耗时分析：逐条规则记录次数、耗时和结果数，分块记录相加，耗时表只列出最慢的规则"""
+
+import asyncio
+
+from cpp_style.executor import AnalysisExecutor, run_task
+from cpp_style.output import AnalysisOutput
+from cpp_style.profiling import RuleProfile, render
+from cpp_style.rules import ALL_RULES, RuleSelection, get_registry, profile_rules
+from cpp_style.tools.memory_safety import get_analyzer
+
+CODE = "void f() {\n    int* p = new int;\n    int* q = new int;\n    delete p;\n}\n"
+ARGS = (CODE, ALL_RULES, "src/widget.cpp", 0, "json")
+
+
+def test_record_and_rows():
+    profile = RuleProfile()
+    profile.record("a", "memory_safety", 0.001, 2)
+    profile.record("b", "memory_safety", 0.004, 0, timed_out=True)
+    profile.record("a", "memory_safety", 0.002, 1)
+    assert profile.rows() == [
+        {"rule": "b", "checker": "memory_safety", "calls": 1, "ms": 4.0, "findings": 0, "timeouts": 1},
+        {"rule": "a", "checker": "memory_safety", "calls": 2, "ms": 3.0, "findings": 3, "timeouts": 0},
+    ]
+
+
+def test_merge_adds_chunk_records():
+    chunk = RuleProfile()
+    chunk.record("a", "const_correctness", 0.002, 1)
+    total = RuleProfile()
+    total.merge(chunk.rows())
+    total.merge(chunk.rows())
+    assert total.rows() == [
+        {"rule": "a", "checker": "const_correctness", "calls": 2, "ms": 4.0, "findings": 2, "timeouts": 0},
+    ]
+
+
+def test_profile_rules_records_every_executed_rule():
+    profile = RuleProfile()
+    selection = RuleSelection.of(["mem-raw-*", "mem-manual-delete"])
+    with profile_rules(profile):
+        issues, _ = get_analyzer().analyze_memory_safety(CODE, selection)
+    rows = {row["rule"]: row for row in profile.rows()}
+    assert set(rows) == {rule.id for rule in selection.apply(get_registry().for_checker("memory_safety"))}
+    assert rows["mem-raw-new"]["findings"] == 2
+    assert sum(row["findings"] for row in rows.values()) == len(issues)
+    assert all(row["calls"] == 1 and row["checker"] == "memory_safety" for row in rows.values())
+
+
+def test_not_recorded_outside_profile_rules():
+    profile = RuleProfile()
+    with profile_rules(profile):
+        pass
+    get_analyzer().analyze_memory_safety(CODE)
+    assert profile.rows() == []
+
+
+def test_run_task_returns_rows_only_when_asked():
+    result, _, counts, rows = run_task("analyze_memory_safety", ARGS, (None, None), profile=True)
+    assert {row["rule"] for row in rows} == set(rule.id for rule in get_registry().for_checker("memory_safety"))
+    assert {row["rule"]: row["findings"] for row in rows if row["findings"]} == counts
+    AnalysisOutput.model_validate({**result, "profile": rows})
+    assert run_task("analyze_memory_safety", ARGS, (None, None))[3] is None
+
+
+def test_executor_profile_in_thread():
+    _, _, _, rows = asyncio.run(AnalysisExecutor().run("analyze_memory_safety", ARGS, (None, None), profile=True))
+    assert rows and rows == sorted(rows, key=lambda row: row["ms"], reverse=True)
+
+
+def test_render_lists_slowest_rules():
+    rows = [
+        {"rule": f"r{i}", "checker": "modern_cpp", "calls": 1, "ms": float(10 - i), "findings": i, "timeouts": 0}
+        for i in range(5)
+    ]
+    table = render(rows, limit=3)
+    assert "**5 条规则，共 40.0 ms**" in table
+    assert "| `r0` | modern_cpp | 1 | 10.00 | 25.0% | 0 | 0 |" in table
+    assert "`r3`" not in table
+    assert "其余 2 条规则共 13.0 ms" in table
+    assert render([]).endswith("**0 条规则，共 0.0 ms**\n\n")
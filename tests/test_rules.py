@@ -0,0 +1,130 @@
+"""声明式规则注册表：规则数据的编译和校验，以及四种执行方式"""
+
+import json
+
+import pytest
+
+from cpp_style.data import DataStore
+from cpp_style.rules import (
+    MODES, SEVERITIES, STANDARDS, RuleRegistry, _compile_rule, get_registry, reduce_tallies, run_rules, tally_rule,
+    validate_checks,
+)
+from cpp_style.source_buffer import SourceBuffer
+from cpp_style.tools.const_checker import get_checker as get_const_checker
+from cpp_style.tools.memory_safety import get_analyzer as get_memory_analyzer
+from cpp_style.tools.modern_cpp import get_suggester as get_modern_cpp_suggester
+
+CHECKERS = {
+    "const_correctness": get_const_checker,
+    "memory_safety": get_memory_analyzer,
+    "modern_cpp": get_modern_cpp_suggester,
+}
+
+
+def rule(**entry):
+    return _compile_rule("test", {"id": "test-rule", "pattern": "x", "message": "m", **entry})
+
+
+def test_registry_covers_every_checker():
+    registry = get_registry()
+    assert set(registry.checkers()) == set(CHECKERS)
+    for checker, get in CHECKERS.items():
+        rules = registry.for_checker(checker)
+        assert rules == get().rules
+        validate_checks(rules, get().checks)
+        for item in rules:
+            assert item.id in registry
+            assert item.severity in SEVERITIES
+            assert item.min_standard in STANDARDS
+            assert item.mode in MODES
+
+
+def test_rule_ids_have_checker_prefixes():
+    prefixes = {"const_correctness": "const-", "memory_safety": "mem-", "modern_cpp": "modern-"}
+    for item in get_registry():
+        assert item.id.startswith(prefixes[item.checker]), item.id
+
+
+def test_registry_rejects_duplicate_ids():
+    with pytest.raises(ValueError, match="重复"):
+        RuleRegistry([rule(), rule()])
+
+
+@pytest.mark.parametrize("entry,message", [
+    ({"severity": "fatal"}, "严重程度"),
+    ({"min_standard": "cpp03"}, "标准"),
+    ({"mode": "sometimes"}, "执行方式"),
+    ({"view": "ast"}, "视图"),
+    ({"mode": "compare"}, "compare"),
+])
+def test_invalid_rule_definitions(entry, message):
+    with pytest.raises(ValueError, match=message):
+        rule(**entry)
+
+
+def test_invalid_rule_file_names_the_rule(tmp_path):
+    (tmp_path / "rules_broken.json").write_text(json.dumps({
+        "checker": "broken", "rules": [{"id": "broken-rule", "pattern": "(unclosed"}],
+    }))
+    with pytest.raises(ValueError, match="rules_broken.json: 规则 broken-rule"):
+        RuleRegistry.load(DataStore(tmp_path))
+
+
+def test_unregistered_check_is_reported():
+    with pytest.raises(ValueError, match="未注册"):
+        validate_checks((rule(check="missing"),), {})
+
+
+def test_match_rule_reports_positions_on_code_view():
+    source = SourceBuffer('int* p = new int;  // new int\nauto s = "new int";\nint* q = new int[4];\n')
+    found = run_rules(
+        (rule(pattern=r"\bnew\s+(\w+)", message="new {1}", suggestion="use make_unique<{1}>"),),
+        source, {},
+    )
+    assert [(issue["line"], issue["column"], issue["message"]) for issue in found] == [
+        (1, 10, "new int"), (3, 10, "new int"),
+    ]
+    assert found[0]["suggestion"] == "use make_unique<int>"
+    assert found[0]["rule"] == "test-rule"
+
+
+def test_match_rule_exclude_and_check():
+    source = SourceBuffer("a1 b2 c3 d4\n")
+    checks = {"odd": lambda r, match, code, context: int(match.group(2)) % 2 == 1}
+    found = run_rules(
+        (rule(pattern=r"(\w)(\d)", exclude={"1": ["a"]}, check="odd"),),
+        source, checks,
+    )
+    assert [issue["location"] for issue in found] == ["c3"]
+
+
+@pytest.mark.parametrize("entry,code,expected", [
+    ({"mode": "count", "message": "{count} 处"}, "x x y x", "3 处"),
+    ({"mode": "count"}, "y", None),
+    ({"mode": "presence", "unless": "fclose"}, "fopen x", "m"),
+    ({"mode": "presence", "unless": "y"}, "x y", None),
+    ({"mode": "presence", "pattern": "nope", "any_of": [{"pattern": "x"}]}, "x", "m"),
+    ({"mode": "compare", "compare": "y", "message": "{count} > {other_count}"}, "x x y", "2 > 1"),
+    ({"mode": "compare", "compare": "y"}, "x y", None),
+])
+def test_aggregate_modes(entry, code, expected):
+    item = rule(**entry)
+    found = run_rules((item,), SourceBuffer(code), {})
+    assert [issue["message"] for issue in found] == ([expected] if expected else [])
+    if found:
+        assert found[0]["line"] == 0
+
+
+def test_tallies_sum_across_sections():
+    item = rule(mode="compare", compare="y", message="{count} > {other_count}")
+    tallies = [tally_rule(item, SourceBuffer(part)) for part in ("x y", "x", "x y y")]
+    # 前两段 2 > 1，加上第三段后 3 = 3，结论与整段相同
+    assert reduce_tallies(item, tallies[:2])["message"] == "2 > 1"
+    assert reduce_tallies(item, tallies) is None
+    assert reduce_tallies(item, [tally_rule(item, SourceBuffer("x y\nx\nx y y"))]) is None
+
+
+def test_text_view_sees_comments():
+    source = SourceBuffer("int x; // TODO\n")
+    assert run_rules((rule(pattern="TODO"),), source, {}) == []
+    assert len(run_rules((rule(pattern="TODO", view="text"),), source, {})) == 1
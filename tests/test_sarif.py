@@ -0,0 +1,168 @@
+"""SARIF 输出：日志结构、规则索引、区域、指纹、文件 URI、部分结果通知和 informationUri"""
+
+import json
+import tomllib
+from email.message import Message
+from pathlib import Path
+
+import pytest
+
+from cpp_style import sarif
+from cpp_style.deadline import Deadline
+from cpp_style.output import INCLUDE_GUARD_MISSING, FindingSet
+from cpp_style.source_buffer import SourceBuffer
+from cpp_style.tools.memory_safety import get_analyzer
+
+PYPROJECT = Path(__file__).resolve().parent.parent / "pyproject.toml"
+
+
+@pytest.fixture
+def fresh_information_uri():
+    sarif.information_uri.cache_clear()
+    yield
+    sarif.information_uri.cache_clear()
+
+
+def test_information_uri_matches_package_metadata(fresh_information_uri):
+    with open(PYPROJECT, "rb") as f:
+        urls = tomllib.load(f)["project"]["urls"]
+    log = json.loads(sarif.render(FindingSet(), SourceBuffer("int x;\n")))
+    assert log["runs"][0]["tool"]["driver"]["informationUri"] == urls["Repository"]
+
+
+def test_information_uri_from_installed_metadata(fresh_information_uri, monkeypatch, tmp_path):
+    installed = Message()
+    installed["Project-URL"] = "Homepage, https://example.org/home"
+    installed["Project-URL"] = "Repository, https://example.org/repo"
+    monkeypatch.setattr(sarif, "_PYPROJECT", tmp_path / "missing.toml")
+    monkeypatch.setattr(sarif.metadata, "metadata", lambda name: installed)
+    assert sarif.information_uri() == "https://example.org/repo"
+
+
+def test_information_uri_omitted_without_metadata(fresh_information_uri, monkeypatch, tmp_path):
+    def missing(name):
+        raise sarif.metadata.PackageNotFoundError(name)
+
+    monkeypatch.setattr(sarif, "_PYPROJECT", tmp_path / "missing.toml")
+    monkeypatch.setattr(sarif.metadata, "metadata", missing)
+    log = json.loads(sarif.render(FindingSet(), SourceBuffer("int x;\n")))
+    assert "informationUri" not in log["runs"][0]["tool"]["driver"]
+
+
+# ==================== 日志结构 ====================
+
+CODE = (
+    "void f() {\n"
+    "    int* p = new int;\n"
+    "    char* s = (char*)malloc(8);\n"
+    "    strcpy(s, \"é\");\n"
+    "    delete p;\n"
+    "}\n"
+)
+
+
+def findings_for(code):
+    issues, _ = get_analyzer().analyze_memory_safety(code, render=False)
+    findings = FindingSet()
+    findings.add_rule_issues("memory_safety", issues)
+    return findings
+
+
+def sarif_log(code, file_path=None, deadline=None, findings=None):
+    findings = findings_for(code) if findings is None else findings
+    return json.loads(sarif.render(findings, SourceBuffer(code), file_path, deadline))
+
+
+def test_log_structure():
+    log = sarif_log(CODE, "src/widget.cpp")
+    assert log["version"] == sarif.SARIF_VERSION
+    assert log["$schema"] == sarif.SARIF_SCHEMA
+    run = log["runs"][0]
+    assert run["columnKind"] == "unicodeCodePoints"
+    assert run["artifacts"] == [{"location": {"uri": "src/widget.cpp"}, "length": len(CODE.encode("utf-8"))}]
+    assert run["invocations"] == [{"executionSuccessful": True}]
+
+    rules = run["tool"]["driver"]["rules"]
+    assert len({rule["id"] for rule in rules}) == len(rules)
+    for result in run["results"]:
+        rule = rules[result["ruleIndex"]]
+        assert rule["id"] == result["ruleId"]
+        assert result["level"] == rule["defaultConfiguration"]["level"]
+        assert rule["properties"]["tags"][0] == "memory_safety"
+        assert result["locations"][0]["physicalLocation"]["artifactLocation"] == {"uri": "src/widget.cpp", "index": 0}
+
+    new = next(result for result in run["results"] if result["ruleId"] == "mem-raw-new")
+    region = new["locations"][0]["physicalLocation"]["region"]
+    assert (region["startLine"], region["startColumn"]) == (2, 14)
+    assert region["endColumn"] - region["startColumn"] == len(region["snippet"]["text"])
+
+
+def test_levels_map_info_to_note():
+    levels = {rule["id"]: rule["defaultConfiguration"]["level"] for rule in sarif_log(
+        "int a[4];\nint* p = new int;\nchar* s = (char*)malloc(1);\n"
+    )["runs"][0]["tool"]["driver"]["rules"]}
+    assert levels["mem-c-array"] == "note"
+    assert levels["mem-raw-new"] == "warning"
+    assert levels["mem-c-allocation"] == "error"
+
+
+def fingerprints(log):
+    return [
+        (result["ruleId"], result["partialFingerprints"]["primaryLocationLineHash"])
+        for result in log["runs"][0]["results"]
+    ]
+
+
+def test_fingerprints_survive_code_moving():
+    before = sarif_log(CODE)
+    after = sarif_log("// header\n\n" + CODE.replace("    int*", "\tint*   "))
+    assert fingerprints(before) == fingerprints(after)
+    start = [result["locations"][0]["physicalLocation"]["region"]["startLine"] for result in after["runs"][0]["results"]]
+    assert start[0] == 4
+
+
+def test_fingerprints_distinguish_repeated_lines():
+    log = sarif_log("int* p = new int;\nint* p = new int;\n")
+    hashes = [fingerprint for rule_id, fingerprint in fingerprints(log) if rule_id == "mem-raw-new"]
+    assert [fingerprint.rsplit(":", 1)[1] for fingerprint in hashes] == ["1", "2"]
+    assert len({fingerprint.rsplit(":", 1)[0] for fingerprint in hashes}) == 1
+
+
+@pytest.mark.parametrize("file_path,uri", [
+    (None, "stdin"),
+    ("", "stdin"),
+    ("src/my widget.cpp", "src/my%20widget.cpp"),
+    ("C:\\work\\widget.cpp", "file:///C:/work/widget.cpp"),
+    ("src\\ui\\widget.h", "src/ui/widget.h"),
+])
+def test_artifact_uri(file_path, uri):
+    assert sarif.artifact_uri(file_path) == uri
+
+
+def test_partial_results_are_tool_notifications():
+    deadline = Deadline(1.0)
+    deadline.timeouts.append(("mem-raw-new", "超过 1 秒"))
+    deadline.skip(["mem-c-free"])
+    invocation = sarif_log(CODE, deadline=deadline)["runs"][0]["invocations"][0]
+    assert invocation["executionSuccessful"] is False
+    assert invocation["toolExecutionNotifications"] == [
+        {"level": "warning", "message": {"text": "超过 1 秒"}, "descriptor": {"id": "mem-raw-new"}},
+        {"level": "note", "message": {"text": "截止时间已到，规则未执行"}, "descriptor": {"id": "mem-c-free"}},
+    ]
+
+
+def test_include_guard_finding_has_no_region():
+    findings = FindingSet()
+    findings.add_include_guard(False, ["WIDGET_H"])
+    result, = sarif_log("int x;\n", findings=findings)["runs"][0]["results"]
+    assert result["ruleId"] == INCLUDE_GUARD_MISSING
+    assert "region" not in result["locations"][0]["physicalLocation"]
+    assert result["message"]["text"].endswith("WIDGET_H")
+
+
+def test_results_are_encoded_in_batches(monkeypatch):
+    code = "int* p = new int;\n" * 7
+    whole = sarif_log(code)
+    monkeypatch.setattr(sarif, "_BATCH", 3)
+    assert sarif_log(code) == whole
+    assert len(whole["runs"][0]["results"]) >= 7
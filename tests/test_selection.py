@@ -0,0 +1,64 @@
+"""单次调用的规则选择：校验、通配符、排除和严重程度过滤，未选中的规则不执行"""
+
+import pytest
+
+from cpp_style.rules import ALL_RULES, RuleSelection, get_registry, observe_rules
+from cpp_style.tools.memory_safety import get_analyzer
+
+CODE = (
+    "void f() {\n"
+    "    int* p = new int;\n"
+    "    char* s = (char*)malloc(8);\n"
+    "    strcpy(s, \"x\");\n"
+    "    delete p;\n"
+    "}\n"
+)
+
+
+def selected(selection, checker="memory_safety"):
+    return [rule.id for rule in selection.apply(get_registry().for_checker(checker))]
+
+
+@pytest.mark.parametrize("kwargs,message", [
+    ({"min_severity": "fatal"}, "未知的严重程度"),
+    ({"rules": ["mem-no-such-rule"]}, "未知的规则: mem-no-such-rule"),
+    ({"exclude_rules": ["nope-*"]}, "未知的规则: nope-\\*"),
+])
+def test_invalid_selection(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        RuleSelection.of(**kwargs)
+
+
+def test_default_selection_keeps_every_rule():
+    rules = get_registry().for_checker("memory_safety")
+    assert RuleSelection.of().is_default
+    assert RuleSelection.of() == ALL_RULES
+    assert ALL_RULES.apply(rules) is rules
+
+
+def test_wildcards_and_exclusions():
+    selection = RuleSelection.of(["mem-c-*", "mem-raw-new"], ["mem-c-array"])
+    assert not selection.is_default
+    # 保持注册表中的定义顺序，而不是参数顺序
+    assert selected(selection) == ["mem-raw-new", "mem-c-allocation", "mem-c-free"]
+    assert selected(selection, "modern_cpp") == []
+
+
+def test_min_severity():
+    assert selected(RuleSelection.of(min_severity="error")) == [
+        "mem-c-allocation", "mem-c-free", "mem-unsafe-string-function", "mem-return-local-address",
+    ]
+    warnings = selected(RuleSelection.of(min_severity="warning"))
+    assert "mem-raw-new" in warnings
+    assert "mem-c-array" not in warnings
+
+
+def test_unselected_rules_are_not_executed():
+    executed = []
+    selection = RuleSelection.of(["mem-*"], ["mem-raw-*"], "warning")
+    with observe_rules(lambda rule, issues: executed.append(rule.id)):
+        issues, _ = get_analyzer().analyze_memory_safety(CODE, selection)
+    assert executed == selected(selection)
+    assert {issue["rule"] for issue in issues} <= set(executed)
+    assert "mem-raw-new" not in {issue["rule"] for issue in issues}
+    assert "mem-unsafe-string-function" in {issue["rule"] for issue in issues}
@@ -0,0 +1,67 @@
+"""源码缓冲区：行偏移索引、行列号和区间，以及共享的 token 流和纯代码视图"""
+
+import pytest
+
+from cpp_style.source_buffer import SourceBuffer
+
+TEXT = "int a;\n\n  int* p = new int;  // 注释\r\nauto s = \"é\";\n}"
+
+
+def naive_position(text, offset):
+    """逐个计数的行列号（索引应给出相同的结果）"""
+    line = text[:offset].count("\n") + 1
+    return line, offset - (text.rfind("\n", 0, offset) + 1) + 1
+
+
+@pytest.mark.parametrize("text", [TEXT, "", "\n", "x", "a\n\nb\n"])
+def test_positions_match_counting(text):
+    source = SourceBuffer(text)
+    for offset in range(len(text) + 1):
+        assert source.position(offset) == naive_position(text, offset)
+        assert source.line_of(offset) == naive_position(text, offset)[0]
+    assert source.line_count == text.count("\n") + 1
+
+
+def test_span_and_region():
+    source = SourceBuffer(TEXT)
+    start = TEXT.index("new")
+    assert source.span(start, start + 7) == (3, 12, 3, 19)
+    assert source.region(start, start + 7) == {"line": 3, "column": 12, "end_line": 3, "end_column": 19}
+    # 跨行的区间
+    assert source.span(0, TEXT.index("auto")) == (1, 1, 4, 1)
+
+
+def test_line_text():
+    source = SourceBuffer(TEXT)
+    assert [source.line_text(line) for line in range(1, source.line_count + 1)] == source.lines()
+    assert source.line_text(2) == ""
+    assert source.line_text(5) == "}"
+
+
+def test_of_reuses_buffer():
+    source = SourceBuffer(TEXT)
+    assert SourceBuffer.of(source) is source
+    assert SourceBuffer.of(TEXT).text == TEXT
+
+
+def test_views_are_built_once():
+    source = SourceBuffer(TEXT)
+    assert source.tokens is source.tokens
+    assert source.code is source.code
+    assert len(source.code) == len(source) == len(TEXT)
+    assert "注释" not in source.code
+    assert source.excerpt(0, 6) == "int a;"
+
+
+def test_section_shares_code_view():
+    text = "int a; // x\nint b;\n/* y */ int c;\n"
+    source = SourceBuffer(text)
+    start, end = text.index("int b"), len(text)
+    fresh = source.section(start, end)
+    assert fresh.code == SourceBuffer(text[start:end]).code
+    # 整体的纯代码视图生成后，区间直接截取而不再词法分析
+    assert source.code
+    shared = source.section(start, end)
+    assert shared._code is not None
+    assert shared.code == fresh.code
+    assert shared.position(shared.text.index("int c")) == (2, 9)
@@ -0,0 +1,76 @@
+"""内存中的静态资源：ETag、Cache-Control、304 和 gzip 协商"""
+
+import gzip
+
+import pytest
+from starlette.requests import Request
+
+from cpp_style.static_assets import StaticAsset
+
+BODY = b'{"name": "cpp-style-guide", "tools": [' + b'"check_naming", ' * 50 + b'"analyze_all"]}'
+
+
+def request(**headers):
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+@pytest.fixture
+def asset(tmp_path):
+    path = tmp_path / "server-card.json"
+    path.write_bytes(BODY)
+    return StaticAsset.load(path, "application/json", max_age=600)
+
+
+def test_plain_response(asset):
+    response = asset.response(request())
+    assert response.status_code == 200
+    assert response.body == BODY
+    assert response.headers["etag"] == asset.etag
+    assert response.headers["cache-control"] == "public, max-age=600"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert "content-encoding" not in response.headers
+
+
+def test_gzip_response(asset):
+    response = asset.response(request(accept_encoding="br, gzip;q=0.8"))
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == asset.gzip_etag != asset.etag
+    assert gzip.decompress(response.body) == BODY
+
+
+@pytest.mark.parametrize("accept_encoding", ["identity", "gzip;q=0", "br", "gzip;q=x"])
+def test_gzip_not_accepted(asset, accept_encoding):
+    assert "content-encoding" not in asset.response(request(accept_encoding=accept_encoding)).headers
+
+
+@pytest.mark.parametrize("if_none_match", ["{etag}", "W/{etag}", '"other", {etag}', "{gzip_etag}", "*"])
+def test_not_modified(asset, if_none_match):
+    header = if_none_match.format(etag=asset.etag, gzip_etag=asset.gzip_etag)
+    response = asset.response(request(if_none_match=header))
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["cache-control"] == "public, max-age=600"
+
+
+def test_stale_etag_gets_content(asset):
+    assert asset.response(request(if_none_match='"stale"')).status_code == 200
+
+
+def test_etag_follows_content(tmp_path, asset):
+    path = tmp_path / "server-card.json"
+    assert StaticAsset.load(path, "application/json") == StaticAsset.load(path, "application/json")
+    path.write_bytes(BODY + b" ")
+    assert StaticAsset.load(path, "application/json").etag != asset.etag
+
+
+def test_small_file_is_not_compressed(tmp_path):
+    path = tmp_path / "icon.svg"
+    path.write_bytes(b"<svg/>")
+    asset = StaticAsset.load(path, "image/svg+xml")
+    assert asset.gzip_body is None
+    assert "content-encoding" not in asset.response(request(accept_encoding="gzip")).headers
+
+
+def test_missing_file(tmp_path):
+    assert StaticAsset.load(tmp_path / "missing.json", "application/json") is None
@@ -0,0 +1,86 @@
+"""启动预热：逐步执行并记录耗时和失败，完成前 /ready 返回 503；预热不读写结果缓存"""
+
+import asyncio
+import json
+
+import pytest
+
+from cpp_style.warmup import PROMPT_CALLS, RESOURCE_URIS, TOOL_CALLS, Warmup
+
+
+async def ok():
+    pass
+
+
+async def broken():
+    raise ValueError("bad input")
+
+
+def test_states_and_failures():
+    warmup = Warmup()
+    assert (warmup.status, warmup.ready) == ("pending", False)
+    assert warmup.stats() == {"status": "pending"}
+
+    asyncio.run(warmup.run([("a", ok), ("b", broken), ("c", ok)]))
+    assert (warmup.status, warmup.ready) == ("done", True)
+    stats = warmup.stats()
+    assert list(stats["steps"]) == ["a", "b", "c"]
+    assert stats["errors"] == {"b": "ValueError: bad input"}
+    assert stats["duration_ms"] >= 0
+
+
+def test_runs_once():
+    calls = []
+
+    async def step():
+        calls.append(1)
+
+    warmup = Warmup()
+    asyncio.run(warmup.run([("a", step)]))
+    asyncio.run(warmup.run([("a", step)]))
+    assert calls == [1]
+
+
+def test_disabled_is_ready():
+    warmup = Warmup(enabled=False)
+    assert warmup.ready
+    asyncio.run(warmup.run([("a", broken)]))
+    assert warmup.stats() == {"status": "disabled"}
+
+
+@pytest.fixture
+def server(monkeypatch):
+    import cpp_style_server
+    monkeypatch.setattr(cpp_style_server, "_warmup", Warmup())
+    return cpp_style_server
+
+
+def ready(server):
+    response = asyncio.run(server.ready_check(None))
+    return response.status_code, json.loads(response.body)
+
+
+def test_server_warmup_covers_everything(server):
+    steps = [name for name, _ in server._warmup_steps()]
+    assert steps == (
+        [f"tool:{name}" for name in TOOL_CALLS]
+        + [f"resource:{uri}" for uri in RESOURCE_URIS]
+        + [f"prompt:{name}" for name in PROMPT_CALLS]
+    )
+    registered = {tool.name for tool in asyncio.run(server.mcp.list_tools())}
+    assert set(TOOL_CALLS) <= registered
+
+
+def test_ready_after_warmup(server):
+    status, body = ready(server)
+    assert status == 503
+    assert body["status"] == "warming"
+
+    entries = server._result_cache.stats()["entries"]
+    asyncio.run(server._run_warmup())
+    status, body = ready(server)
+    assert status == 200
+    assert body["status"] == "ready"
+    assert body["warmup"]["status"] == "done"
+    assert "errors" not in body["warmup"]
+    assert server._result_cache.stats()["entries"] == entries